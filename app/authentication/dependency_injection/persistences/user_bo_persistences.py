@@ -1,5 +1,7 @@
 from dependency_injector import containers, providers
 
+from app.config import persistence_settings
+
 from app.authentication.persistence.memory.user_bo import UserBOMemoryPersistenceService
 from app.authentication.persistence.postgres.user_bo import UserBOPostgresPersistenceService
 
@@ -7,4 +9,8 @@ from app.authentication.persistence.postgres.user_bo import UserBOPostgresPersis
 class UserBOPersistences(containers.DeclarativeContainer):
     memory = providers.Singleton(UserBOMemoryPersistenceService)
     postgres = providers.Singleton(UserBOPostgresPersistenceService)
-    carlemany = postgres
+    carlemany = providers.Selector(
+        lambda: persistence_settings.backend,
+        postgres=postgres,
+        memory=memory
+    )
@@ -0,0 +1,11 @@
+from dependency_injector import containers, providers
+
+from app.authentication.dependency_injection.persistences.user_bo_persistences import UserBOPersistences
+from app.authentication.domain.token_purge_worker import TokenPurgeWorker
+
+
+class TokenPurgeWorkers(containers.DeclarativeContainer):
+    carlemany = providers.Singleton(
+        TokenPurgeWorker,
+        user_persistence_service=UserBOPersistences.carlemany()
+    )
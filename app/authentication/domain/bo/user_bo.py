@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
 
@@ -8,3 +9,5 @@ class UserBO(BaseModel):
     password: str
     mail: str
     year_of_birth: int
+    # Only set on users looked up by token, so introspection knows when the token expires.
+    token_expires_at: Optional[datetime] = None
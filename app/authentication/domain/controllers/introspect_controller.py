@@ -1,16 +1,31 @@
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from app.config import AuthenticationSettings, authentication_settings
 from app.authentication.domain.bo.user_bo import UserBO
 from app.authentication.domain.persistences.user_bo_interface import UserBOInterface
+from app.tracing import traced
 
 
+@traced("controller")
 class IntrospectController:
-    def __init__(self, user_persistence_service: UserBOInterface):
+    def __init__(
+        self,
+        user_persistence_service: UserBOInterface,
+        settings: AuthenticationSettings = authentication_settings
+    ):
         self.user_persistence_service = user_persistence_service
+        self.settings = settings
 
     async def __call__(self, token: str) -> Optional[UserBO]:
-        user_id = await self.user_persistence_service.get_user_id_by_token(token)
-        if user_id is None:
-            return None
+        user = await self.user_persistence_service.get_user_by_token(token=token)
+        # Refreshing writes to the primary, so it is only done once a token is past half of its
+        # lifetime; other introspections stay a single read.
+        if (
+            user is not None
+            and self.settings.token_sliding_refresh
+            and user.token_expires_at - datetime.now(timezone.utc) < timedelta(seconds=self.settings.token_ttl / 2)
+        ):
+            await self.user_persistence_service.refresh_token(token=token, ttl=self.settings.token_ttl)
 
-        return await self.user_persistence_service.get_user_by_id(user_id=user_id)
+        return user
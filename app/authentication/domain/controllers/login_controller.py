@@ -1,12 +1,20 @@
 from hashlib import sha256
 
+from app.config import AuthenticationSettings, authentication_settings
 from app.authentication.domain.persistences.exceptions import WrongPasswordException, UsernameNotFoundException
 from app.authentication.domain.persistences.user_bo_interface import UserBOInterface
+from app.tracing import traced
 
 
+@traced("controller")
 class LoginController:
-    def __init__(self, user_persistence_service: UserBOInterface):
+    def __init__(
+        self,
+        user_persistence_service: UserBOInterface,
+        settings: AuthenticationSettings = authentication_settings
+    ):
         self.user_persistence_service = user_persistence_service
+        self.settings = settings
 
     async def __call__(self, username: str, password: str) -> str:
         user = await self.user_persistence_service.get_user_by_username(username=username)
@@ -18,7 +26,7 @@ class LoginController:
         hashed_stored_password = user.password
 
         if hashed_password == hashed_stored_password:
-            token = await self.user_persistence_service.create_token(user_id=user.id)
+            token = await self.user_persistence_service.create_token(user_id=user.id, ttl=self.settings.token_ttl)
 
             return token
 
@@ -1,10 +1,18 @@
+from typing import Callable
+
 from app.authentication.domain.persistences.exceptions import BadTokenException
 from app.authentication.domain.persistences.user_bo_interface import UserBOInterface
+from app.tracing import traced
 
 
+@traced("controller")
 class LogoutController:
     def __init__(self, user_persistence_service: UserBOInterface):
         self.user_persistence_service = user_persistence_service
+        self.token_revoked_listeners: list[Callable[[str], None]] = []
+
+    def add_token_revoked_listener(self, listener: Callable[[str], None]):
+        self.token_revoked_listeners.append(listener)
 
     async def __call__(self, token: str):
         try:
@@ -12,3 +20,6 @@ class LogoutController:
 
         except BadTokenException:
             raise BadTokenException
+
+        for listener in self.token_revoked_listeners:
+            listener(token)
@@ -3,8 +3,10 @@ from hashlib import sha256
 from app.authentication.domain.bo.user_bo import UserBO
 from app.authentication.domain.persistences.exceptions import UsernameAlreadyTakenException
 from app.authentication.domain.persistences.user_bo_interface import UserBOInterface
+from app.tracing import traced
 
 
+@traced("controller")
 class RegisterController:
     def __init__(self, user_persistence_service: UserBOInterface):
         self.user_persistence_service = user_persistence_service
@@ -18,13 +18,25 @@ class UserBOInterface(ABC):
         pass
 
     @abstractmethod
-    def create_token(self, user_id: int) -> str:
+    def create_token(self, user_id: int, ttl: float) -> str:
         pass
 
     @abstractmethod
     def get_user_id_by_token(self, token: str) -> Optional[int]:
         pass
 
+    @abstractmethod
+    def get_user_by_token(self, token: str) -> Optional[UserBO]:
+        pass
+
+    @abstractmethod
+    def refresh_token(self, token: str, ttl: float):
+        pass
+
     @abstractmethod
     def delete_token(self, token: str):
         pass
+
+    @abstractmethod
+    def purge_expired_tokens(self, limit: int) -> int:
+        pass
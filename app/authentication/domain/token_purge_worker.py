@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import AuthenticationSettings, authentication_settings
+from app.authentication.domain.persistences.user_bo_interface import UserBOInterface
+
+logger = logging.getLogger(__name__)
+
+
+class TokenPurgeWorker:
+    def __init__(
+        self,
+        user_persistence_service: UserBOInterface,
+        settings: AuthenticationSettings = authentication_settings
+    ):
+        self.user_persistence_service = user_persistence_service
+        self.settings = settings
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.task is not None:
+            return
+
+        self.task = asyncio.create_task(self.run())
+
+    async def close(self):
+        if self.task is None:
+            return
+
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
+
+    async def run(self):
+        while True:
+            try:
+                deleted = await self.user_persistence_service.purge_expired_tokens(
+                    limit=self.settings.token_purge_batch_size
+                )
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception:
+                logger.exception("Token purge failed")
+                deleted = 0
+
+            # A full batch means there is a backlog, which is drained one short batch after another.
+            if deleted < self.settings.token_purge_batch_size:
+                await asyncio.sleep(self.settings.token_purge_interval)
+            else:
+                await asyncio.sleep(0)
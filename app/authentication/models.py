@@ -4,7 +4,7 @@ from tortoise.models import Model
 
 class UserDB(Model):
     id = fields.IntField(pk=True)
-    username = fields.CharField(min_length=3, max_length=75)
+    username = fields.CharField(min_length=3, max_length=75, unique=True)
     password = fields.CharField(min_length=3, max_length=75)
     mail = fields.CharField(min_length=3, max_length=75)
     year_of_birth = fields.IntField(null=True)
@@ -12,5 +12,7 @@ class UserDB(Model):
 
 class TokenDB(Model):
     id = fields.IntField(pk=True)
-    token = fields.CharField(min_length=3, max_length=75)
-    user_id = fields.IntField()
+    token = fields.CharField(min_length=3, max_length=75, unique=True)
+    user = fields.ForeignKeyField("models.UserDB", related_name="tokens", on_delete=fields.CASCADE)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    expires_at = fields.DatetimeField(index=True)
@@ -1,60 +1,101 @@
+import heapq
+import time
+from datetime import datetime, timezone
 from typing import Optional
 import uuid
 
 from app.authentication.domain.bo.user_bo import UserBO
 from app.authentication.domain.persistences.exceptions import UsernameAlreadyTakenException, BadTokenException
 from app.authentication.domain.persistences.user_bo_interface import UserBOInterface
+from app.metrics import measured
 
 
+@measured
 class UserBOMemoryPersistenceService(UserBOInterface):
+    # Methods never await, so each one runs atomically on the event loop and needs no locks.
     def __init__(self):
-        self.users = {}
-        self.new_user_id = 0
-        self.tokens = {}
-
-    def is_username_taken(self, username: str) -> bool:
-        for user_id, user in self.users.items():
-            if user.username == username:
-                return True
-        return False
-
-    def create_user(self, user: UserBO):
-        if self.is_username_taken(user.username):
+        self.users: dict[int, UserBO] = {}
+        self.user_ids_by_username: dict[str, int] = {}
+        self.new_user_id = 1
+        # token -> (user id, expiry); the heap orders tokens by expiry for the purge and may hold
+        # outdated entries for refreshed or deleted tokens, which are skipped.
+        self.tokens: dict[str, tuple[int, float]] = {}
+        self.expirations: list[tuple[float, str]] = []
+
+    async def is_username_taken(self, username: str) -> bool:
+        return username in self.user_ids_by_username
+
+    async def create_user(self, user: UserBO):
+        if user.username in self.user_ids_by_username:
             raise UsernameAlreadyTakenException
 
         user.id = self.new_user_id
-        self.users[self.new_user_id] = user
+        self.users[user.id] = user.model_copy()
+        self.user_ids_by_username[user.username] = user.id
         self.new_user_id += 1
 
-    def get_user_by_username(self, username: str) -> Optional[UserBO]:
-        for _, user in self.users.items():
-            if user.username == username:
-                return user
-        return None
+    async def get_user_by_username(self, username: str) -> Optional[UserBO]:
+        if username not in self.user_ids_by_username:
+            return None
+
+        return self.users[self.user_ids_by_username[username]].model_copy()
 
-    def get_user_by_id(self, user_id: int) -> Optional[UserBO]:
+    async def get_user_by_id(self, user_id: int) -> Optional[UserBO]:
         if user_id not in self.users:
             return None
 
-        return self.users[user_id]
+        return self.users[user_id].model_copy()
 
-    def create_token(self, user_id: int) -> str:
+    async def create_token(self, user_id: int, ttl: float) -> str:
         token = str(uuid.uuid4())
         while token in self.tokens:
             token = str(uuid.uuid4())
 
-        self.tokens[token] = user_id
+        expires_at = time.time() + ttl
+        self.tokens[token] = (user_id, expires_at)
+        heapq.heappush(self.expirations, (expires_at, token))
 
         return token
 
-    def get_user_id_by_token(self, token: str) -> Optional[int]:
-        if token not in self.tokens:
+    async def get_user_id_by_token(self, token: str) -> Optional[int]:
+        if token not in self.tokens or self.tokens[token][1] <= time.time():
+            return None
+
+        return self.tokens[token][0]
+
+    async def get_user_by_token(self, token: str) -> Optional[UserBO]:
+        user_id = await self.get_user_id_by_token(token=token)
+        if user_id is None:
             return None
 
-        return self.tokens[token]
+        # Like the Postgres backend, introspection does not hand out the password hash.
+        return self.users[user_id].model_copy(update={
+            'password': '',
+            'token_expires_at': datetime.fromtimestamp(self.tokens[token][1], timezone.utc)
+        })
+
+    async def refresh_token(self, token: str, ttl: float):
+        now = time.time()
+        if token not in self.tokens or not now < self.tokens[token][1] < now + ttl / 2:
+            return
+
+        user_id, _ = self.tokens[token]
+        self.tokens[token] = (user_id, now + ttl)
+        heapq.heappush(self.expirations, (now + ttl, token))
 
-    def delete_token(self, token: str):
+    async def delete_token(self, token: str):
         if token not in self.tokens:
             raise BadTokenException
 
         del self.tokens[token]
+
+    async def purge_expired_tokens(self, limit: int) -> int:
+        now = time.time()
+        deleted = 0
+        while deleted < limit and len(self.expirations) > 0 and self.expirations[0][0] <= now:
+            expires_at, token = heapq.heappop(self.expirations)
+            if token in self.tokens and self.tokens[token][1] == expires_at:
+                del self.tokens[token]
+                deleted += 1
+
+        return deleted
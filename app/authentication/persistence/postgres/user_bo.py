@@ -1,27 +1,30 @@
 import uuid
+from datetime import timedelta
 from typing import Optional
+from tortoise import connections, timezone
 from tortoise.exceptions import DoesNotExist
 
+from app.database import read_connections
 from app.authentication.domain.bo.user_bo import UserBO
 from app.authentication.domain.persistences.exceptions import UsernameAlreadyTakenException, BadTokenException
 from app.authentication.domain.persistences.user_bo_interface import UserBOInterface
 from app.authentication.models import UserDB, TokenDB
+from app.metrics import measured
 
 
+@measured
 class UserBOPostgresPersistenceService(UserBOInterface):
     async def create_user(self, user: UserBO):
-        users = await UserDB.filter(**{"username": user.username})
-        if len(users) > 0:
-            raise UsernameAlreadyTakenException
-
-        new_user = await UserDB.create(
-            username=user.username,
-            password=user.password,
-            mail=user.mail,
-            year_of_birth=user.year_of_birth
+        # The unique index on username decides between concurrent registrations in one statement.
+        _, rows = await connections.get('default').execute_query(
+            'INSERT INTO "userdb" ("username", "password", "mail", "year_of_birth") VALUES ($1, $2, $3, $4) '
+            'ON CONFLICT ("username") DO NOTHING RETURNING "id"',
+            [user.username, user.password, user.mail, user.year_of_birth]
         )
+        if len(rows) == 0:
+            raise UsernameAlreadyTakenException
 
-        user.id = new_user.id
+        user.id = rows[0]['id']
 
     async def get_user_by_username(self, username: str) -> Optional[UserBO]:
         try:
@@ -53,27 +56,72 @@ class UserBOPostgresPersistenceService(UserBOInterface):
             year_of_birth=user.year_of_birth
         )
 
-    async def create_token(self, user_id: int) -> str:
-        token = str(uuid.uuid4())
-        token_db = await TokenDB.filter(**{'token': token})
-        while len(token_db) > 0:
+    async def create_token(self, user_id: int, ttl: float) -> str:
+        # A colliding uuid4 is practically impossible, so the unique index is checked on insert
+        # instead of with a lookup before every login.
+        expires_at = timezone.now() + timedelta(seconds=ttl)
+        while True:
             token = str(uuid.uuid4())
-            token_db = await TokenDB.filter(**{'token': token})
-
-        await TokenDB.create(token=token, user_id=user_id)
-
-        return token
+            _, rows = await connections.get('default').execute_query(
+                'INSERT INTO "tokendb" ("token", "user_id", "expires_at") VALUES ($1, $2, $3) '
+                'ON CONFLICT ("token") DO NOTHING RETURNING "id"',
+                [token, user_id, expires_at]
+            )
+            if len(rows) > 0:
+                return token
 
     async def get_user_id_by_token(self, token: str) -> Optional[int]:
-        db_result = await TokenDB.filter(**{"token": token})
+        db_result = await TokenDB.filter(**{"token": token, "expires_at__gt": timezone.now()})
         if len(db_result) == 0:
             return None
 
         return db_result[0].user_id
 
+    async def get_user_by_token(self, token: str) -> Optional[UserBO]:
+        for connection in read_connections():
+            user = await UserDB.filter(tokens__token=token, tokens__expires_at__gt=timezone.now()) \
+                .using_db(connection).first() \
+                .values("id", "username", "mail", "year_of_birth", token_expires_at="tokens__expires_at")
+            if user is not None:
+                break
+
+        else:
+            return None
+
+        # The password hash is not needed to introspect a token, so it is not selected.
+        return UserBO(
+            id=user["id"],
+            username=user["username"],
+            password='',
+            mail=user["mail"],
+            year_of_birth=user["year_of_birth"],
+            token_expires_at=user["token_expires_at"]
+        )
+
+    async def refresh_token(self, token: str, ttl: float):
+        # Introspection only calls this for tokens past half of their lifetime; the condition is
+        # repeated so a token refreshed meanwhile is not extended again.
+        now = timezone.now()
+        await TokenDB.filter(
+            token=token,
+            expires_at__gt=now,
+            expires_at__lt=now + timedelta(seconds=ttl / 2)
+        ).update(expires_at=now + timedelta(seconds=ttl))
+
     async def delete_token(self, token: str):
         db_result = await TokenDB.filter(**{"token": token})
         if len(db_result) == 0:
             raise BadTokenException
 
         await db_result[0].delete()
+
+    async def purge_expired_tokens(self, limit: int) -> int:
+        # Bounded batches keep each DELETE short; SKIP LOCKED lets several instances sweep at once.
+        deleted, _ = await connections.get('default').execute_query(
+            'DELETE FROM "tokendb" WHERE "id" IN ('
+            'SELECT "id" FROM "tokendb" WHERE "expires_at" <= $1 ORDER BY "expires_at" LIMIT $2 '
+            'FOR UPDATE SKIP LOCKED)',
+            [timezone.now(), limit]
+        )
+
+        return deleted
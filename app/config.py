@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,9 +11,138 @@ class PostgresSettings(BaseSettings):
     password: str
     host: str
     port: str
+    pool_min_size: int = 1
+    pool_max_size: int = 10
+    statement_cache_size: int = 100
+    # Seconds before a query is cancelled; unset leaves queries unbounded.
+    command_timeout: Optional[float] = None
+    max_inactive_connection_lifetime: float = 300.0
+    # A read-only replica serving file lookups and token introspection. Lookups that find nothing
+    # there are repeated on the primary, so rows written moments ago are still found while the
+    # replica lags; other reads may briefly return older data.
+    replica_host: Optional[str] = None
+    replica_port: Optional[int] = None
+    replica_pool_max_size: Optional[int] = None
+
+
+class PersistenceSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="PERSISTENCE_")
+
+    # "memory" keeps users, tokens and file metadata in the process instead of Postgres. Nothing
+    # survives a restart and every worker process has its own data, so it is meant for development
+    # and benchmarks run with a single worker.
+    backend: Literal["postgres", "memory"] = "postgres"
+
+
+class MetricsSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="METRICS_")
+
+    # Needed when several worker processes serve the app: each one writes its metrics there and
+    # /metrics reports all of them. Empty it before starting the workers.
+    multiprocess_directory: Optional[str] = None
+    flush_interval: float = 5.0
+
+
+class ProfilingSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="PROFILING_")
+
+    # Requests sent with an "X-Profile" header equal to this token are profiled; the header is
+    # ignored while it is unset.
+    token: Optional[str] = None
+    # Fraction of all requests profiled without being asked for, e.g. 0.001.
+    sample_rate: float = 0.0
+    directory: str = "profiles"
+
+
+class AuthenticationSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="AUTH_")
+
+    token_ttl: float = 24 * 60 * 60
+    # Extends a token to a full token_ttl when it is introspected after half of it has passed.
+    token_sliding_refresh: bool = False
+    token_purge_interval: float = 60.0
+    token_purge_batch_size: int = 1000
+
+
+class AuthenticationApiSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="AUTH_API_")
+
+    # "in_process" calls the authentication controllers directly; use "http" when the
+    # authentication and files services are deployed separately.
+    transport: Literal["in_process", "http"] = "in_process"
+    host: str = "0.0.0.0"
+    port: int = 80
+    pool_limit: int = 100
+    pool_limit_per_host: int = 0
+    keepalive_timeout: float = 30.0
+    connect_timeout: float = 2.0
+    read_timeout: float = 10.0
+    # Logouts invalidate cached tokens immediately in-process; across workers or split
+    # deployments a revoked token stays valid for at most cache_ttl seconds.
+    cache_max_size: int = 10000
+    cache_ttl: float = 30.0
+
+
+class FilesSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="FILES_")
+
+    # "local" keeps the files under storage_root; "s3" stores them as objects with the same keys.
+    storage_backend: Literal["local", "s3"] = "local"
+    storage_root: str = "files"
+    storage_shard_depth: int = 2
+    storage_shard_width: int = 2
+    upload_chunk_size: int = 1024 * 1024
+    fsync_uploads: bool = True
+    cache_control: str = "private, no-cache"
+    list_default_limit: int = 100
+    list_max_limit: int = 1000
+    list_stream_batch_size: int = 1000
+    batch_max_size: int = 1000
+    merge_workers: int = 2
+    merge_queue_depth: int = 8
+    merge_retry_after: int = 5
+    merge_max_sources: int = 50
+    merge_job_workers: int = 2
+    merge_job_poll_interval: float = 2.0
+    # Running jobs not updated for this long are assumed abandoned and claimed again.
+    merge_job_stale_after: float = 600.0
+    analysis_workers: int = 1
+    analysis_queue_size: int = 1000
+    analysis_backfill_batch_size: int = 1000
+    pages_cache_max_entries: int = 32
+    pages_cache_max_bytes: int = 256 * 1024 * 1024
+    pages_max_pages: int = 1000
+    pages_spool_size: int = 8 * 1024 * 1024
+    # Text search configuration of Postgres used for indexing and queries, e.g. "simple" or "english".
+    search_config: str = "simple"
+    # A tsvector is limited to 1 MB, so only the beginning of long documents is indexed.
+    search_max_text_chars: int = 200000
+    search_max_offset: int = 10000
+
+
+class S3Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="S3_")
+
+    endpoint_url: str = "http://localhost:9000"
+    region: str = "us-east-1"
+    bucket: str = "carlemany"
+    access_key_id: str = ""
+    secret_access_key: str = ""
+    part_size: int = 8 * 1024 * 1024
+    max_concurrency: int = 4
+    pool_limit: int = 100
+    connect_timeout: float = 2.0
+    read_timeout: float = 30.0
 
 
 postgres_settings = PostgresSettings()
+persistence_settings = PersistenceSettings()
+authentication_settings = AuthenticationSettings()
+metrics_settings = MetricsSettings()
+profiling_settings = ProfilingSettings()
+authentication_api_settings = AuthenticationApiSettings()
+files_settings = FilesSettings()
+s3_settings = S3Settings()
 
 DATABASE_URL = "postgres://{}:{}@{}:{}/{}".format(
     postgres_settings.username,
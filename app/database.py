@@ -1,11 +1,142 @@
-from app.config import DATABASE_URL, models
-
-TORTOISE_ORM = {
-    "connections": {"default": DATABASE_URL},
-    "apps": {
-        "models": {
-            "models": models,
-            "default_connection": "default",
+import time
+
+import asyncpg
+from tortoise import connections
+from tortoise.backends.asyncpg.client import AsyncpgDBClient
+
+from app.config import PostgresSettings, models, postgres_settings
+from app.tracing import span
+
+REPLICA = "replica"
+
+
+class MeasuredPool(asyncpg.Pool):
+    # Counts how long callers wait for a free connection, which shows when the pool is too small.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.acquires = 0
+        self.wait_seconds = 0.0
+
+    async def _acquire(self, timeout):
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            with span("pool.acquire", "db"):
+                return await super()._acquire(timeout)
+
+        finally:
+            self.waiting -= 1
+            self.acquires += 1
+            self.wait_seconds += time.perf_counter() - started
+
+
+class TracedConnection(asyncpg.Connection):
+    # The methods Tortoise runs its queries with, in and out of transactions.
+    async def execute(self, query: str, *args, **kwargs):
+        with span("execute", "db", query=query):
+            return await super().execute(query, *args, **kwargs)
+
+    async def executemany(self, command: str, args, **kwargs):
+        with span("executemany", "db", query=command, rows=len(args)):
+            return await super().executemany(command, args, **kwargs)
+
+    async def fetch(self, query: str, *args, **kwargs):
+        with span("fetch", "db", query=query) as span_args:
+            rows = await super().fetch(query, *args, **kwargs)
+            span_args["rows"] = len(rows)
+            return rows
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        with span("fetchrow", "db", query=query):
+            return await super().fetchrow(query, *args, **kwargs)
+
+
+class MeasuredAsyncpgDBClient(AsyncpgDBClient):
+    connection_class = TracedConnection
+
+    async def create_pool(self, **kwargs) -> asyncpg.Pool:
+        # The defaults of asyncpg.create_pool, which does not take a pool class.
+        options = {
+            'max_queries': 50000,
+            'max_inactive_connection_lifetime': 300.0,
+            'setup': None,
+            'init': None,
+            'record_class': asyncpg.Record,
+            **kwargs
+        }
+        return await MeasuredPool(None, **options)
+
+
+# Lets this module be used as the Tortoise engine of the connections below.
+client_class = MeasuredAsyncpgDBClient
+
+
+def connection_config(settings: PostgresSettings, replica: bool = False) -> dict:
+    max_size = settings.pool_max_size
+    if replica and settings.replica_pool_max_size is not None:
+        max_size = settings.replica_pool_max_size
+
+    return {
+        "engine": "app.database",
+        "credentials": {
+            "host": settings.replica_host if replica else settings.host,
+            "port": (settings.replica_port or settings.port) if replica else settings.port,
+            "user": settings.username,
+            "password": settings.password,
+            "database": settings.database,
+            "minsize": min(settings.pool_min_size, max_size),
+            "maxsize": max_size,
+            "statement_cache_size": settings.statement_cache_size,
+            "command_timeout": settings.command_timeout,
+            "max_inactive_connection_lifetime": settings.max_inactive_connection_lifetime
+        }
+    }
+
+
+def tortoise_config(settings: PostgresSettings) -> dict:
+    config = {
+        "connections": {"default": connection_config(settings)},
+        "apps": {
+            "models": {
+                "models": models,
+                "default_connection": "default",
+            },
         },
-    },
-}
+    }
+    if settings.replica_host is not None:
+        config["connections"][REPLICA] = connection_config(settings, replica=True)
+
+    return config
+
+
+TORTOISE_ORM = tortoise_config(postgres_settings)
+
+
+def read_connections() -> list:
+    # Replica first when there is one; callers move on to the primary when it finds nothing.
+    if REPLICA in TORTOISE_ORM["connections"]:
+        return [connections.get(REPLICA), connections.get("default")]
+
+    return [connections.get("default")]
+
+
+def pool_metrics() -> list[tuple[str, str, str, dict[str, str], float]]:
+    metrics = [
+        ("db_pool_size", "gauge", "Open connections in the pool.", lambda pool: pool.get_size()),
+        ("db_pool_max_size", "gauge", "Maximum connections in the pool.", lambda pool: pool.get_max_size()),
+        ("db_pool_in_use", "gauge", "Connections currently acquired.",
+         lambda pool: pool.get_size() - pool.get_idle_size()),
+        ("db_pool_waiting", "gauge", "Callers waiting for a free connection.", lambda pool: pool.waiting),
+        ("db_pool_acquires_total", "counter", "Connections acquired.", lambda pool: pool.acquires),
+        ("db_pool_acquire_wait_seconds_total", "counter", "Time spent waiting for a connection.",
+         lambda pool: pool.wait_seconds),
+    ]
+    samples = []
+    for name, kind, description, value in metrics:
+        for connection_name in TORTOISE_ORM["connections"]:
+            pool = connections.get(connection_name)._pool
+            if pool is not None:
+                samples.append((name, kind, description, {"connection": connection_name}, value(pool)))
+
+    return samples
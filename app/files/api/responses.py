@@ -0,0 +1,194 @@
+import os
+import stat
+import uuid
+from typing import Optional
+
+import anyio
+from fastapi.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+from app.files.domain.persistences.file_storage_interface import FileStorageInterface
+
+MAX_RANGES = 16
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    if if_none_match is None or etag is None:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    return '*' in candidates or etag in [candidate.removeprefix('W/') for candidate in candidates]
+
+
+def parse_range_header(range_header: str, size: int) -> Optional[list[tuple[int, int]]]:
+    # Returns inclusive (start, end) pairs, an empty list when nothing is satisfiable and None when
+    # the header is malformed or asks for too many ranges, in which case it must be ignored.
+    unit, _, specs = range_header.partition('=')
+    if unit.strip().lower() != 'bytes' or specs.strip() == '':
+        return None
+
+    ranges = []
+    for spec in specs.split(','):
+        first, dash, last = spec.strip().partition('-')
+        if dash == '' or not (first.isdigit() or first == '') or not (last.isdigit() or last == ''):
+            return None
+
+        if first == '':
+            if last == '':
+                return None
+            length = int(last)
+            if length == 0:
+                continue
+            start, end = max(size - length, 0), size - 1
+
+        else:
+            start = int(first)
+            end = size - 1 if last == '' else min(int(last), size - 1)
+            if last != '' and int(last) < start:
+                return None
+
+        if start < size and start <= end:
+            ranges.append((start, end))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    return ranges
+
+
+class RangedFileResponse(FileResponse):
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        filename: str,
+        size: int,
+        etag: Optional[str] = None,
+        ranges: Optional[list[tuple[int, int]]] = None,
+        cache_control: Optional[str] = None,
+        media_type: str = 'application/pdf',
+        method: Optional[str] = None
+    ):
+        self.size = size
+        self.etag = etag
+        self.ranges = ranges or []
+        self.boundary = uuid.uuid4().hex
+        self.part_headers = []
+        super().__init__(
+            path=path,
+            status_code=206 if self.ranges else 200,
+            media_type=media_type,
+            filename=filename,
+            method=method
+        )
+        self.headers['accept-ranges'] = 'bytes'
+        if etag is not None:
+            self.headers['etag'] = etag
+        if cache_control is not None:
+            self.headers['cache-control'] = cache_control
+
+        if len(self.ranges) == 1:
+            start, end = self.ranges[0]
+            self.headers['content-range'] = 'bytes {}-{}/{}'.format(start, end, size)
+            self.headers['content-length'] = str(end - start + 1)
+
+        elif len(self.ranges) > 1:
+            self.headers['content-type'] = 'multipart/byteranges; boundary=' + self.boundary
+            length = len(self.closing())
+            for start, end in self.ranges:
+                part_header = self.part_header(start, end)
+                self.part_headers.append(part_header)
+                length += len(part_header) + end - start + 1
+            self.headers['content-length'] = str(length)
+
+        else:
+            self.headers['content-length'] = str(size)
+
+    def part_header(self, start: int, end: int) -> bytes:
+        return (
+            '\r\n--{}\r\nContent-Type: {}\r\nContent-Range: bytes {}-{}/{}\r\n\r\n'.format(
+                self.boundary, self.media_type, start, end, self.size
+            )
+        ).encode('latin-1')
+
+    def closing(self) -> bytes:
+        return '\r\n--{}--\r\n'.format(self.boundary).encode('latin-1')
+
+    def set_stat_headers(self, stat_result: os.stat_result) -> None:
+        # Length and validators are computed from the stored size and digest instead.
+        pass
+
+    async def send_segment(self, scope: Scope, send: Send, file, start: int, end: int):
+        if 'http.response.zerocopysend' in scope.get('extensions', {}):
+            await send({
+                'type': 'http.response.zerocopysend',
+                'file': file.wrapped.fileno(),
+                'offset': start,
+                'count': end - start + 1,
+                'more_body': True
+            })
+            return
+
+        await file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await file.read(min(self.chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+
+        except FileNotFoundError:
+            raise RuntimeError(f"File at path {self.path} does not exist.")
+
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise RuntimeError(f"File at path {self.path} is not a file.")
+
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+
+        if self.send_header_only:
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            return
+
+        async with await anyio.open_file(self.path, mode='rb') as file:
+            await self.send_body(scope, send, file)
+
+    async def send_body(self, scope: Scope, send: Send, file):
+        if len(self.ranges) > 1:
+            for part_header, (start, end) in zip(self.part_headers, self.ranges):
+                await send({'type': 'http.response.body', 'body': part_header, 'more_body': True})
+                await self.send_segment(scope, send, file, start, end)
+            await send({'type': 'http.response.body', 'body': self.closing(), 'more_body': False})
+
+        else:
+            start, end = self.ranges[0] if self.ranges else (0, self.size - 1)
+            if end >= start:
+                await self.send_segment(scope, send, file, start, end)
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+
+class RangedStorageResponse(RangedFileResponse):
+    # Same headers and multipart framing, but the bytes are streamed from a storage backend with
+    # one ranged read per segment instead of being read from a local file.
+    def __init__(self, file_storage: FileStorageInterface, **kwargs):
+        self.file_storage = file_storage
+        super().__init__(**kwargs)
+
+    async def send_segment(self, scope: Scope, send: Send, file, start: int, end: int):
+        async for chunk in self.file_storage.read(path=self.path, start=start, end=end):
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+
+        if self.send_header_only:
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            return
+
+        await self.send_body(scope, send, None)
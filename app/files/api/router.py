@@ -1,16 +1,33 @@
-from fastapi import APIRouter, Body, UploadFile, File, Header, HTTPException
-from fastapi.responses import FileResponse
-import uuid
+import asyncio
+import json
+import os
+from typing import AsyncIterator, BinaryIO, Literal, Optional
+from urllib.parse import quote
+
+from fastapi import APIRouter, Body, UploadFile, File, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.files.dependency_injection.domain.delete_file_controllers import DeleteFileControllers
+from app.files.dependency_injection.domain.delete_files_controllers import DeleteFilesControllers
+from app.files.dependency_injection.domain.enqueue_merge_job_controllers import EnqueueMergeJobControllers
 from app.files.dependency_injection.domain.get_file_controllers import GetFileControllers
+from app.files.dependency_injection.domain.get_file_pages_controllers import GetFilePagesControllers
 from app.files.dependency_injection.domain.get_files_by_token_controllers import GetFilesByTokenControllers
+from app.files.dependency_injection.domain.get_job_controllers import GetJobControllers
 from app.files.dependency_injection.domain.merge_files_controllers import MergeFilesControllers
 from app.files.dependency_injection.domain.post_file_content_controllers import PostFileContentControllers
 from app.files.dependency_injection.domain.post_file_controllers import PostFileControllers
+from app.files.dependency_injection.domain.post_files_controllers import PostFilesControllers
+from app.files.dependency_injection.domain.search_files_controllers import SearchFilesControllers
+from app.files.dependency_injection.persistences.file_storages import FileStorages
 from app.files.domain.bo.file_bo import FileBO
-from app.files.domain.persistences.exceptions import BadTokenException, NotFoundException
+from app.files.domain.bo.job_bo import JobBO
+from app.files.domain.bo.merge_source_bo import MergeSourceBO
+from app.config import files_settings
+from app.files.api.responses import RangedFileResponse, RangedStorageResponse, etag_matches, parse_range_header
+from app.files.domain.persistences.exceptions import BadTokenException, NotFoundException, MergeQueueFullException, \
+    BadPageRangeException
 
 router = APIRouter()
 
@@ -23,17 +40,84 @@ class FileInput(BaseModel):
     number_of_pages: int
 
 
+class FilePage(BaseModel):
+    files: list[dict]
+    next_cursor: Optional[int] = None
+
+
+async def stream_json_array(items: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    separator = b'['
+    async for item in items:
+        yield separator + json.dumps(item).encode()
+        separator = b','
+
+    yield b'[]' if separator == b'[' else b']'
+
+
 @router.get("/")
-async def get_files(auth: str = Header()) -> list[FileBO]:
+async def get_files(
+    auth: str = Header(),
+    after_id: Optional[int] = Query(default=None),
+    limit: Optional[int] = Query(default=None, ge=1, le=files_settings.list_max_limit),
+    order: Literal['asc', 'desc'] = Query(default='asc'),
+    fields: Optional[str] = Query(default=None),
+    stream: bool = Query(default=False)
+) -> FilePage:
+    selected_fields = None
+    if fields is not None:
+        selected_fields = [field.strip() for field in fields.split(',') if field.strip() != '']
+        unknown_fields = set(selected_fields) - set(FileBO.model_fields)
+        if unknown_fields:
+            raise HTTPException(status_code=400, detail='Unknown fields: ' + ', '.join(sorted(unknown_fields)))
+
+        # The id is always returned because it is the pagination cursor.
+        if 'id' not in selected_fields:
+            selected_fields.insert(0, 'id')
+
     get_files_by_token_controller = GetFilesByTokenControllers.carlemany()
 
     try:
-        result = await get_files_by_token_controller(token=auth)
+        # Without limit or after_id the response keeps the original shape, an array of every
+        # file, which is streamed in batches instead of being built in memory.
+        if stream or (limit is None and after_id is None):
+            items = await get_files_by_token_controller.stream(
+                token=auth,
+                batch_size=files_settings.list_stream_batch_size,
+                descending=order == 'desc',
+                fields=selected_fields
+            )
+            return StreamingResponse(stream_json_array(items), media_type='application/json')
+
+        result, next_cursor = await get_files_by_token_controller(
+            token=auth,
+            limit=limit if limit is not None else files_settings.list_default_limit,
+            after_id=after_id,
+            descending=order == 'desc',
+            fields=selected_fields
+        )
 
     except BadTokenException:
         raise HTTPException(status_code=403, detail='Forbidden')
 
-    return result
+    return FilePage(files=result, next_cursor=next_cursor)
+
+
+@router.get("/search")
+async def search_files(
+    auth: str = Header(),
+    q: str = Query(min_length=1, max_length=1000),
+    limit: int = Query(default=files_settings.list_default_limit, ge=1, le=files_settings.list_max_limit),
+    offset: int = Query(default=0, ge=0, le=files_settings.search_max_offset)
+) -> FilePage:
+    # Results are ordered by rank, so the next cursor is an offset rather than an id.
+    search_files_controller = SearchFilesControllers.carlemany()
+    try:
+        result, next_cursor = await search_files_controller(query=q, token=auth, limit=limit, offset=offset)
+
+    except BadTokenException:
+        raise HTTPException(status_code=403, detail='Forbidden')
+
+    return FilePage(files=result, next_cursor=next_cursor)
 
 
 @router.post("/")
@@ -60,20 +144,136 @@ async def post_file(
     return result
 
 
+def check_batch_size(size: int):
+    if size == 0 or size > files_settings.batch_max_size:
+        raise HTTPException(
+            status_code=400,
+            detail='Between 1 and {} files can be sent in a batch'.format(files_settings.batch_max_size)
+        )
+
+
+def check_merge_sources(size: int):
+    if size == 0 or size > files_settings.merge_max_sources:
+        raise HTTPException(
+            status_code=400,
+            detail='Between 1 and {} files can be merged'.format(files_settings.merge_max_sources)
+        )
+
+
+@router.post("/batch")
+async def post_files(
+    data_input: list[FileInput] = Body(),
+    auth: str = Header()
+) -> list[FileBO]:
+    check_batch_size(len(data_input))
+
+    files = [
+        FileBO(
+            filename=item.filename,
+            path='',
+            owner=-1,
+            desc=item.desc,
+            number_of_pages=item.number_of_pages
+        )
+        for item in data_input
+    ]
+
+    post_files_controller = PostFilesControllers.carlemany()
+    try:
+        result = await post_files_controller(token=auth, files=files)
+
+    except BadTokenException:
+        raise HTTPException(status_code=403, detail='Forbidden')
+
+    return result
+
+
+class DeleteBatchInput(BaseModel):
+    ids: list[int]
+
+
+@router.delete("/batch")
+async def delete_files(
+    input_data: DeleteBatchInput = Body(),
+    auth: str = Header()
+) -> dict[str, list[dict]]:
+    check_batch_size(len(input_data.ids))
+
+    delete_files_controller = DeleteFilesControllers.carlemany()
+    try:
+        results = await delete_files_controller(file_ids=input_data.ids, token=auth)
+
+    except BadTokenException:
+        raise HTTPException(status_code=403, detail='Forbidden')
+
+    return {"results": [{"file_id": file_id, "status": status} for file_id, status in results.items()]}
+
+
 class MergeInput(BaseModel):
     file_id1: int
     file_id2: int
 
 
+async def run_merge(sources: list[MergeSourceBO], auth: str) -> dict[str, int]:
+    merge_files_controller = MergeFilesControllers.carlemany()
+
+    try:
+        new_file_id = await merge_files_controller(sources=sources, token=auth)
+
+    except BadTokenException:
+        raise HTTPException(status_code=403, detail='Forbidden')
+
+    except NotFoundException:
+        raise HTTPException(status_code=404, detail='Not found')
+
+    except BadPageRangeException:
+        raise HTTPException(status_code=400, detail='Page range out of bounds')
+
+    except MergeQueueFullException:
+        raise HTTPException(
+            status_code=503,
+            detail='Too many merges in progress',
+            headers={'Retry-After': str(files_settings.merge_retry_after)}
+        )
+
+    return {"file_id": new_file_id}
+
+
 @router.post("/merge")
 async def merge_files(
     input_data: MergeInput = Body(),
     auth: str = Header()
 ) -> dict[str, int]:
-    merge_files_controller = MergeFilesControllers.carlemany()
+    sources = [MergeSourceBO(file_id=input_data.file_id1), MergeSourceBO(file_id=input_data.file_id2)]
+
+    return await run_merge(sources=sources, auth=auth)
+
+
+class MergeManyInput(BaseModel):
+    files: list[MergeSourceBO]
+
+
+@router.post("/merge/many")
+async def merge_many_files(
+    input_data: MergeManyInput = Body(),
+    auth: str = Header()
+) -> dict[str, int]:
+    check_merge_sources(len(input_data.files))
+
+    return await run_merge(sources=input_data.files, auth=auth)
+
+
+@router.post("/jobs/merge")
+async def enqueue_merge_job(
+    input_data: MergeManyInput = Body(),
+    auth: str = Header()
+) -> dict[str, int]:
+    check_merge_sources(len(input_data.files))
+
+    enqueue_merge_job_controller = EnqueueMergeJobControllers.carlemany()
 
     try:
-        new_file_id = await merge_files_controller(file_id1=input_data.file_id1, file_id2=input_data.file_id2, token=auth)
+        job = await enqueue_merge_job_controller(sources=input_data.files, token=auth)
 
     except BadTokenException:
         raise HTTPException(status_code=403, detail='Forbidden')
@@ -81,7 +281,24 @@ async def merge_files(
     except NotFoundException:
         raise HTTPException(status_code=404, detail='Not found')
 
-    return {"file_id": new_file_id}
+    return {"job_id": job.id}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_by_id(
+    job_id: int,
+    auth: str = Header()
+) -> JobBO:
+    get_job_controller = GetJobControllers.carlemany()
+
+    try:
+        return await get_job_controller(job_id=job_id, token=auth)
+
+    except NotFoundException:
+        raise HTTPException(status_code=404, detail='Not found')
+
+    except BadTokenException:
+        raise HTTPException(status_code=403, detail='Forbidden')
 
 
 @router.post("/{file_id}")
@@ -102,11 +319,65 @@ async def post_file_by_id(
         raise HTTPException(status_code=403, detail='Forbidden')
 
 
+async def iterate_file(file: BinaryIO, chunk_size: int) -> AsyncIterator[bytes]:
+    try:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            yield chunk
+
+    finally:
+        file.close()
+
+
+@router.get("/{file_id}/pages")
+async def get_file_pages(
+    file_id: int,
+    auth: str = Header(),
+    selection: str = Query(alias='range', min_length=1, max_length=1000)
+) -> StreamingResponse:
+    get_file_pages_controller = GetFilePagesControllers.carlemany()
+
+    try:
+        filename, output = await get_file_pages_controller(file_id=file_id, selection=selection, token=auth)
+
+    except NotFoundException:
+        raise HTTPException(status_code=404, detail='Not found')
+
+    except BadTokenException:
+        raise HTTPException(status_code=403, detail='Forbidden')
+
+    except BadPageRangeException:
+        raise HTTPException(status_code=400, detail='Page range out of bounds')
+
+    size = output.seek(0, os.SEEK_END)
+    output.seek(0)
+
+    # Same Content-Disposition as FileResponse.
+    quoted_filename = quote(filename)
+    if quoted_filename != filename:
+        content_disposition = "attachment; filename*=utf-8''" + quoted_filename
+    else:
+        content_disposition = 'attachment; filename="{}"'.format(filename)
+
+    return StreamingResponse(
+        iterate_file(output, files_settings.upload_chunk_size),
+        media_type='application/pdf',
+        headers={
+            'content-length': str(size),
+            'content-disposition': content_disposition,
+            'cache-control': files_settings.cache_control
+        }
+    )
+
+
 @router.get("/{file_id}")
 async def get_file_by_id(
     file_id: str,
-    auth: str = Header()
-) -> FileResponse:
+    request: Request,
+    auth: str = Header(),
+    if_none_match: Optional[str] = Header(default=None),
+    if_range: Optional[str] = Header(default=None),
+    range_header: Optional[str] = Header(default=None, alias='range')
+) -> Response:
     get_file_controller = GetFileControllers.carlemany()
 
     try:
@@ -118,10 +389,52 @@ async def get_file_by_id(
     except BadTokenException:
         raise HTTPException(status_code=403, detail='Forbidden')
 
-    return FileResponse(
+    if file.path == '':
+        raise HTTPException(status_code=404, detail='Not found')
+
+    etag = None if file.digest is None else '"' + file.digest + '"'
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=304,
+            headers={'etag': etag, 'cache-control': files_settings.cache_control}
+        )
+
+    file_storage = FileStorages.carlemany()
+    size = file.size
+    if size is None:
+        try:
+            size = await file_storage.size(path=file.path)
+
+        except NotFoundException:
+            raise HTTPException(status_code=404, detail='Not found')
+
+    ranges = None
+    if range_header is not None and (if_range is None or (etag is not None and if_range == etag)):
+        ranges = parse_range_header(range_header, size)
+        if ranges == []:
+            return Response(status_code=416, headers={'content-range': 'bytes */{}'.format(size)})
+
+    local_path = file_storage.local_path(path=file.path)
+    if local_path is not None:
+        return RangedFileResponse(
+            path=local_path,
+            filename=file.filename,
+            size=size,
+            etag=etag,
+            ranges=ranges,
+            cache_control=files_settings.cache_control,
+            method=request.method
+        )
+
+    return RangedStorageResponse(
+        file_storage=file_storage,
         path=file.path,
         filename=file.filename,
-        media_type='application/pdf'
+        size=size,
+        etag=etag,
+        ranges=ranges,
+        cache_control=files_settings.cache_control,
+        method=request.method
     )
 
 
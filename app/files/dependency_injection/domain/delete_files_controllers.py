@@ -0,0 +1,17 @@
+from dependency_injector import containers, providers
+
+from app.files.domain.controllers.delete_files_controller import DeleteFilesController
+from app.files.dependency_injection.external.authentication_apis import AuthenticationApis
+from app.files.dependency_injection.persistences.file_bo_persistences import FileBOPersistences
+from app.files.dependency_injection.persistences.file_storages import FileStorages
+from app.files.dependency_injection.persistences.merge_cache_persistences import MergeCachePersistences
+
+
+class DeleteFilesControllers(containers.DeclarativeContainer):
+    carlemany = providers.Singleton(
+        DeleteFilesController,
+        file_persistence_service=FileBOPersistences.carlemany(),
+        authentication_api=AuthenticationApis.carlemany(),
+        file_storage=FileStorages.carlemany(),
+        merge_cache_service=MergeCachePersistences.carlemany()
+    )
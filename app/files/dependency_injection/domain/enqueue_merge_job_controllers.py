@@ -0,0 +1,17 @@
+from dependency_injector import containers, providers
+
+from app.files.domain.controllers.enqueue_merge_job_controller import EnqueueMergeJobController
+from app.files.dependency_injection.domain.merge_files_controllers import MergeFilesControllers
+from app.files.dependency_injection.external.authentication_apis import AuthenticationApis
+from app.files.dependency_injection.persistences.job_bo_persistences import JobBOPersistences
+from app.files.dependency_injection.workers.merge_job_workers import MergeJobWorkers
+
+
+class EnqueueMergeJobControllers(containers.DeclarativeContainer):
+    carlemany = providers.Singleton(
+        EnqueueMergeJobController,
+        job_persistence_service=JobBOPersistences.carlemany(),
+        merge_files_controller=MergeFilesControllers.carlemany(),
+        merge_job_worker=MergeJobWorkers.carlemany(),
+        authentication_api=AuthenticationApis.carlemany()
+    )
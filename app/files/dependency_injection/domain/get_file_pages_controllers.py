@@ -0,0 +1,24 @@
+from dependency_injector import containers, providers
+
+from app.config import files_settings
+from app.files.domain.controllers.get_file_pages_controller import GetFilePagesController
+from app.files.domain.pdf_reader_cache import PdfReaderCache
+from app.files.dependency_injection.external.authentication_apis import AuthenticationApis
+from app.files.dependency_injection.persistences.file_bo_persistences import FileBOPersistences
+from app.files.dependency_injection.persistences.file_storages import FileStorages
+from app.files.dependency_injection.persistences.pdf_analysis_persistences import PdfAnalysisPersistences
+
+
+class GetFilePagesControllers(containers.DeclarativeContainer):
+    carlemany = providers.Singleton(
+        GetFilePagesController,
+        file_persistence_service=FileBOPersistences.carlemany(),
+        authentication_api=AuthenticationApis.carlemany(),
+        file_storage=FileStorages.carlemany(),
+        pdf_analysis_service=PdfAnalysisPersistences.carlemany(),
+        reader_cache=providers.Singleton(
+            PdfReaderCache,
+            max_entries=files_settings.pages_cache_max_entries,
+            max_bytes=files_settings.pages_cache_max_bytes
+        )
+    )
@@ -1,11 +1,13 @@
 from dependency_injector import containers, providers
 
 from app.files.domain.controllers.get_files_by_token_controller import GetFilesByTokenController
+from app.files.dependency_injection.external.authentication_apis import AuthenticationApis
 from app.files.dependency_injection.persistences.file_bo_persistences import FileBOPersistences
 
 
 class GetFilesByTokenControllers(containers.DeclarativeContainer):
     carlemany = providers.Singleton(
         GetFilesByTokenController,
-        file_persistence_service=FileBOPersistences.carlemany()
+        file_persistence_service=FileBOPersistences.carlemany(),
+        authentication_api=AuthenticationApis.carlemany()
     )
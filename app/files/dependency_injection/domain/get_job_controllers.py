@@ -0,0 +1,13 @@
+from dependency_injector import containers, providers
+
+from app.files.domain.controllers.get_job_controller import GetJobController
+from app.files.dependency_injection.external.authentication_apis import AuthenticationApis
+from app.files.dependency_injection.persistences.job_bo_persistences import JobBOPersistences
+
+
+class GetJobControllers(containers.DeclarativeContainer):
+    carlemany = providers.Singleton(
+        GetJobController,
+        job_persistence_service=JobBOPersistences.carlemany(),
+        authentication_api=AuthenticationApis.carlemany()
+    )
@@ -1,11 +1,23 @@
 from dependency_injector import containers, providers
 
 from app.files.domain.controllers.merge_files_controller import MergeFilesController
+from app.files.dependency_injection.external.authentication_apis import AuthenticationApis
 from app.files.dependency_injection.persistences.file_bo_persistences import FileBOPersistences
+from app.files.dependency_injection.persistences.file_storages import FileStorages
+from app.files.dependency_injection.persistences.merge_cache_persistences import MergeCachePersistences
+from app.files.dependency_injection.persistences.pdf_analysis_persistences import PdfAnalysisPersistences
+from app.files.dependency_injection.workers.merge_executors import MergeExecutors
+from app.files.dependency_injection.workers.pdf_analysis_workers import PdfAnalysisWorkers
 
 
 class MergeFilesControllers(containers.DeclarativeContainer):
     carlemany = providers.Singleton(
         MergeFilesController,
-        file_persistence_service=FileBOPersistences.carlemany()
+        file_persistence_service=FileBOPersistences.carlemany(),
+        authentication_api=AuthenticationApis.carlemany(),
+        file_storage=FileStorages.carlemany(),
+        merge_executor=MergeExecutors.carlemany(),
+        merge_cache_service=MergeCachePersistences.carlemany(),
+        pdf_analysis_service=PdfAnalysisPersistences.carlemany(),
+        pdf_analysis_worker=PdfAnalysisWorkers.carlemany()
     )
@@ -0,0 +1,13 @@
+from dependency_injector import containers, providers
+
+from app.files.domain.controllers.post_files_controller import PostFilesController
+from app.files.dependency_injection.external.authentication_apis import AuthenticationApis
+from app.files.dependency_injection.persistences.file_bo_persistences import FileBOPersistences
+
+
+class PostFilesControllers(containers.DeclarativeContainer):
+    carlemany = providers.Singleton(
+        PostFilesController,
+        file_persistence_service=FileBOPersistences.carlemany(),
+        authentication_api=AuthenticationApis.carlemany()
+    )
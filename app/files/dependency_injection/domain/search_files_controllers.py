@@ -0,0 +1,13 @@
+from dependency_injector import containers, providers
+
+from app.files.domain.controllers.search_files_controller import SearchFilesController
+from app.files.dependency_injection.external.authentication_apis import AuthenticationApis
+from app.files.dependency_injection.persistences.file_search_persistences import FileSearchPersistences
+
+
+class SearchFilesControllers(containers.DeclarativeContainer):
+    carlemany = providers.Singleton(
+        SearchFilesController,
+        file_search_service=FileSearchPersistences.carlemany(),
+        authentication_api=AuthenticationApis.carlemany()
+    )
@@ -0,0 +1,33 @@
+from dependency_injector import containers, providers
+
+from app.config import authentication_api_settings
+from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.files.external.authentication.introspection_cache import IntrospectionCache
+from app.files.external.authentication.transports.http import HttpIntrospectionTransport
+from app.files.external.authentication.transports.in_process import InProcessIntrospectionTransport
+
+
+class AuthenticationApis(containers.DeclarativeContainer):
+    http = providers.Singleton(
+        AuthenticationApi,
+        transport=providers.Singleton(HttpIntrospectionTransport),
+        cache=providers.Factory(
+            IntrospectionCache,
+            max_size=authentication_api_settings.cache_max_size,
+            ttl=authentication_api_settings.cache_ttl
+        )
+    )
+    in_process = providers.Singleton(
+        AuthenticationApi,
+        transport=providers.Singleton(InProcessIntrospectionTransport),
+        cache=providers.Factory(
+            IntrospectionCache,
+            max_size=authentication_api_settings.cache_max_size,
+            ttl=authentication_api_settings.cache_ttl
+        )
+    )
+    carlemany = providers.Selector(
+        lambda: authentication_api_settings.transport,
+        http=http,
+        in_process=in_process
+    )
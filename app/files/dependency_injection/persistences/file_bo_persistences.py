@@ -1,7 +1,15 @@
 from dependency_injector import containers, providers
+
+from app.config import persistence_settings
+from app.files.persistence.memory.file_bo import FileBOMemoryPersistenceService
 from app.files.persistence.postgres.file_bo import FileBOPostgresPersistenceService
 
 
 class FileBOPersistences(containers.DeclarativeContainer):
     postgres = providers.Singleton(FileBOPostgresPersistenceService)
-    carlemany = postgres
+    memory = providers.Singleton(FileBOMemoryPersistenceService)
+    carlemany = providers.Selector(
+        lambda: persistence_settings.backend,
+        postgres=postgres,
+        memory=memory
+    )
@@ -0,0 +1,19 @@
+from dependency_injector import containers, providers
+
+from app.config import persistence_settings
+from app.files.dependency_injection.persistences.file_bo_persistences import FileBOPersistences
+from app.files.persistence.memory.file_search import FileSearchMemoryPersistenceService
+from app.files.persistence.postgres.file_search import FileSearchPostgresPersistenceService
+
+
+class FileSearchPersistences(containers.DeclarativeContainer):
+    postgres = providers.Singleton(FileSearchPostgresPersistenceService)
+    memory = providers.Singleton(
+        FileSearchMemoryPersistenceService,
+        file_persistence_service=FileBOPersistences.memory
+    )
+    carlemany = providers.Selector(
+        lambda: persistence_settings.backend,
+        postgres=postgres,
+        memory=memory
+    )
@@ -0,0 +1,19 @@
+from dependency_injector import containers, providers
+
+from app.config import files_settings
+from app.files.persistence.local.file_storage import FileStorageLocalPersistenceService
+from app.files.persistence.s3.file_storage import FileStorageS3PersistenceService
+
+
+class FileStorages(containers.DeclarativeContainer):
+    local = providers.Singleton(
+        FileStorageLocalPersistenceService,
+        chunk_size=files_settings.upload_chunk_size,
+        fsync=files_settings.fsync_uploads
+    )
+    s3 = providers.Singleton(FileStorageS3PersistenceService)
+    carlemany = providers.Selector(
+        lambda: files_settings.storage_backend,
+        local=local,
+        s3=s3
+    )
@@ -0,0 +1,15 @@
+from dependency_injector import containers, providers
+
+from app.config import persistence_settings
+from app.files.persistence.memory.job_bo import JobBOMemoryPersistenceService
+from app.files.persistence.postgres.job_bo import JobBOPostgresPersistenceService
+
+
+class JobBOPersistences(containers.DeclarativeContainer):
+    postgres = providers.Singleton(JobBOPostgresPersistenceService)
+    memory = providers.Singleton(JobBOMemoryPersistenceService)
+    carlemany = providers.Selector(
+        lambda: persistence_settings.backend,
+        postgres=postgres,
+        memory=memory
+    )
@@ -0,0 +1,19 @@
+from dependency_injector import containers, providers
+
+from app.config import persistence_settings
+from app.files.dependency_injection.persistences.file_bo_persistences import FileBOPersistences
+from app.files.persistence.memory.merge_cache import MergeCacheMemoryPersistenceService
+from app.files.persistence.postgres.merge_cache import MergeCachePostgresPersistenceService
+
+
+class MergeCachePersistences(containers.DeclarativeContainer):
+    postgres = providers.Singleton(MergeCachePostgresPersistenceService)
+    memory = providers.Singleton(
+        MergeCacheMemoryPersistenceService,
+        file_persistence_service=FileBOPersistences.memory
+    )
+    carlemany = providers.Selector(
+        lambda: persistence_settings.backend,
+        postgres=postgres,
+        memory=memory
+    )
@@ -0,0 +1,15 @@
+from dependency_injector import containers, providers
+
+from app.config import persistence_settings
+from app.files.persistence.memory.pdf_analysis import PdfAnalysisMemoryPersistenceService
+from app.files.persistence.postgres.pdf_analysis import PdfAnalysisPostgresPersistenceService
+
+
+class PdfAnalysisPersistences(containers.DeclarativeContainer):
+    postgres = providers.Singleton(PdfAnalysisPostgresPersistenceService)
+    memory = providers.Singleton(PdfAnalysisMemoryPersistenceService)
+    carlemany = providers.Selector(
+        lambda: persistence_settings.backend,
+        postgres=postgres,
+        memory=memory
+    )
@@ -0,0 +1,8 @@
+from dependency_injector import containers, providers
+
+from app.files.domain.merge_executor import MergeExecutor
+
+
+class MergeExecutors(containers.DeclarativeContainer):
+    process_pool = providers.Singleton(MergeExecutor)
+    carlemany = process_pool
@@ -0,0 +1,13 @@
+from dependency_injector import containers, providers
+
+from app.files.dependency_injection.domain.merge_files_controllers import MergeFilesControllers
+from app.files.dependency_injection.persistences.job_bo_persistences import JobBOPersistences
+from app.files.domain.merge_job_worker import MergeJobWorker
+
+
+class MergeJobWorkers(containers.DeclarativeContainer):
+    carlemany = providers.Singleton(
+        MergeJobWorker,
+        job_persistence_service=JobBOPersistences.carlemany(),
+        merge_files_controller=MergeFilesControllers.carlemany()
+    )
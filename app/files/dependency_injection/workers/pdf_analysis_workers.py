@@ -0,0 +1,19 @@
+from dependency_injector import containers, providers
+
+from app.files.dependency_injection.persistences.file_bo_persistences import FileBOPersistences
+from app.files.dependency_injection.persistences.file_search_persistences import FileSearchPersistences
+from app.files.dependency_injection.persistences.file_storages import FileStorages
+from app.files.dependency_injection.persistences.pdf_analysis_persistences import PdfAnalysisPersistences
+from app.files.dependency_injection.workers.merge_executors import MergeExecutors
+from app.files.domain.pdf_analysis_worker import PdfAnalysisWorker
+
+
+class PdfAnalysisWorkers(containers.DeclarativeContainer):
+    carlemany = providers.Singleton(
+        PdfAnalysisWorker,
+        file_persistence_service=FileBOPersistences.carlemany(),
+        pdf_analysis_service=PdfAnalysisPersistences.carlemany(),
+        file_search_service=FileSearchPersistences.carlemany(),
+        file_storage=FileStorages.carlemany(),
+        merge_executor=MergeExecutors.carlemany()
+    )
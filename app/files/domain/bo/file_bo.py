@@ -9,3 +9,5 @@ class FileBO(BaseModel):
     owner: int
     desc: str
     number_of_pages: int
+    digest: Optional[str] = None
+    size: Optional[int] = None
@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import BaseModel
+
+from app.files.domain.bo.merge_source_bo import MergeSourceBO
+
+
+class JobBO(BaseModel):
+    id: Optional[int] = None
+    owner: int
+    status: str
+    sources: list[MergeSourceBO]
+    file_id: Optional[int] = None
+    error: Optional[str] = None
@@ -0,0 +1,11 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class MergeCacheBO(BaseModel):
+    id: Optional[int] = None
+    key: str
+    path: str
+    number_of_pages: int
+    digest: str
+    size: int
@@ -0,0 +1,8 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class MergeSourceBO(BaseModel):
+    file_id: int
+    first_page: Optional[int] = Field(default=None, ge=1)
+    last_page: Optional[int] = Field(default=None, ge=1)
@@ -0,0 +1,11 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class PdfAnalysisBO(BaseModel):
+    id: Optional[int] = None
+    digest: str
+    pdf_version: Optional[str] = None
+    encrypted: bool = False
+    number_of_pages: Optional[int] = None
+    error: Optional[str] = None
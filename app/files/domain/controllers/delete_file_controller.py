@@ -1,18 +1,28 @@
-import os
-
 from app.files.domain.persistences.exceptions import BadTokenException, NotFoundException
 from app.files.domain.persistences.file_bo_interface import FileBOInterface
+from app.files.domain.persistences.file_storage_interface import FileStorageInterface
+from app.files.domain.persistences.merge_cache_interface import MergeCacheInterface
 from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.tracing import traced
 
 
+@traced("controller")
 class DeleteFileController:
-    def __init__(self, file_persistence_service: FileBOInterface):
+    def __init__(
+        self,
+        file_persistence_service: FileBOInterface,
+        authentication_api: AuthenticationApi,
+        file_storage: FileStorageInterface,
+        merge_cache_service: MergeCacheInterface
+    ):
         self.file_persistence_service = file_persistence_service
+        self.authentication_api = authentication_api
+        self.file_storage = file_storage
+        self.merge_cache_service = merge_cache_service
 
     async def __call__(self, file_id: int, token: str):
-        auth_api = AuthenticationApi()
         try:
-            user = await auth_api.auth_check(auth=token)
+            user = await self.authentication_api.auth_check(auth=token)
 
         except BadTokenException:
             raise BadTokenException
@@ -26,5 +36,9 @@ class DeleteFileController:
         except BadTokenException:
             raise BadTokenException
 
-        if path != '':
-            os.remove(path)
+        if path == '':
+            return
+
+        # Cached merge outputs are shared between rows, so they are only evicted with the last one.
+        for released_path in await self.merge_cache_service.release_paths(paths=[path]):
+            await self.file_storage.delete(path=released_path)
@@ -0,0 +1,44 @@
+import asyncio
+
+from app.files.domain.persistences.exceptions import BadTokenException
+from app.files.domain.persistences.file_bo_interface import FileBOInterface
+from app.files.domain.persistences.file_storage_interface import FileStorageInterface
+from app.files.domain.persistences.merge_cache_interface import MergeCacheInterface
+from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.tracing import traced
+
+
+@traced("controller")
+class DeleteFilesController:
+    def __init__(
+        self,
+        file_persistence_service: FileBOInterface,
+        authentication_api: AuthenticationApi,
+        file_storage: FileStorageInterface,
+        merge_cache_service: MergeCacheInterface
+    ):
+        self.file_persistence_service = file_persistence_service
+        self.authentication_api = authentication_api
+        self.file_storage = file_storage
+        self.merge_cache_service = merge_cache_service
+
+    async def __call__(self, file_ids: list[int], token: str) -> dict[int, str]:
+        try:
+            user = await self.authentication_api.auth_check(auth=token)
+
+        except BadTokenException:
+            raise BadTokenException
+
+        deleted = await self.file_persistence_service.delete_files(file_ids=file_ids, owner=user['id'])
+
+        # Ids that are missing or owned by someone else are reported the same way, as in GET /files/{id}.
+        results = {}
+        for file_id in file_ids:
+            results[file_id] = 'deleted' if file_id in deleted else 'not_found'
+
+        paths = await self.merge_cache_service.release_paths(
+            paths=list({path for path in deleted.values() if path != ''})
+        )
+        await asyncio.gather(*[self.file_storage.delete(path=path) for path in paths])
+
+        return results
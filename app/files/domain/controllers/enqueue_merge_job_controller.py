@@ -0,0 +1,45 @@
+from app.files.domain.bo.job_bo import JobBO
+from app.files.domain.bo.merge_source_bo import MergeSourceBO
+from app.files.domain.controllers.merge_files_controller import MergeFilesController
+from app.files.domain.merge_job_worker import MergeJobWorker
+from app.files.domain.persistences.exceptions import BadTokenException, NotFoundException
+from app.files.domain.persistences.job_bo_interface import JobBOInterface
+from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.tracing import traced
+
+
+@traced("controller")
+class EnqueueMergeJobController:
+    def __init__(
+        self,
+        job_persistence_service: JobBOInterface,
+        merge_files_controller: MergeFilesController,
+        merge_job_worker: MergeJobWorker,
+        authentication_api: AuthenticationApi
+    ):
+        self.job_persistence_service = job_persistence_service
+        self.merge_files_controller = merge_files_controller
+        self.merge_job_worker = merge_job_worker
+        self.authentication_api = authentication_api
+
+    async def __call__(self, sources: list[MergeSourceBO], token: str) -> JobBO:
+        try:
+            user = await self.authentication_api.auth_check(auth=token)
+
+        except BadTokenException:
+            raise BadTokenException
+
+        try:
+            await self.merge_files_controller.get_source_files(sources=sources, owner=user['id'])
+
+        except NotFoundException:
+            raise NotFoundException
+
+        except BadTokenException:
+            raise BadTokenException
+
+        job = JobBO(owner=user['id'], status='queued', sources=sources)
+        job = await self.job_persistence_service.create_job(job)
+        self.merge_job_worker.notify()
+
+        return job
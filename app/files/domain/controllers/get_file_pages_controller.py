@@ -0,0 +1,115 @@
+import asyncio
+import io
+import tempfile
+from typing import BinaryIO
+
+from pypdf import PdfReader, PdfWriter
+
+from app.config import FilesSettings, files_settings
+from app.files.domain.pdf import parse_page_selection
+from app.files.domain.pdf_reader_cache import CachedReader, PdfReaderCache
+from app.files.domain.persistences.exceptions import BadTokenException, NotFoundException, BadPageRangeException
+from app.files.domain.persistences.file_bo_interface import FileBOInterface
+from app.files.domain.persistences.file_storage_interface import FileStorageInterface
+from app.files.domain.persistences.pdf_analysis_interface import PdfAnalysisInterface
+from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.tracing import span, traced
+
+
+def load_reader(path: str) -> CachedReader:
+    # Read into memory so the reader outlives scratch copies downloaded from remote storage.
+    with open(path, 'rb') as buffer:
+        content = buffer.read()
+
+    reader = PdfReader(io.BytesIO(content))
+
+    return CachedReader(reader=reader, number_of_pages=len(reader.pages), weight=len(content))
+
+
+def write_pages(entry: CachedReader, pages: list[int], spool_size: int) -> BinaryIO:
+    output = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    try:
+        with entry.lock:
+            writer = PdfWriter()
+            for page in pages:
+                writer.add_page(entry.reader.pages[page - 1])
+            writer.write(output)
+
+    except BaseException:
+        output.close()
+        raise
+
+    output.seek(0)
+    return output
+
+
+@traced("controller")
+class GetFilePagesController:
+    def __init__(
+        self,
+        file_persistence_service: FileBOInterface,
+        authentication_api: AuthenticationApi,
+        file_storage: FileStorageInterface,
+        pdf_analysis_service: PdfAnalysisInterface,
+        reader_cache: PdfReaderCache,
+        settings: FilesSettings = files_settings
+    ):
+        self.file_persistence_service = file_persistence_service
+        self.authentication_api = authentication_api
+        self.file_storage = file_storage
+        self.pdf_analysis_service = pdf_analysis_service
+        self.reader_cache = reader_cache
+        self.settings = settings
+
+    async def get_reader(self, file_id: int, digest: str, path: str) -> CachedReader:
+        key = (file_id, digest)
+        entry = self.reader_cache.get(key)
+        if entry is not None:
+            return entry
+
+        async with self.file_storage.open_local(path=path) as local_path:
+            with span("load_reader", "pdf"):
+                entry = await asyncio.to_thread(load_reader, local_path)
+
+        self.reader_cache.set(key, entry)
+
+        return entry
+
+    async def __call__(self, file_id: int, selection: str, token: str) -> tuple[str, BinaryIO]:
+        try:
+            user = await self.authentication_api.auth_check(auth=token)
+
+        except BadTokenException:
+            raise BadTokenException
+
+        try:
+            file = await self.file_persistence_service.get_file_by_id(file_id=file_id)
+
+        except NotFoundException:
+            raise NotFoundException
+
+        if user['id'] != file.owner:
+            raise BadTokenException
+
+        if file.path == '':
+            raise NotFoundException
+
+        # The analysed page count lets bad selections fail before the document is parsed.
+        analysis = None
+        if file.digest is not None:
+            analysis = await self.pdf_analysis_service.get_analysis(digest=file.digest)
+
+        if analysis is not None and analysis.number_of_pages is not None:
+            pages = parse_page_selection(selection, analysis.number_of_pages)
+
+        entry = await self.get_reader(file.id, file.digest or '', file.path)
+        if analysis is None or analysis.number_of_pages is None:
+            pages = parse_page_selection(selection, entry.number_of_pages)
+
+        if len(pages) > self.settings.pages_max_pages:
+            raise BadPageRangeException
+
+        with span("write_pages", "pdf", pages=len(pages)):
+            output = await asyncio.to_thread(write_pages, entry, pages, self.settings.pages_spool_size)
+
+        return file.filename, output
@@ -1,19 +1,82 @@
+from typing import AsyncIterator, Optional
+
 from app.files.domain.persistences.file_bo_interface import FileBOInterface
-from app.files.domain.bo.file_bo import FileBO
 from app.files.domain.persistences.exceptions import BadTokenException
 from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.tracing import traced
 
 
+@traced("controller")
 class GetFilesByTokenController:
-    def __init__(self, file_persistence_service: FileBOInterface):
+    def __init__(self, file_persistence_service: FileBOInterface, authentication_api: AuthenticationApi):
         self.file_persistence_service = file_persistence_service
+        self.authentication_api = authentication_api
 
-    async def __call__(self, token: str) -> list[FileBO]:
-        auth_api = AuthenticationApi()
+    async def __call__(
+        self,
+        token: str,
+        limit: int,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+        fields: Optional[list[str]] = None
+    ) -> tuple[list[dict], Optional[int]]:
         try:
-            user = await auth_api.auth_check(auth=token)
+            user = await self.authentication_api.auth_check(auth=token)
 
         except BadTokenException:
             raise BadTokenException
 
-        return await self.file_persistence_service.get_files_by_owner_id(owner_id=user['id'])
+        # One extra row tells whether another page follows without a count query.
+        files = await self.file_persistence_service.get_files_page(
+            owner_id=user['id'],
+            after_id=after_id,
+            limit=limit + 1,
+            descending=descending,
+            fields=fields
+        )
+        if len(files) <= limit:
+            return files, None
+
+        files = files[:limit]
+        return files, files[-1]['id']
+
+    async def stream(
+        self,
+        token: str,
+        batch_size: int,
+        descending: bool = False,
+        fields: Optional[list[str]] = None
+    ) -> AsyncIterator[dict]:
+        try:
+            user = await self.authentication_api.auth_check(auth=token)
+
+        except BadTokenException:
+            raise BadTokenException
+
+        return self.iterate(
+            owner_id=user['id'], batch_size=batch_size, descending=descending, fields=fields
+        )
+
+    async def iterate(
+        self,
+        owner_id: int,
+        batch_size: int,
+        descending: bool,
+        fields: Optional[list[str]]
+    ) -> AsyncIterator[dict]:
+        after_id = None
+        while True:
+            files = await self.file_persistence_service.get_files_page(
+                owner_id=owner_id,
+                after_id=after_id,
+                limit=batch_size,
+                descending=descending,
+                fields=fields
+            )
+            for file in files:
+                yield file
+
+            if len(files) < batch_size:
+                return
+
+            after_id = files[-1]['id']
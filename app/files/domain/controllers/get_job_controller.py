@@ -0,0 +1,30 @@
+from app.files.domain.bo.job_bo import JobBO
+from app.files.domain.persistences.exceptions import BadTokenException, NotFoundException
+from app.files.domain.persistences.job_bo_interface import JobBOInterface
+from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.tracing import traced
+
+
+@traced("controller")
+class GetJobController:
+    def __init__(self, job_persistence_service: JobBOInterface, authentication_api: AuthenticationApi):
+        self.job_persistence_service = job_persistence_service
+        self.authentication_api = authentication_api
+
+    async def __call__(self, job_id: int, token: str) -> JobBO:
+        try:
+            user = await self.authentication_api.auth_check(auth=token)
+
+        except BadTokenException:
+            raise BadTokenException
+
+        try:
+            job = await self.job_persistence_service.get_job_by_id(job_id=job_id)
+
+        except NotFoundException:
+            raise NotFoundException
+
+        if user['id'] != job.owner:
+            raise BadTokenException
+
+        return job
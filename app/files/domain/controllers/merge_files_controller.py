@@ -1,55 +1,203 @@
-from pypdf import PdfMerger
+import asyncio
+import hashlib
+import os
+import time
+from contextlib import AsyncExitStack
+from typing import Optional
 
+from app.files.domain import storage_paths
 from app.files.domain.bo.file_bo import FileBO
+from app.files.domain.bo.merge_cache_bo import MergeCacheBO
+from app.files.domain.bo.merge_source_bo import MergeSourceBO
+from app.files.domain.merge_executor import MergeExecutor
+from app.files.domain.pdf import merge_pdfs, page_range
+from app.files.domain.pdf_analysis_worker import PdfAnalysisWorker
 from app.files.domain.persistences.exceptions import BadTokenException, NotFoundException
 from app.files.domain.persistences.file_bo_interface import FileBOInterface
+from app.files.domain.persistences.file_storage_interface import FileStorageInterface
+from app.files.domain.persistences.merge_cache_interface import MergeCacheInterface
+from app.files.domain.persistences.pdf_analysis_interface import PdfAnalysisInterface
 from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.metrics import Histogram
+from app.tracing import span, traced
 
+MERGE_DURATION = Histogram(
+    "merge_duration_seconds",
+    "Time to merge PDFs in the process pool, including the wait for a free worker."
+)
 
+
+def _remove_if_exists(path: str):
+    try:
+        os.remove(path)
+
+    except FileNotFoundError:
+        pass
+
+
+def merged_description(paths: list[str]) -> str:
+    quoted = ['"' + path + '"' for path in paths]
+    if len(quoted) == 1:
+        sources = quoted[0]
+    else:
+        sources = ', '.join(quoted[:-1]) + ' and ' + quoted[-1]
+
+    # FileDB.desc is limited to 400 characters.
+    return ('Merged file created from ' + sources)[:400]
+
+
+def merge_cache_key(sources: list[MergeSourceBO], files: dict[int, FileBO]) -> Optional[str]:
+    parts = []
+    for source in sources:
+        digest = files[source.file_id].digest
+        if digest is None:
+            return None
+
+        parts.append('{}:{}:{}'.format(
+            digest,
+            '' if source.first_page is None else source.first_page,
+            '' if source.last_page is None else source.last_page
+        ))
+
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+@traced("controller")
 class MergeFilesController:
-    def __init__(self, file_persistence_service: FileBOInterface):
+    def __init__(
+        self,
+        file_persistence_service: FileBOInterface,
+        authentication_api: AuthenticationApi,
+        file_storage: FileStorageInterface,
+        merge_executor: MergeExecutor,
+        merge_cache_service: MergeCacheInterface,
+        pdf_analysis_service: PdfAnalysisInterface,
+        pdf_analysis_worker: PdfAnalysisWorker
+    ):
         self.file_persistence_service = file_persistence_service
+        self.authentication_api = authentication_api
+        self.file_storage = file_storage
+        self.merge_executor = merge_executor
+        self.merge_cache_service = merge_cache_service
+        self.pdf_analysis_service = pdf_analysis_service
+        self.pdf_analysis_worker = pdf_analysis_worker
+
+    async def get_source_files(self, sources: list[MergeSourceBO], owner: int) -> dict[int, FileBO]:
+        files = {}
+        try:
+            for source in sources:
+                if source.file_id not in files:
+                    files[source.file_id] = await self.file_persistence_service.get_file_by_id(file_id=source.file_id)
+
+        except NotFoundException:
+            raise NotFoundException
+
+        for file in files.values():
+            if owner != file.owner:
+                raise BadTokenException
+
+            if file.path == '':
+                raise NotFoundException
 
-    async def __call__(self, file_id1: int, file_id2: int, token: str) -> FileBO:
-        auth_api = AuthenticationApi()
+        return files
+
+    async def __call__(self, sources: list[MergeSourceBO], token: str) -> int:
         try:
-            user = await auth_api.auth_check(auth=token)
+            user = await self.authentication_api.auth_check(auth=token)
 
         except BadTokenException:
             raise BadTokenException
 
-        try:
-            file1 = await self.file_persistence_service.get_file_by_id(file_id=file_id1)
-            file2 = await self.file_persistence_service.get_file_by_id(file_id=file_id2)
+        return await self.merge(sources=sources, owner=user['id'])
 
-        except NotFoundException:
-            raise NotFoundException
+    async def merge(self, sources: list[MergeSourceBO], owner: int) -> int:
+        files = await self.get_source_files(sources=sources, owner=owner)
 
-        user_id = user['id']
-        if user_id != file1.owner or user_id != file2.owner:
-            raise BadTokenException
+        paths = [files[source.file_id].path for source in sources]
+        key = merge_cache_key(sources=sources, files=files)
+        if key is not None:
+            entry = await self.merge_cache_service.get_entry(key=key)
+            if entry is not None and await self.file_storage.exists(path=entry.path):
+                new_file = FileBO(
+                    filename='Merged.pdf',
+                    path=entry.path,
+                    owner=owner,
+                    desc=merged_description(paths),
+                    number_of_pages=entry.number_of_pages,
+                    digest=entry.digest,
+                    size=entry.size
+                )
+                # None when the entry was released since it was read; the merge then runs again.
+                new_file = await self.merge_cache_service.post_cached_file(key=key, file=new_file)
+                if new_file is not None:
+                    # Indexes the new row for search from the document of the cached copy.
+                    self.pdf_analysis_worker.submit(digest=new_file.digest, path=new_file.path)
 
-        new_file = FileBO(
-            filename='Merged.pdf',
-            path='',
-            owner=user_id,
-            desc='Merged file created from "' + file1.path + '" and "' + file2.path + '"',
-            number_of_pages=file1.number_of_pages + file2.number_of_pages
+                    return new_file.id
+
+        # Ranges are checked against the analysed page counts before any content is fetched or parsed.
+        analyses = await self.pdf_analysis_service.get_analyses(
+            digests=[file.digest for file in files.values() if file.digest is not None]
         )
+        for source in sources:
+            analysis = analyses.get(files[source.file_id].digest)
+            if analysis is not None and analysis.number_of_pages is not None:
+                page_range(analysis.number_of_pages, source.first_page, source.last_page)
+
+        temp_path = self.file_storage.scratch_path()
+        try:
+            async with AsyncExitStack() as stack:
+                local_paths = {}
+                for path in paths:
+                    if path not in local_paths:
+                        local_paths[path] = await stack.enter_async_context(self.file_storage.open_local(path=path))
+
+                merge_sources = [
+                    (local_paths[files[source.file_id].path], source.first_page, source.last_page)
+                    for source in sources
+                ]
+                started = time.perf_counter()
+                with span("merge_pdfs", "pdf", sources=len(merge_sources)):
+                    merged = await self.merge_executor.run(merge_pdfs, merge_sources, temp_path)
+                MERGE_DURATION.observe(time.perf_counter() - started)
+
+            new_file = FileBO(
+                filename='Merged.pdf',
+                path='',
+                owner=owner,
+                desc=merged_description(paths),
+                number_of_pages=merged['number_of_pages'],
+                digest=merged['digest'],
+                size=merged['size']
+            )
 
-        new_file = await self.file_persistence_service.post_file(new_file)
-        new_file.path = "files/" + str(new_file.id) + ".pdf"
-        await self.file_persistence_service.update_file(file_id=new_file.id, data=new_file)
+            if key is None:
+                new_file = await self.file_persistence_service.post_file(new_file)
+                new_file.path = storage_paths.file_path(file_id=new_file.id)
+                await self.file_storage.save_local(local_path=temp_path, path=new_file.path)
+                await self.file_persistence_service.update_file(file_id=new_file.id, data=new_file)
 
-        merged = new_file.path
-        pdfs = [file1.path, file2.path]
-        merger = PdfMerger()
+            else:
+                # Cached outputs are shared by every row merged from the same inputs and released
+                # with the last of them. The row is added before the entry, so the output is never
+                # cached without a reference a concurrent release would see.
+                new_file.path = storage_paths.new_merged_path(key=key)
+                await self.file_storage.save_local(local_path=temp_path, path=new_file.path)
+                new_file = await self.file_persistence_service.post_file(new_file)
+                await self.merge_cache_service.put_entry(
+                    MergeCacheBO(
+                        key=key,
+                        path=new_file.path,
+                        number_of_pages=new_file.number_of_pages,
+                        digest=new_file.digest,
+                        size=new_file.size
+                    )
+                )
 
-        for pdf in pdfs:
-            merger.append(pdf)
+        finally:
+            # The scratch file is always local; save_local consumes it unless the merge failed.
+            await asyncio.to_thread(_remove_if_exists, temp_path)
 
-        name = merged
-        merger.write(name)
-        merger.close()
+        self.pdf_analysis_worker.submit(digest=new_file.digest, path=new_file.path)
 
         return new_file.id
@@ -1,19 +1,43 @@
+import time
+
 from fastapi import UploadFile
 
+from app.files.domain.pdf_analysis_worker import PdfAnalysisWorker
 from app.files.domain.persistences.file_bo_interface import FileBOInterface
-from app.files.domain.bo.file_bo import FileBO
+from app.files.domain.persistences.file_storage_interface import FileStorageInterface
 from app.files.domain.persistences.exceptions import BadTokenException, NotFoundException
+from app.files.domain.persistences.merge_cache_interface import MergeCacheInterface
+from app.files.domain.storage_paths import file_path
 from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.metrics import THROUGHPUT_BUCKETS, Histogram
+from app.tracing import traced
+
+UPLOAD_THROUGHPUT = Histogram(
+    "upload_throughput_bytes_per_second",
+    "Rate at which uploaded content is hashed and written to storage.",
+    buckets=THROUGHPUT_BUCKETS
+)
 
 
+@traced("controller")
 class PostFileContentController:
-    def __init__(self, file_persistence_service: FileBOInterface):
+    def __init__(
+        self,
+        file_persistence_service: FileBOInterface,
+        authentication_api: AuthenticationApi,
+        file_storage: FileStorageInterface,
+        merge_cache_service: MergeCacheInterface,
+        pdf_analysis_worker: PdfAnalysisWorker
+    ):
         self.file_persistence_service = file_persistence_service
+        self.authentication_api = authentication_api
+        self.file_storage = file_storage
+        self.merge_cache_service = merge_cache_service
+        self.pdf_analysis_worker = pdf_analysis_worker
 
     async def __call__(self, file_id: int, token: str, input_file: UploadFile) -> dict[str, str]:
-        auth_api = AuthenticationApi()
         try:
-            user = await auth_api.auth_check(auth=token)
+            user = await self.authentication_api.auth_check(auth=token)
 
         except BadTokenException:
             raise BadTokenException
@@ -27,13 +51,22 @@ class PostFileContentController:
         if file_data.owner != user['id']:
             raise BadTokenException
 
-        prefix = 'files/'
-        path = prefix + str(file_id) + '.pdf'
-        with open(path, "wb") as buffer:
-            while chunk := await input_file.read(8192):
-                buffer.write(chunk)
+        previous_path = file_data.path
+        path = file_path(file_id=int(file_id))
+        started = time.perf_counter()
+        digest, size = await self.file_storage.save_upload(path=path, input_file=input_file)
+        UPLOAD_THROUGHPUT.observe(size / max(time.perf_counter() - started, 1e-6))
         file_data.path = path
+        file_data.digest = digest
+        file_data.size = size
 
         await self.file_persistence_service.update_file(file_id=file_id, data=file_data)
+        self.pdf_analysis_worker.submit(digest=digest, path=path)
+
+        # The row leaves a cached merge output or a path of the flat layout; like on deletion, the
+        # previous content is removed once no row references it.
+        if previous_path not in ('', path):
+            for released_path in await self.merge_cache_service.release_paths(paths=[previous_path]):
+                await self.file_storage.delete(path=released_path)
 
         return {"message": "ok"}
@@ -2,16 +2,18 @@ from app.files.domain.persistences.file_bo_interface import FileBOInterface
 from app.files.domain.bo.file_bo import FileBO
 from app.files.domain.persistences.exceptions import BadTokenException
 from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.tracing import traced
 
 
+@traced("controller")
 class PostFileController:
-    def __init__(self, file_persistence_service: FileBOInterface):
+    def __init__(self, file_persistence_service: FileBOInterface, authentication_api: AuthenticationApi):
         self.file_persistence_service = file_persistence_service
+        self.authentication_api = authentication_api
 
     async def __call__(self, file: FileBO, token: str) -> FileBO:
-        auth_api = AuthenticationApi()
         try:
-            user = await auth_api.auth_check(auth=token)
+            user = await self.authentication_api.auth_check(auth=token)
 
         except BadTokenException:
             raise BadTokenException
@@ -0,0 +1,24 @@
+from app.files.domain.persistences.file_bo_interface import FileBOInterface
+from app.files.domain.bo.file_bo import FileBO
+from app.files.domain.persistences.exceptions import BadTokenException
+from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.tracing import traced
+
+
+@traced("controller")
+class PostFilesController:
+    def __init__(self, file_persistence_service: FileBOInterface, authentication_api: AuthenticationApi):
+        self.file_persistence_service = file_persistence_service
+        self.authentication_api = authentication_api
+
+    async def __call__(self, files: list[FileBO], token: str) -> list[FileBO]:
+        try:
+            user = await self.authentication_api.auth_check(auth=token)
+
+        except BadTokenException:
+            raise BadTokenException
+
+        for file in files:
+            file.owner = user['id']
+
+        return await self.file_persistence_service.post_files(files)
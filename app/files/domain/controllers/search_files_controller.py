@@ -0,0 +1,32 @@
+from typing import Optional
+
+from app.files.domain.persistences.exceptions import BadTokenException
+from app.files.domain.persistences.file_search_interface import FileSearchInterface
+from app.files.external.authentication.authentication_api import AuthenticationApi
+from app.tracing import traced
+
+
+@traced("controller")
+class SearchFilesController:
+    def __init__(self, file_search_service: FileSearchInterface, authentication_api: AuthenticationApi):
+        self.file_search_service = file_search_service
+        self.authentication_api = authentication_api
+
+    async def __call__(self, query: str, token: str, limit: int, offset: int) -> tuple[list[dict], Optional[int]]:
+        try:
+            user = await self.authentication_api.auth_check(auth=token)
+
+        except BadTokenException:
+            raise BadTokenException
+
+        # One extra row tells whether there is a next page.
+        files = await self.file_search_service.search(
+            owner_id=user['id'],
+            query=query,
+            limit=limit + 1,
+            offset=offset
+        )
+        if len(files) <= limit:
+            return files, None
+
+        return files[:limit], offset + limit
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from app.config import FilesSettings, files_settings
+from app.files.domain.persistences.exceptions import MergeQueueFullException
+
+logger = logging.getLogger(__name__)
+
+
+class MergeExecutor:
+    def __init__(self, settings: FilesSettings = files_settings):
+        self.max_workers = settings.merge_workers
+        self.max_pending = settings.merge_workers + settings.merge_queue_depth
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def start(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    async def close(self):
+        if self.executor is not None:
+            executor, self.executor = self.executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def run(self, function: Callable, *args):
+        if self.pending >= self.max_pending:
+            raise MergeQueueFullException
+
+        self.start()
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+        except BaseException:
+            self.failed += 1
+            raise
+
+        finally:
+            self.pending -= 1
+
+        elapsed = time.perf_counter() - start
+        self.completed += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        logger.info("%s finished in %.3fs", function.__name__, elapsed)
+
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "total_seconds": self.total_seconds,
+            "max_seconds": self.max_seconds
+        }
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import FilesSettings, files_settings
+from app.files.domain.controllers.merge_files_controller import MergeFilesController
+from app.files.domain.persistences.exceptions import MergeQueueFullException
+from app.files.domain.persistences.job_bo_interface import JobBOInterface
+
+logger = logging.getLogger(__name__)
+
+
+class MergeJobWorker:
+    def __init__(
+        self,
+        job_persistence_service: JobBOInterface,
+        merge_files_controller: MergeFilesController,
+        settings: FilesSettings = files_settings
+    ):
+        self.job_persistence_service = job_persistence_service
+        self.merge_files_controller = merge_files_controller
+        self.settings = settings
+        self.wakeup: Optional[asyncio.Event] = None
+        self.tasks: list[asyncio.Task] = []
+
+    def start(self):
+        if self.tasks:
+            return
+
+        self.wakeup = asyncio.Event()
+        self.tasks = [asyncio.create_task(self.run()) for _ in range(self.settings.merge_job_workers)]
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def notify(self):
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    async def wait(self, timeout: float):
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+
+        except asyncio.TimeoutError:
+            pass
+
+        self.wakeup.clear()
+
+    async def run(self):
+        while True:
+            try:
+                processed = await self.run_once()
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception:
+                logger.exception("Merge job worker iteration failed")
+                processed = False
+
+            if not processed:
+                await self.wait(timeout=self.settings.merge_job_poll_interval)
+
+    async def run_once(self) -> bool:
+        job = await self.job_persistence_service.claim_job(stale_after=self.settings.merge_job_stale_after)
+        if job is None:
+            return False
+
+        try:
+            file_id = await self.merge_files_controller.merge(sources=job.sources, owner=job.owner)
+
+        except MergeQueueFullException:
+            await self.job_persistence_service.release_job(job_id=job.id)
+            await asyncio.sleep(self.settings.merge_retry_after)
+            return True
+
+        except asyncio.CancelledError:
+            await asyncio.shield(self.job_persistence_service.release_job(job_id=job.id))
+            raise
+
+        except Exception as exception:
+            logger.exception("Merge job %s failed", job.id)
+            await self.job_persistence_service.fail_job(job_id=job.id, error=type(exception).__name__)
+            return True
+
+        await self.job_persistence_service.complete_job(job_id=job.id, file_id=file_id)
+        return True
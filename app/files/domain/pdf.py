@@ -0,0 +1,121 @@
+import hashlib
+import os
+from typing import Optional
+
+from pypdf import PasswordType, PdfMerger, PdfReader
+from pypdf.errors import PyPdfError
+
+from app.files.domain.persistences.exceptions import BadPageRangeException
+
+
+def file_digest(path: str) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as buffer:
+        while chunk := buffer.read(1024 * 1024):
+            digest.update(chunk)
+            size += len(chunk)
+
+    return digest.hexdigest(), size
+
+
+def page_range(number_of_pages: int, first_page: Optional[int], last_page: Optional[int]) -> tuple[int, int]:
+    start = 1 if first_page is None else first_page
+    stop = number_of_pages if last_page is None else last_page
+    if start < 1 or stop > number_of_pages or start > stop:
+        raise BadPageRangeException
+
+    return start - 1, stop
+
+
+def parse_page_selection(selection: str, number_of_pages: int) -> list[int]:
+    # "3-7,12" -> [3, 4, 5, 6, 7, 12]; pages are 1-based and kept in the requested order.
+    pages = []
+    for part in selection.split(","):
+        first, dash, last = part.strip().partition("-")
+        if not first.isdigit() or (dash != "" and not last.isdigit()):
+            raise BadPageRangeException
+
+        start, stop = page_range(number_of_pages, int(first), int(last) if dash != "" else int(first))
+        pages.extend(range(start + 1, stop + 1))
+
+    return pages
+
+
+def merge_pdfs(sources: list[tuple[str, Optional[int], Optional[int]]], output_path: str) -> dict:
+    # Runs inside the merge process pool, so it only takes and returns picklable values.
+    # Every source is appended to the same merger, so the output is written in a single pass.
+    merger = PdfMerger()
+    try:
+        for path, first_page, last_page in sources:
+            reader = PdfReader(path)
+            merger.append(reader, pages=page_range(len(reader.pages), first_page, last_page))
+
+        number_of_pages = len(merger.pages)
+        with open(output_path, "wb") as buffer:
+            merger.write(buffer)
+            buffer.flush()
+            os.fsync(buffer.fileno())
+
+    finally:
+        merger.close()
+
+    digest, size = file_digest(output_path)
+
+    return {
+        "number_of_pages": number_of_pages,
+        "digest": digest,
+        "size": size
+    }
+
+
+def extract_text(reader: PdfReader, max_chars: int) -> str:
+    parts = []
+    length = 0
+    for page in reader.pages:
+        if length >= max_chars:
+            break
+
+        try:
+            text = page.extract_text()
+
+        except (PyPdfError, ValueError, KeyError, TypeError):
+            continue
+
+        # Postgres text cannot hold NUL characters.
+        text = text.replace("\x00", " ")
+        parts.append(text)
+        length += len(text) + 1
+
+    return "\n".join(parts)[:max_chars]
+
+
+def analyze_pdf(path: str, max_text_chars: int = 0) -> dict:
+    # Runs inside the merge process pool as well. Unreadable content is reported in "error" so the
+    # file is not analysed again on every start. The text is returned for the search index only.
+    result = {
+        "pdf_version": None,
+        "encrypted": False,
+        "number_of_pages": None,
+        "error": None,
+        "text": ""
+    }
+    try:
+        reader = PdfReader(path)
+        result["pdf_version"] = reader.pdf_header.removeprefix("%PDF-")[:10]
+        result["encrypted"] = reader.is_encrypted
+        if reader.is_encrypted and reader.decrypt("") == PasswordType.NOT_DECRYPTED:
+            result["error"] = "Encrypted with a user password"
+            return result
+
+        number_of_pages = len(reader.pages)
+        if max_text_chars > 0:
+            result["text"] = extract_text(reader, max_text_chars)
+
+    except (PyPdfError, ValueError, KeyError) as exception:
+        result["error"] = (type(exception).__name__ + ": " + str(exception))[:200]
+        return result
+
+    result["number_of_pages"] = number_of_pages
+
+    return result
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import FilesSettings, files_settings
+from app.files.domain.bo.pdf_analysis_bo import PdfAnalysisBO
+from app.files.domain.merge_executor import MergeExecutor
+from app.files.domain.pdf import analyze_pdf
+from app.files.domain.persistences.exceptions import MergeQueueFullException, NotFoundException
+from app.files.domain.persistences.file_bo_interface import FileBOInterface
+from app.files.domain.persistences.file_search_interface import FileSearchInterface
+from app.files.domain.persistences.file_storage_interface import FileStorageInterface
+from app.files.domain.persistences.pdf_analysis_interface import PdfAnalysisInterface
+
+logger = logging.getLogger(__name__)
+
+
+class PdfAnalysisWorker:
+    def __init__(
+        self,
+        file_persistence_service: FileBOInterface,
+        pdf_analysis_service: PdfAnalysisInterface,
+        file_search_service: FileSearchInterface,
+        file_storage: FileStorageInterface,
+        merge_executor: MergeExecutor,
+        settings: FilesSettings = files_settings
+    ):
+        self.file_persistence_service = file_persistence_service
+        self.pdf_analysis_service = pdf_analysis_service
+        self.file_search_service = file_search_service
+        self.file_storage = file_storage
+        self.merge_executor = merge_executor
+        self.settings = settings
+        self.queue: Optional[asyncio.Queue] = None
+        self.queued: set[str] = set()
+        self.tasks: list[asyncio.Task] = []
+
+    def start(self):
+        if self.tasks or self.settings.analysis_workers == 0:
+            return
+
+        self.queue = asyncio.Queue(maxsize=self.settings.analysis_queue_size)
+        self.tasks = [asyncio.create_task(self.run()) for _ in range(self.settings.analysis_workers)]
+        self.tasks.append(asyncio.create_task(self.backfill()))
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.queue = None
+        self.queued.clear()
+
+    def submit(self, digest: str, path: str) -> bool:
+        if self.queue is None or digest in self.queued:
+            return False
+
+        try:
+            self.queue.put_nowait((digest, path))
+
+        except asyncio.QueueFull:
+            # Dropped files are found again by the backfill of the next start.
+            logger.warning("PDF analysis queue is full, skipping %s", path)
+            return False
+
+        self.queued.add(digest)
+        return True
+
+    async def backfill(self):
+        # Picks up content stored while no worker was running, e.g. before a restart.
+        after_id = 0
+        while True:
+            try:
+                files = await self.file_persistence_service.get_stored_files(
+                    after_id=after_id,
+                    limit=self.settings.analysis_backfill_batch_size
+                )
+                if len(files) == 0:
+                    return
+
+                after_id = files[-1].id
+                analyses = await self.pdf_analysis_service.get_analyses(digests=[file.digest for file in files])
+                indexed = await self.file_search_service.get_indexed_file_ids(file_ids=[file.id for file in files])
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception:
+                logger.exception("PDF analysis backfill failed")
+                return
+
+            for file in files:
+                if (file.digest not in analyses or file.id not in indexed) and file.digest not in self.queued:
+                    self.queued.add(file.digest)
+                    await self.queue.put((file.digest, file.path))
+
+    async def run(self):
+        while True:
+            digest, path = await self.queue.get()
+            try:
+                await self.analyze(digest=digest, path=path)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception:
+                logger.exception("PDF analysis of %s failed", path)
+
+            finally:
+                self.queued.discard(digest)
+
+    async def analyze(self, digest: str, path: str):
+        # Content that was analysed before only needs its search document copied to the new rows.
+        analysis = await self.pdf_analysis_service.get_analysis(digest=digest)
+        if analysis is not None and await self.file_search_service.index_copies(digest=digest):
+            return
+
+        # Analyses share the merge process pool but yield to interactive merges when it is full.
+        while True:
+            try:
+                async with self.file_storage.open_local(path=path) as local_path:
+                    result = await self.merge_executor.run(
+                        analyze_pdf,
+                        local_path,
+                        self.settings.search_max_text_chars
+                    )
+                break
+
+            except MergeQueueFullException:
+                await asyncio.sleep(self.settings.merge_retry_after)
+
+            except (NotFoundException, FileNotFoundError):
+                return
+
+        text = result.pop("text")
+        if analysis is None:
+            analysis = await self.pdf_analysis_service.put_analysis(PdfAnalysisBO(digest=digest, **result))
+
+            # The page count sent by the client is only a hint until the content has been analysed.
+            if analysis.number_of_pages is not None:
+                await self.file_persistence_service.set_number_of_pages(
+                    digest=digest,
+                    number_of_pages=analysis.number_of_pages
+                )
+
+        await self.file_search_service.index_content(digest=digest, text=text)
@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from pypdf import PdfReader
+
+
+class CachedReader:
+    def __init__(self, reader: PdfReader, number_of_pages: int, weight: int):
+        self.reader = reader
+        self.number_of_pages = number_of_pages
+        self.weight = weight
+        # Readers seek and read their shared stream, so only one thread may use one at a time.
+        self.lock = threading.Lock()
+
+
+class PdfReaderCache:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[tuple[int, str], CachedReader] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple[int, str]) -> Optional[CachedReader]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: tuple[int, str], entry: CachedReader):
+        # A reader keeps the whole document in memory, so its weight is the size of the file.
+        if self.max_entries <= 0 or entry.weight > self.max_bytes:
+            return
+
+        self.invalidate(key)
+        self.entries[key] = entry
+        self.bytes += entry.weight
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.weight
+            self.evictions += 1
+
+    def invalidate(self, key: tuple[int, str]):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.weight
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def metrics(self) -> list[tuple[str, str, str, dict[str, str], float]]:
+        return [
+            ("pdf_reader_cache_entries", "gauge", "Parsed documents kept for page extraction.", {},
+             len(self.entries)),
+            ("pdf_reader_cache_bytes", "gauge", "Size of the documents kept for page extraction.", {}, self.bytes),
+            ("pdf_reader_cache_max_bytes", "gauge", "Byte budget of the page extraction cache.", {},
+             self.max_bytes),
+            ("pdf_reader_cache_hits_total", "counter", "Page extractions that reused a parsed document.", {},
+             self.hits),
+            ("pdf_reader_cache_misses_total", "counter", "Page extractions that parsed the document.", {},
+             self.misses),
+            ("pdf_reader_cache_evictions_total", "counter", "Parsed documents dropped to stay within the limits.",
+             {}, self.evictions),
+        ]
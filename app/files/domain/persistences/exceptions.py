@@ -4,3 +4,11 @@ class BadTokenException(Exception):
 
 class NotFoundException(Exception):
     pass
+
+
+class MergeQueueFullException(Exception):
+    pass
+
+
+class BadPageRangeException(Exception):
+    pass
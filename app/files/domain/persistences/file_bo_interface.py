@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 from app.files.domain.bo.file_bo import FileBO
 
@@ -8,9 +9,23 @@ class FileBOInterface(ABC):
     def get_files_by_owner_id(self, owner_id) -> list[FileBO]:
         pass
 
+    @abstractmethod
+    def get_files_page(
+        self,
+        owner_id: int,
+        after_id: Optional[int],
+        limit: int,
+        descending: bool = False,
+        fields: Optional[list[str]] = None
+    ) -> list[dict]:
+        pass
+
     def post_file(self, data: FileBO) -> FileBO:
         pass
 
+    def post_files(self, files: list[FileBO]) -> list[FileBO]:
+        pass
+
     def get_file_by_id(self, file_id: int) -> FileBO:
         pass
 
@@ -19,3 +34,12 @@ class FileBOInterface(ABC):
 
     def delete_file(self, file_id: int, owner: int) -> str:
         pass
+
+    def delete_files(self, file_ids: list[int], owner: int) -> dict[int, str]:
+        pass
+
+    def get_stored_files(self, after_id: int, limit: int) -> list[FileBO]:
+        pass
+
+    def set_number_of_pages(self, digest: str, number_of_pages: int):
+        pass
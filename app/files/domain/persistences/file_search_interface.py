@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+
+
+class FileSearchInterface(ABC):
+    @abstractmethod
+    def index_content(self, digest: str, text: str):
+        pass
+
+    @abstractmethod
+    def index_copies(self, digest: str) -> bool:
+        pass
+
+    @abstractmethod
+    def get_indexed_file_ids(self, file_ids: list[int]) -> set[int]:
+        pass
+
+    @abstractmethod
+    def search(self, owner_id: int, query: str, limit: int, offset: int) -> list[dict]:
+        pass
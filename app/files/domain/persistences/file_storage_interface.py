@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from contextlib import AbstractAsyncContextManager
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+
+
+class FileStorageInterface(ABC):
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    def save_upload(self, path: str, input_file: UploadFile) -> tuple[str, int]:
+        pass
+
+    @abstractmethod
+    def scratch_path(self) -> str:
+        pass
+
+    @abstractmethod
+    def save_local(self, local_path: str, path: str):
+        pass
+
+    @abstractmethod
+    def open_local(self, path: str) -> AbstractAsyncContextManager[str]:
+        pass
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        pass
+
+    @abstractmethod
+    def size(self, path: str) -> int:
+        pass
+
+    @abstractmethod
+    def read(self, path: str, start: int, end: int) -> AsyncIterator[bytes]:
+        pass
+
+    @abstractmethod
+    def delete(self, path: str):
+        pass
+
+    def local_path(self, path: str) -> Optional[str]:
+        # Backends on a local disk return the file path so responses can use sendfile.
+        return None
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.files.domain.bo.job_bo import JobBO
+
+
+class JobBOInterface(ABC):
+    @abstractmethod
+    def create_job(self, job: JobBO) -> JobBO:
+        pass
+
+    @abstractmethod
+    def get_job_by_id(self, job_id: int) -> JobBO:
+        pass
+
+    @abstractmethod
+    def claim_job(self, stale_after: float) -> Optional[JobBO]:
+        pass
+
+    @abstractmethod
+    def release_job(self, job_id: int):
+        pass
+
+    @abstractmethod
+    def complete_job(self, job_id: int, file_id: int):
+        pass
+
+    @abstractmethod
+    def fail_job(self, job_id: int, error: str):
+        pass
@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.files.domain.bo.file_bo import FileBO
+from app.files.domain.bo.merge_cache_bo import MergeCacheBO
+
+
+class MergeCacheInterface(ABC):
+    @abstractmethod
+    def get_entry(self, key: str) -> Optional[MergeCacheBO]:
+        pass
+
+    @abstractmethod
+    def put_entry(self, entry: MergeCacheBO) -> MergeCacheBO:
+        pass
+
+    @abstractmethod
+    def post_cached_file(self, key: str, file: FileBO) -> Optional[FileBO]:
+        pass
+
+    @abstractmethod
+    def release_paths(self, paths: list[str]) -> list[str]:
+        pass
+
+    @abstractmethod
+    def metrics(self) -> list[tuple[str, str, str, dict[str, str], float]]:
+        pass
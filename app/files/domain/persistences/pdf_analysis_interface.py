@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.files.domain.bo.pdf_analysis_bo import PdfAnalysisBO
+
+
+class PdfAnalysisInterface(ABC):
+    @abstractmethod
+    def get_analysis(self, digest: str) -> Optional[PdfAnalysisBO]:
+        pass
+
+    @abstractmethod
+    def get_analyses(self, digests: list[str]) -> dict[str, PdfAnalysisBO]:
+        pass
+
+    @abstractmethod
+    def put_analysis(self, analysis: PdfAnalysisBO) -> PdfAnalysisBO:
+        pass
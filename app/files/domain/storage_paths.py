@@ -0,0 +1,65 @@
+import hashlib
+import os
+import uuid
+from typing import Optional
+
+from app.config import files_settings
+
+MERGED_DIRECTORY = 'merged'
+
+
+def _join(*parts: str) -> str:
+    return '/'.join(part for part in parts if part != '')
+
+
+def shard(name: str) -> list[str]:
+    # Hashing spreads sequential ids evenly, so no directory grows past a few dozen entries per
+    # million files with the default depth and width.
+    digest = hashlib.sha256(name.encode()).hexdigest()
+    width = files_settings.storage_shard_width
+
+    return [digest[level * width:(level + 1) * width] for level in range(files_settings.storage_shard_depth)]
+
+
+def file_path(file_id: int) -> str:
+    name = str(file_id)
+
+    return _join(files_settings.storage_root, *shard(name), name + '.pdf')
+
+
+def merged_path(key: str) -> str:
+    return _join(files_settings.storage_root, MERGED_DIRECTORY, *shard(key), key + '.pdf')
+
+
+def new_merged_path(key: str) -> str:
+    # Every output stored for a key gets its own object, so releasing an older one never removes a
+    # newer one written meanwhile.
+    return merged_path(key + '-' + uuid.uuid4().hex[:12])
+
+
+def temp_path() -> str:
+    return _join(files_settings.storage_root, 'merge-' + str(uuid.uuid4()) + '.part')
+
+
+def sharded_path(path: str) -> Optional[str]:
+    # Maps a path of the flat layout (files/{id}.pdf and files/merged/{key}.pdf) to its location in
+    # the current one. Anything else is already sharded or unknown and yields None.
+    root = files_settings.storage_root + '/'
+    if not path.startswith(root) or not path.endswith('.pdf'):
+        return None
+
+    parts = path[len(root):].split('/')
+    if len(parts) == 1:
+        result = _join(files_settings.storage_root, *shard(parts[0][:-4]), parts[0])
+
+    elif len(parts) == 2 and parts[0] == MERGED_DIRECTORY:
+        result = merged_path(parts[1][:-4])
+
+    else:
+        return None
+
+    return None if result == path else result
+
+
+def ensure_directory(path: str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
@@ -0,0 +1,49 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO
+
+from fastapi import UploadFile
+
+
+def _write_chunk(buffer: BinaryIO, digest, chunk: bytes):
+    digest.update(chunk)
+    buffer.write(chunk)
+
+
+def _commit(buffer: BinaryIO, temp_path: str, path: str, fsync: bool):
+    buffer.flush()
+    if fsync:
+        os.fsync(buffer.fileno())
+    buffer.close()
+    os.replace(temp_path, path)
+
+
+def _discard(buffer: BinaryIO, temp_path: str):
+    buffer.close()
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+
+async def write_upload(input_file: UploadFile, path: str, chunk_size: int, fsync: bool = True) -> tuple[str, int]:
+    # The content is streamed into a temporary file next to its destination and only renamed
+    # into place once complete, so a failed upload never leaves a partial file at `path`.
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = await asyncio.to_thread(tempfile.mkstemp, dir=directory, suffix='.part')
+    buffer = os.fdopen(fd, 'wb')
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await input_file.read(chunk_size):
+            await asyncio.to_thread(_write_chunk, buffer, digest, chunk)
+            size += len(chunk)
+
+        await asyncio.to_thread(_commit, buffer, temp_path, path, fsync)
+
+    except BaseException:
+        await asyncio.to_thread(_discard, buffer, temp_path)
+        raise
+
+    return digest.hexdigest(), size
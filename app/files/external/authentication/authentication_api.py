@@ -1,30 +1,65 @@
-import aiohttp
-import json
+import time
+from typing import Optional
 
+from app.metrics import Histogram
+from app.tracing import span
 from app.files.domain.persistences.exceptions import BadTokenException
+from app.files.external.authentication.introspection_cache import IntrospectionCache
+from app.files.external.authentication.transports.introspection_transport_interface import \
+    IntrospectionTransportInterface
 
-authentication_url = '0.0.0.0'
+INTROSPECTION_DURATION = Histogram(
+    "auth_introspection_duration_seconds",
+    "Token introspections that missed the cache, by transport and outcome.",
+    ("transport", "outcome")
+)
 
 
 class AuthenticationApi:
+    def __init__(self, transport: IntrospectionTransportInterface, cache: Optional[IntrospectionCache] = None):
+        self.transport = transport
+        self.cache = cache
+        self.transport.on_token_revoked(self.invalidate)
+
+    async def start(self):
+        await self.transport.start()
+
+    async def close(self):
+        await self.transport.close()
+
     async def introspect(self, auth: str):
-        headers = {
-            "accept": "application/json",
-            "auth": auth
-        }
-        url = "http://" + authentication_url + ":80/auth/introspect"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, ssl=False) as response:
-                status_code = response.status
-                if status_code != 200:
-                    return None
-
-                body = await response.text()
-                return body
+        with span("introspect", "auth") as args:
+            if self.cache is None:
+                return await self.introspect_remote(auth=auth)
+
+            user = self.cache.get(auth)
+            args["cached"] = user is not None
+            if user is None:
+                user = await self.introspect_remote(auth=auth)
+                if user is not None:
+                    self.cache.set(auth, user)
+
+            return user
+
+    async def introspect_remote(self, auth: str):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with span(type(self.transport).__name__, "auth"):
+                user = await self.transport.introspect(auth=auth)
+            outcome = "invalid" if user is None else "valid"
+            return user
+
+        finally:
+            INTROSPECTION_DURATION.observe(time.perf_counter() - started, type(self.transport).__name__, outcome)
 
     async def auth_check(self, auth: str):
-        auth_response = await self.introspect(auth=auth)
-        if auth_response is None:
+        user = await self.introspect(auth=auth)
+        if user is None:
             raise BadTokenException
 
-        return json.loads(auth_response)
+        return user
+
+    def invalidate(self, token: str):
+        if self.cache is not None:
+            self.cache.invalidate(token)
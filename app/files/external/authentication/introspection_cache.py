@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from typing import Optional
+import time
+
+
+class IntrospectionCache:
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self.entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self.entries[token]
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def set(self, token: str, user: dict):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        self.entries[token] = (time.monotonic() + self.ttl, user)
+        self.entries.move_to_end(token)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        self.entries.pop(token, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def metrics(self) -> list[tuple[str, str, str, dict[str, str], float]]:
+        return [
+            ("auth_introspection_cache_entries", "gauge", "Tokens in the introspection cache.", {},
+             len(self.entries)),
+            ("auth_introspection_cache_hits_total", "counter", "Introspections answered by the cache.", {},
+             self.hits),
+            ("auth_introspection_cache_misses_total", "counter", "Introspections that missed the cache.", {},
+             self.misses),
+        ]
@@ -0,0 +1,48 @@
+from typing import Optional
+import aiohttp
+
+from app.config import AuthenticationApiSettings, authentication_api_settings
+from app.files.external.authentication.transports.introspection_transport_interface import \
+    IntrospectionTransportInterface
+
+
+class HttpIntrospectionTransport(IntrospectionTransportInterface):
+    def __init__(self, settings: AuthenticationApiSettings = authentication_api_settings):
+        self.settings = settings
+        self.url = "http://{}:{}/auth/introspect".format(settings.host, settings.port)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        if self.session is not None and not self.session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.settings.pool_limit,
+            limit_per_host=self.settings.pool_limit_per_host,
+            keepalive_timeout=self.settings.keepalive_timeout,
+            ssl=False
+        )
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=self.settings.connect_timeout,
+            sock_read=self.settings.read_timeout
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def introspect(self, auth: str) -> Optional[dict]:
+        if self.session is None or self.session.closed:
+            await self.start()
+
+        headers = {
+            "accept": "application/json",
+            "auth": auth
+        }
+        async with self.session.get(self.url, headers=headers) as response:
+            if response.status != 200:
+                return None
+
+            return await response.json()
@@ -0,0 +1,26 @@
+from typing import Callable, Optional
+
+from app.authentication.dependency_injection.domain.introspect_controllers import IntrospectControllers
+from app.authentication.dependency_injection.domain.logout_controllers import LogoutControllers
+from app.files.external.authentication.transports.introspection_transport_interface import \
+    IntrospectionTransportInterface
+
+
+class InProcessIntrospectionTransport(IntrospectionTransportInterface):
+    def __init__(self):
+        self.introspect_controller = IntrospectControllers.carlemany()
+
+    def on_token_revoked(self, listener: Callable[[str], None]):
+        LogoutControllers.carlemany().add_token_revoked_listener(listener)
+
+    async def introspect(self, auth: str) -> Optional[dict]:
+        user = await self.introspect_controller(token=auth)
+        if user is None:
+            return None
+
+        return {
+            "id": user.id,
+            "username": user.username,
+            "mail": user.mail,
+            "year_of_birth": user.year_of_birth
+        }
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+
+class IntrospectionTransportInterface(ABC):
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def on_token_revoked(self, listener: Callable[[str], None]):
+        pass
+
+    @abstractmethod
+    def introspect(self, auth: str) -> Optional[dict]:
+        pass
@@ -1,11 +1,74 @@
+from enum import Enum
+
 from tortoise import fields
+from tortoise.contrib.postgres.fields import TSVectorField
+from tortoise.contrib.postgres.indexes import GinIndex
 from tortoise.models import Model
 
 
 class FileDB(Model):
     id = fields.IntField(pk=True)
     filename = fields.CharField(min_length=3, max_length=100)
-    path = fields.CharField(min_length=3, max_length=200)
+    path = fields.CharField(min_length=3, max_length=200, index=True)
     owner = fields.IntField()
     desc = fields.CharField(min_length=3, max_length=400)
     number_of_pages = fields.IntField()
+    digest = fields.CharField(max_length=64, null=True, index=True)
+    size = fields.BigIntField(null=True)
+
+    class Meta:
+        indexes = (("owner", "id"),)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class JobDB(Model):
+    id = fields.IntField(pk=True)
+    owner = fields.IntField()
+    status = fields.CharEnumField(JobStatus, max_length=10, default=JobStatus.QUEUED)
+    sources = fields.JSONField()
+    file_id = fields.IntField(null=True)
+    error = fields.CharField(max_length=400, null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        indexes = (("status", "id"),)
+
+
+class MergeCacheDB(Model):
+    id = fields.IntField(pk=True)
+    key = fields.CharField(max_length=64, unique=True)
+    path = fields.CharField(max_length=200, index=True)
+    number_of_pages = fields.IntField()
+    digest = fields.CharField(max_length=64)
+    size = fields.BigIntField()
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+
+class PdfAnalysisDB(Model):
+    id = fields.IntField(pk=True)
+    digest = fields.CharField(max_length=64, unique=True)
+    pdf_version = fields.CharField(max_length=10, null=True)
+    encrypted = fields.BooleanField(default=False)
+    number_of_pages = fields.IntField(null=True)
+    error = fields.CharField(max_length=200, null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+
+class FileSearchDB(Model):
+    id = fields.IntField(pk=True)
+    file = fields.OneToOneField("models.FileDB", related_name="search", on_delete=fields.CASCADE)
+    owner = fields.IntField(index=True)
+    # Digest of the content the document was built from; rows whose file content has changed since
+    # are ignored by searches until they are indexed again.
+    digest = fields.CharField(max_length=64, index=True)
+    document = TSVectorField()
+
+    class Meta:
+        indexes = (GinIndex(fields={"document"}),)
@@ -0,0 +1,75 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+
+from app.files.domain.persistences.exceptions import NotFoundException
+from app.files.domain.persistences.file_storage_interface import FileStorageInterface
+from app.files.domain.storage_paths import ensure_directory, temp_path
+from app.files.domain.uploads import write_upload
+from app.tracing import traced
+
+
+def _remove_if_exists(path: str):
+    try:
+        os.remove(path)
+
+    except FileNotFoundError:
+        pass
+
+
+def _read_range(path: str, start: int, length: int) -> bytes:
+    with open(path, 'rb') as buffer:
+        buffer.seek(start)
+        return buffer.read(length)
+
+
+@traced("storage")
+class FileStorageLocalPersistenceService(FileStorageInterface):
+    def __init__(self, chunk_size: int, fsync: bool = True):
+        self.chunk_size = chunk_size
+        self.fsync = fsync
+
+    async def save_upload(self, path: str, input_file: UploadFile) -> tuple[str, int]:
+        await asyncio.to_thread(ensure_directory, path)
+
+        return await write_upload(input_file=input_file, path=path, chunk_size=self.chunk_size, fsync=self.fsync)
+
+    def scratch_path(self) -> str:
+        # Inside the storage root, so saving the file is a rename on the same filesystem.
+        return temp_path()
+
+    async def save_local(self, local_path: str, path: str):
+        await asyncio.to_thread(ensure_directory, path)
+        await asyncio.to_thread(os.replace, local_path, path)
+
+    @asynccontextmanager
+    async def open_local(self, path: str) -> AsyncIterator[str]:
+        yield path
+
+    async def exists(self, path: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, path)
+
+    async def size(self, path: str) -> int:
+        try:
+            return (await asyncio.to_thread(os.stat, path)).st_size
+
+        except FileNotFoundError:
+            raise NotFoundException
+
+    async def read(self, path: str, start: int, end: int) -> AsyncIterator[bytes]:
+        position = start
+        while position <= end:
+            chunk = await asyncio.to_thread(_read_range, path, position, min(self.chunk_size, end - position + 1))
+            if not chunk:
+                break
+            position += len(chunk)
+            yield chunk
+
+    async def delete(self, path: str):
+        await asyncio.to_thread(_remove_if_exists, path)
+
+    def local_path(self, path: str) -> Optional[str]:
+        return path
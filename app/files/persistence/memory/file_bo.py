@@ -0,0 +1,153 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from typing import Callable, Optional
+
+from app.files.domain.persistences.exceptions import NotFoundException
+from app.files.domain.persistences.file_bo_interface import FileBOInterface
+from app.files.domain.bo.file_bo import FileBO
+from app.metrics import measured
+
+
+@measured
+class FileBOMemoryPersistenceService(FileBOInterface):
+    # Methods never await, so each one runs atomically on the event loop and needs no locks.
+    # Ids only grow, so the id lists stay sorted by appending and are searched with bisect.
+    def __init__(self):
+        self.files: dict[int, FileBO] = {}
+        self.file_ids: list[int] = []
+        self.file_ids_by_owner: dict[int, list[int]] = {}
+        self.file_ids_by_digest: dict[str, set[int]] = {}
+        self.path_references: Counter = Counter()
+        self.new_file_id = 1
+        self.file_deleted_listeners: list[Callable[[int], None]] = []
+
+    def add_file_deleted_listener(self, listener: Callable[[int], None]):
+        self.file_deleted_listeners.append(listener)
+
+    def add(self, file: FileBO):
+        file.id = self.new_file_id
+        self.new_file_id += 1
+        self.files[file.id] = file.model_copy()
+        self.file_ids.append(file.id)
+        self.file_ids_by_owner.setdefault(file.owner, []).append(file.id)
+        self.index(self.files[file.id])
+
+    def index(self, file: FileBO):
+        if file.digest is not None:
+            self.file_ids_by_digest.setdefault(file.digest, set()).add(file.id)
+        if file.path != '':
+            self.path_references[file.path] += 1
+
+    def unindex(self, file: FileBO):
+        if file.digest is not None:
+            file_ids = self.file_ids_by_digest[file.digest]
+            file_ids.discard(file.id)
+            if len(file_ids) == 0:
+                del self.file_ids_by_digest[file.digest]
+        if file.path != '':
+            self.path_references[file.path] -= 1
+            if self.path_references[file.path] == 0:
+                del self.path_references[file.path]
+
+    def remove(self, file_id: int) -> str:
+        file = self.files.pop(file_id)
+        self.unindex(file)
+        del self.file_ids[bisect_left(self.file_ids, file_id)]
+        owner_file_ids = self.file_ids_by_owner[file.owner]
+        del owner_file_ids[bisect_left(owner_file_ids, file_id)]
+        if len(owner_file_ids) == 0:
+            del self.file_ids_by_owner[file.owner]
+
+        for listener in self.file_deleted_listeners:
+            listener(file_id)
+
+        return file.path
+
+    async def get_files_by_owner_id(self, owner_id: int) -> list[FileBO]:
+        return [self.files[file_id].model_copy() for file_id in self.file_ids_by_owner.get(owner_id, [])]
+
+    async def get_files_page(
+        self,
+        owner_id: int,
+        after_id: Optional[int],
+        limit: int,
+        descending: bool = False,
+        fields: Optional[list[str]] = None
+    ) -> list[dict]:
+        file_ids = self.file_ids_by_owner.get(owner_id, [])
+        if descending:
+            stop = len(file_ids) if after_id is None else bisect_left(file_ids, after_id)
+            page = file_ids[max(stop - limit, 0):stop][::-1]
+        else:
+            start = 0 if after_id is None else bisect_right(file_ids, after_id)
+            page = file_ids[start:start + limit]
+
+        if fields is None:
+            fields = list(FileBO.model_fields)
+
+        return [{field: getattr(self.files[file_id], field) for field in fields} for file_id in page]
+
+    async def post_file(self, file: FileBO) -> FileBO:
+        self.add(file)
+        return file
+
+    async def post_files(self, files: list[FileBO]) -> list[FileBO]:
+        for file in files:
+            self.add(file)
+
+        return files
+
+    async def get_file_by_id(self, file_id: int) -> FileBO:
+        # Some routes pass the id from the path as a string, which Postgres casts itself.
+        file_id = int(file_id)
+        if file_id not in self.files:
+            raise NotFoundException
+
+        return self.files[file_id].model_copy()
+
+    async def update_file(self, file_id: int, data: FileBO):
+        file_id = int(file_id)
+        if file_id not in self.files:
+            raise NotFoundException
+
+        file = self.files[file_id]
+        self.unindex(file)
+        if data.owner != file.owner:
+            owner_file_ids = self.file_ids_by_owner[file.owner]
+            del owner_file_ids[bisect_left(owner_file_ids, file_id)]
+            if len(owner_file_ids) == 0:
+                del self.file_ids_by_owner[file.owner]
+            insort(self.file_ids_by_owner.setdefault(data.owner, []), file_id)
+
+        self.files[file_id] = data.model_copy(update={'id': file_id})
+        self.index(self.files[file_id])
+
+    async def delete_file(self, file_id: int, owner: int) -> str:
+        file_id = int(file_id)
+        if file_id not in self.files or self.files[file_id].owner != owner:
+            raise NotFoundException
+
+        return self.remove(file_id)
+
+    async def delete_files(self, file_ids: list[int], owner: int) -> dict[int, str]:
+        deleted = {}
+        for file_id in file_ids:
+            if file_id in self.files and self.files[file_id].owner == owner:
+                deleted[file_id] = self.remove(file_id)
+
+        return deleted
+
+    async def get_stored_files(self, after_id: int, limit: int) -> list[FileBO]:
+        result = []
+        for index in range(bisect_right(self.file_ids, after_id), len(self.file_ids)):
+            file = self.files[self.file_ids[index]]
+            if file.digest is not None and file.path != '':
+                result.append(file.model_copy())
+                if len(result) == limit:
+                    break
+
+        return result
+
+    async def set_number_of_pages(self, digest: str, number_of_pages: int):
+        for file_id in self.file_ids_by_digest.get(digest, set()):
+            self.files[file_id].number_of_pages = number_of_pages
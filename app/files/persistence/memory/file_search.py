@@ -0,0 +1,102 @@
+import asyncio
+import heapq
+import re
+from collections import Counter
+
+from app.files.domain.persistences.file_search_interface import FileSearchInterface
+from app.files.persistence.memory.file_bo import FileBOMemoryPersistenceService
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return [word.casefold() for word in WORD.findall(text)]
+
+
+class FileSearchMemoryPersistenceService(FileSearchInterface):
+    # Inverted index keyed by (owner, term), so a search only visits the files of its owner.
+    # Documents are term counts; rows with the same content share the same Counter.
+    def __init__(self, file_persistence_service: FileBOMemoryPersistenceService):
+        self.file_persistence_service = file_persistence_service
+        self.documents: dict[int, tuple[str, int, Counter]] = {}
+        self.file_ids_by_digest: dict[str, set[int]] = {}
+        self.postings: dict[tuple[int, str], set[int]] = {}
+        file_persistence_service.add_file_deleted_listener(self.remove)
+
+    def add(self, file_id: int, digest: str, owner: int, terms: Counter):
+        self.remove(file_id)
+        self.documents[file_id] = (digest, owner, terms)
+        self.file_ids_by_digest.setdefault(digest, set()).add(file_id)
+        for term in terms:
+            self.postings.setdefault((owner, term), set()).add(file_id)
+
+    def remove(self, file_id: int):
+        if file_id not in self.documents:
+            return
+
+        digest, owner, terms = self.documents.pop(file_id)
+        file_ids = self.file_ids_by_digest[digest]
+        file_ids.discard(file_id)
+        if len(file_ids) == 0:
+            del self.file_ids_by_digest[digest]
+        for term in terms:
+            file_ids = self.postings[(owner, term)]
+            file_ids.discard(file_id)
+            if len(file_ids) == 0:
+                del self.postings[(owner, term)]
+
+    def add_copies(self, digest: str, terms: Counter):
+        files = self.file_persistence_service.files
+        for file_id in list(self.file_persistence_service.file_ids_by_digest.get(digest, set())):
+            self.add(file_id=file_id, digest=digest, owner=files[file_id].owner, terms=terms)
+
+    async def index_content(self, digest: str, text: str):
+        terms = await asyncio.to_thread(lambda: Counter(tokenize(text)))
+        self.add_copies(digest=digest, terms=terms)
+
+    async def index_copies(self, digest: str) -> bool:
+        if digest not in self.file_ids_by_digest:
+            return False
+
+        source_id = next(iter(self.file_ids_by_digest[digest]))
+        self.add_copies(digest=digest, terms=self.documents[source_id][2])
+        return True
+
+    def is_current(self, file_id: int) -> bool:
+        file = self.file_persistence_service.files.get(file_id)
+        return file is not None and file.digest == self.documents[file_id][0]
+
+    async def get_indexed_file_ids(self, file_ids: list[int]) -> set[int]:
+        return {file_id for file_id in file_ids if file_id in self.documents and self.is_current(file_id)}
+
+    async def search(self, owner_id: int, query: str, limit: int, offset: int) -> list[dict]:
+        # Words must all match, "-word" excludes; quotes are accepted but phrases are not enforced.
+        included = []
+        excluded = []
+        for word in query.split():
+            if word.startswith('-'):
+                excluded.extend(tokenize(word))
+            else:
+                included.extend(tokenize(word))
+
+        if len(included) == 0:
+            return []
+
+        postings = sorted((self.postings.get((owner_id, term), set()) for term in set(included)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        for term in excluded:
+            candidates -= self.postings.get((owner_id, term), set())
+
+        ranked = heapq.nsmallest(
+            offset + limit,
+            (
+                (-sum(self.documents[file_id][2][term] for term in included), -file_id)
+                for file_id in candidates if self.is_current(file_id)
+            )
+        )
+
+        files = self.file_persistence_service.files
+        return [
+            {**files[-file_id].model_dump(), 'rank': float(-rank)}
+            for rank, file_id in ranked[offset:]
+        ]
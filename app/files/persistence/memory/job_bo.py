@@ -0,0 +1,65 @@
+import heapq
+import time
+from typing import Optional
+
+from app.files.domain.bo.job_bo import JobBO
+from app.files.domain.persistences.exceptions import NotFoundException
+from app.files.domain.persistences.job_bo_interface import JobBOInterface
+from app.files.models import JobStatus
+
+
+class JobBOMemoryPersistenceService(JobBOInterface):
+    # Queued jobs are kept in a heap so they are claimed in id order, like the Postgres queue.
+    def __init__(self):
+        self.jobs: dict[int, JobBO] = {}
+        self.queued: list[int] = []
+        self.running: dict[int, float] = {}
+        self.new_job_id = 1
+
+    async def create_job(self, job: JobBO) -> JobBO:
+        job.id = self.new_job_id
+        job.status = JobStatus.QUEUED.value
+        self.new_job_id += 1
+        self.jobs[job.id] = job.model_copy(deep=True)
+        heapq.heappush(self.queued, job.id)
+        return job
+
+    async def get_job_by_id(self, job_id: int) -> JobBO:
+        if job_id not in self.jobs:
+            raise NotFoundException
+
+        return self.jobs[job_id].model_copy(deep=True)
+
+    async def claim_job(self, stale_after: float) -> Optional[JobBO]:
+        now = time.monotonic()
+        job_id = self.queued[0] if len(self.queued) > 0 else None
+        for running_id, updated_at in self.running.items():
+            if updated_at < now - stale_after and (job_id is None or running_id < job_id):
+                job_id = running_id
+
+        if job_id is None:
+            return None
+
+        if len(self.queued) > 0 and job_id == self.queued[0]:
+            heapq.heappop(self.queued)
+
+        job = self.jobs[job_id]
+        job.status = JobStatus.RUNNING.value
+        self.running[job_id] = now
+
+        return job.model_copy(deep=True)
+
+    async def release_job(self, job_id: int):
+        self.running.pop(job_id, None)
+        self.jobs[job_id].status = JobStatus.QUEUED.value
+        heapq.heappush(self.queued, job_id)
+
+    async def complete_job(self, job_id: int, file_id: int):
+        self.running.pop(job_id, None)
+        self.jobs[job_id].status = JobStatus.DONE.value
+        self.jobs[job_id].file_id = file_id
+
+    async def fail_job(self, job_id: int, error: str):
+        self.running.pop(job_id, None)
+        self.jobs[job_id].status = JobStatus.FAILED.value
+        self.jobs[job_id].error = error[:400]
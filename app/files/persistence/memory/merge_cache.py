@@ -0,0 +1,73 @@
+from typing import Optional
+
+from app.files.domain.bo.file_bo import FileBO
+from app.files.domain.bo.merge_cache_bo import MergeCacheBO
+from app.files.domain.persistences.merge_cache_interface import MergeCacheInterface
+from app.files.persistence.memory.file_bo import FileBOMemoryPersistenceService
+
+
+class MergeCacheMemoryPersistenceService(MergeCacheInterface):
+    # Methods never await, so adding a row for an entry and releasing its path cannot interleave.
+    def __init__(self, file_persistence_service: FileBOMemoryPersistenceService):
+        self.file_persistence_service = file_persistence_service
+        self.entries: dict[str, MergeCacheBO] = {}
+        self.keys_by_path: dict[str, set[str]] = {}
+        self.new_entry_id = 1
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get_entry(self, key: str) -> Optional[MergeCacheBO]:
+        if key not in self.entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self.entries[key].model_copy()
+
+    async def put_entry(self, entry: MergeCacheBO) -> MergeCacheBO:
+        if entry.key in self.entries:
+            # A concurrent merge of the same inputs stored the entry first.
+            entry.id = self.entries[entry.key].id
+            return entry
+
+        entry.id = self.new_entry_id
+        self.new_entry_id += 1
+        self.entries[entry.key] = entry.model_copy()
+        self.keys_by_path.setdefault(entry.path, set()).add(entry.key)
+        return entry
+
+    async def post_cached_file(self, key: str, file: FileBO) -> Optional[FileBO]:
+        if key not in self.entries:
+            return None
+
+        entry = self.entries[key]
+        file = file.model_copy(update={
+            'path': entry.path,
+            'number_of_pages': entry.number_of_pages,
+            'digest': entry.digest,
+            'size': entry.size
+        })
+        self.file_persistence_service.add(file)
+        return file
+
+    async def release_paths(self, paths: list[str]) -> list[str]:
+        released = []
+        for path in dict.fromkeys(paths):
+            if path in self.file_persistence_service.path_references:
+                continue
+
+            for key in self.keys_by_path.pop(path, set()):
+                del self.entries[key]
+                self.evictions += 1
+            released.append(path)
+
+        return released
+
+    def metrics(self) -> list[tuple[str, str, str, dict[str, str], float]]:
+        return [
+            ("merge_cache_hits_total", "counter", "Merges answered by an existing output.", {}, self.hits),
+            ("merge_cache_misses_total", "counter", "Merges with no cached output.", {}, self.misses),
+            ("merge_cache_evictions_total", "counter", "Cached outputs removed once no file referenced them.", {},
+             self.evictions),
+        ]
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from app.files.domain.bo.pdf_analysis_bo import PdfAnalysisBO
+from app.files.domain.persistences.pdf_analysis_interface import PdfAnalysisInterface
+
+
+class PdfAnalysisMemoryPersistenceService(PdfAnalysisInterface):
+    def __init__(self):
+        self.analyses: dict[str, PdfAnalysisBO] = {}
+        self.new_analysis_id = 1
+
+    async def get_analysis(self, digest: str) -> Optional[PdfAnalysisBO]:
+        if digest not in self.analyses:
+            return None
+
+        return self.analyses[digest].model_copy()
+
+    async def get_analyses(self, digests: list[str]) -> dict[str, PdfAnalysisBO]:
+        return {digest: self.analyses[digest].model_copy() for digest in digests if digest in self.analyses}
+
+    async def put_analysis(self, analysis: PdfAnalysisBO) -> PdfAnalysisBO:
+        # The same content may have been analysed meanwhile for another row.
+        if analysis.digest not in self.analyses:
+            self.analyses[analysis.digest] = analysis.model_copy(update={'id': self.new_analysis_id})
+            self.new_analysis_id += 1
+
+        return self.analyses[analysis.digest].model_copy()
@@ -1,12 +1,25 @@
+from typing import Optional
+
+from tortoise import connections
+from tortoise.transactions import in_transaction
+
+from app.database import read_connections
 from app.files.domain.persistences.exceptions import NotFoundException, BadTokenException
 from app.files.domain.persistences.file_bo_interface import FileBOInterface
 from app.files.domain.bo.file_bo import FileBO
 from app.files.models import FileDB
+from app.metrics import measured
+
+INSERT_BATCH_SIZE = 1000
 
 
+@measured
 class FileBOPostgresPersistenceService(FileBOInterface):
     async def get_files_by_owner_id(self, owner_id: int) -> list[FileBO]:
-        files = await FileDB.filter(**{'owner': owner_id})
+        for connection in read_connections():
+            files = await FileDB.filter(**{'owner': owner_id}).using_db(connection)
+            if len(files) > 0:
+                break
 
         result = []
         for file in files:
@@ -17,26 +30,82 @@ class FileBOPostgresPersistenceService(FileBOInterface):
                     path=file.path,
                     owner=file.owner,
                     desc=file.desc,
-                    number_of_pages=file.number_of_pages
+                    number_of_pages=file.number_of_pages,
+                    digest=file.digest,
+                    size=file.size
                 )
             )
 
         return result
 
+    async def get_files_page(
+        self,
+        owner_id: int,
+        after_id: Optional[int],
+        limit: int,
+        descending: bool = False,
+        fields: Optional[list[str]] = None
+    ) -> list[dict]:
+        # Keyset pagination over the (owner, id) index: each page is a bounded index range scan.
+        query = FileDB.filter(**{'owner': owner_id})
+        if after_id is not None:
+            query = query.filter(**{'id__lt' if descending else 'id__gt': after_id})
+
+        query = query.order_by('-id' if descending else 'id').limit(limit)
+        if fields is None:
+            fields = list(FileBO.model_fields)
+
+        for connection in read_connections():
+            files = await query.using_db(connection).values(*fields)
+            if len(files) > 0:
+                break
+
+        return files
+
     async def post_file(self, file: FileBO) -> FileBO:
         new_file = await FileDB.create(
             filename=file.filename,
             path=file.path,
             owner=file.owner,
             desc=file.desc,
-            number_of_pages=file.number_of_pages
+            number_of_pages=file.number_of_pages,
+            digest=file.digest,
+            size=file.size
         )
         file.id = new_file.id
         return file
 
+    async def post_files(self, files: list[FileBO]) -> list[FileBO]:
+        # One multi-row INSERT ... RETURNING per batch, all in a single transaction. bulk_create
+        # does not report the generated ids on asyncpg, and callers need them to upload content.
+        columns = ['filename', 'path', 'owner', 'desc', 'number_of_pages', 'digest', 'size']
+        async with in_transaction('default') as connection:
+            for start in range(0, len(files), INSERT_BATCH_SIZE):
+                batch = files[start:start + INSERT_BATCH_SIZE]
+                rows = []
+                values = []
+                for file in batch:
+                    placeholders = ['$' + str(len(values) + index + 1) for index in range(len(columns))]
+                    rows.append('(' + ', '.join(placeholders) + ')')
+                    values.extend(getattr(file, column) for column in columns)
+
+                query = 'INSERT INTO "filedb" ({}) VALUES {} RETURNING "id"'.format(
+                    ', '.join('"' + column + '"' for column in columns),
+                    ', '.join(rows)
+                )
+                _, inserted = await connection.execute_query(query, values)
+                for file, row in zip(batch, inserted):
+                    file.id = row['id']
+
+        return files
+
     async def get_file_by_id(self, file_id: int) -> FileBO:
-        files = await FileDB.filter(**{'id': file_id})
-        if len(files) == 0:
+        for connection in read_connections():
+            files = await FileDB.filter(**{'id': file_id}).using_db(connection)
+            if len(files) > 0:
+                break
+
+        else:
             raise NotFoundException
 
         file = files[0]
@@ -46,7 +115,9 @@ class FileBOPostgresPersistenceService(FileBOInterface):
             path=file.path,
             owner=file.owner,
             desc=file.desc,
-            number_of_pages=file.number_of_pages
+            number_of_pages=file.number_of_pages,
+            digest=file.digest,
+            size=file.size
         )
 
     async def update_file(self, file_id: int, data: FileBO):
@@ -60,6 +131,8 @@ class FileBOPostgresPersistenceService(FileBOInterface):
         file.owner = data.owner
         file.desc = data.desc
         file.number_of_pages = data.number_of_pages
+        file.digest = data.digest
+        file.size = data.size
 
         await file.save()
 
@@ -77,3 +150,33 @@ class FileBOPostgresPersistenceService(FileBOInterface):
         await file.delete()
 
         return path
+
+    async def delete_files(self, file_ids: list[int], owner: int) -> dict[int, str]:
+        # execute_query discards the rows of a DELETE, so RETURNING needs execute_query_dict.
+        deleted = await connections.get('default').execute_query_dict(
+            'DELETE FROM "filedb" WHERE "id" = ANY($1::int[]) AND "owner" = $2 RETURNING "id", "path"',
+            [file_ids, owner]
+        )
+
+        return {row['id']: row['path'] for row in deleted}
+
+    async def get_stored_files(self, after_id: int, limit: int) -> list[FileBO]:
+        files = await FileDB.filter(**{'id__gt': after_id, 'digest__not_isnull': True}).exclude(**{'path': ''}) \
+            .order_by('id').limit(limit)
+
+        return [
+            FileBO(
+                id=file.id,
+                filename=file.filename,
+                path=file.path,
+                owner=file.owner,
+                desc=file.desc,
+                number_of_pages=file.number_of_pages,
+                digest=file.digest,
+                size=file.size
+            )
+            for file in files
+        ]
+
+    async def set_number_of_pages(self, digest: str, number_of_pages: int):
+        await FileDB.filter(**{'digest': digest}).update(number_of_pages=number_of_pages)
@@ -0,0 +1,59 @@
+from tortoise import connections
+
+from app.config import FilesSettings, files_settings
+from app.files.domain.persistences.file_search_interface import FileSearchInterface
+
+# The rows are locked like the foreign key check would, so a copy deleted meanwhile is skipped
+# instead of failing the insert.
+COPIES = 'WITH f AS (SELECT "id", "owner", "digest" FROM "filedb" WHERE "digest" = $1 FOR KEY SHARE) '
+UPSERT = 'ON CONFLICT ("file_id") DO UPDATE SET "digest" = EXCLUDED."digest", "document" = EXCLUDED."document"'
+
+
+class FileSearchPostgresPersistenceService(FileSearchInterface):
+    def __init__(self, settings: FilesSettings = files_settings):
+        self.settings = settings
+
+    async def index_content(self, digest: str, text: str):
+        # Every row holding this content gets its own owner-scoped document.
+        await connections.get('default').execute_query(
+            COPIES + 'INSERT INTO "filesearchdb" ("file_id", "owner", "digest", "document") '
+            'SELECT "id", "owner", "digest", to_tsvector($2::regconfig, $3) FROM f ' + UPSERT,
+            [digest, self.settings.search_config, text]
+        )
+
+    async def index_copies(self, digest: str) -> bool:
+        # Reuses the document of a row with the same content, so the text is only extracted once.
+        count, _ = await connections.get('default').execute_query(
+            COPIES + 'INSERT INTO "filesearchdb" ("file_id", "owner", "digest", "document") '
+            'SELECT f."id", f."owner", f."digest", s."document" FROM f, '
+            '(SELECT "document" FROM "filesearchdb" WHERE "digest" = $1 LIMIT 1) s ' + UPSERT + ' RETURNING "file_id"',
+            [digest]
+        )
+
+        return count > 0
+
+    async def get_indexed_file_ids(self, file_ids: list[int]) -> set[int]:
+        if len(file_ids) == 0:
+            return set()
+
+        rows = await connections.get('default').execute_query_dict(
+            'SELECT s."file_id" FROM "filesearchdb" s '
+            'JOIN "filedb" f ON f."id" = s."file_id" AND f."digest" = s."digest" '
+            'WHERE s."file_id" = ANY($1::int[])',
+            [file_ids]
+        )
+
+        return {row['file_id'] for row in rows}
+
+    async def search(self, owner_id: int, query: str, limit: int, offset: int) -> list[dict]:
+        # Documents built from content the file no longer has are skipped by the digest join.
+        return await connections.get('default').execute_query_dict(
+            'SELECT f."id", f."filename", f."path", f."owner", f."desc", f."number_of_pages", f."digest", '
+            'f."size", ts_rank_cd(s."document", q) AS "rank" '
+            'FROM "filesearchdb" s '
+            'JOIN "filedb" f ON f."id" = s."file_id" AND f."digest" = s."digest", '
+            'websearch_to_tsquery($1::regconfig, $2) q '
+            'WHERE s."owner" = $3 AND s."document" @@ q '
+            'ORDER BY "rank" DESC, f."id" DESC LIMIT $4 OFFSET $5',
+            [self.settings.search_config, query, owner_id, limit, offset]
+        )
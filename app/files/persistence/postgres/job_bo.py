@@ -0,0 +1,74 @@
+from datetime import timedelta
+from typing import Optional
+
+from tortoise import timezone
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
+
+from app.files.domain.bo.job_bo import JobBO
+from app.files.domain.persistences.exceptions import NotFoundException
+from app.files.domain.persistences.job_bo_interface import JobBOInterface
+from app.files.models import JobDB, JobStatus
+
+
+class JobBOPostgresPersistenceService(JobBOInterface):
+    async def create_job(self, job: JobBO) -> JobBO:
+        new_job = await JobDB.create(
+            owner=job.owner,
+            status=JobStatus.QUEUED,
+            sources=[source.model_dump() for source in job.sources]
+        )
+        job.id = new_job.id
+        job.status = new_job.status.value
+        return job
+
+    async def get_job_by_id(self, job_id: int) -> JobBO:
+        jobs = await JobDB.filter(**{'id': job_id})
+        if len(jobs) == 0:
+            raise NotFoundException
+
+        job = jobs[0]
+        return JobBO(
+            id=job.id,
+            owner=job.owner,
+            status=job.status.value,
+            sources=job.sources,
+            file_id=job.file_id,
+            error=job.error
+        )
+
+    async def claim_job(self, stale_after: float) -> Optional[JobBO]:
+        # SKIP LOCKED lets several app instances drain the queue without blocking each other.
+        # Jobs left running by an instance that died are picked up again once they are stale.
+        stale_before = timezone.now() - timedelta(seconds=stale_after)
+        async with in_transaction('default') as connection:
+            job = await JobDB.filter(
+                Q(status=JobStatus.QUEUED) | Q(status=JobStatus.RUNNING, updated_at__lt=stale_before)
+            ).order_by('id').select_for_update(skip_locked=True).using_db(connection).first()
+            if job is None:
+                return None
+
+            job.status = JobStatus.RUNNING
+            await job.save(using_db=connection, update_fields=['status', 'updated_at'])
+
+        return JobBO(
+            id=job.id,
+            owner=job.owner,
+            status=job.status.value,
+            sources=job.sources,
+            file_id=job.file_id,
+            error=job.error
+        )
+
+    async def release_job(self, job_id: int):
+        await JobDB.filter(**{'id': job_id}).update(status=JobStatus.QUEUED, updated_at=timezone.now())
+
+    async def complete_job(self, job_id: int, file_id: int):
+        await JobDB.filter(**{'id': job_id}).update(
+            status=JobStatus.DONE, file_id=file_id, updated_at=timezone.now()
+        )
+
+    async def fail_job(self, job_id: int, error: str):
+        await JobDB.filter(**{'id': job_id}).update(
+            status=JobStatus.FAILED, error=error[:400], updated_at=timezone.now()
+        )
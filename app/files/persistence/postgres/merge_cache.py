@@ -0,0 +1,102 @@
+from typing import Optional
+
+from tortoise import connections
+from tortoise.exceptions import IntegrityError
+from tortoise.transactions import in_transaction
+
+from app.files.domain.bo.file_bo import FileBO
+from app.files.domain.bo.merge_cache_bo import MergeCacheBO
+from app.files.domain.persistences.merge_cache_interface import MergeCacheInterface
+from app.files.models import MergeCacheDB
+
+
+class MergeCachePostgresPersistenceService(MergeCacheInterface):
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get_entry(self, key: str) -> Optional[MergeCacheBO]:
+        entries = await MergeCacheDB.filter(**{'key': key})
+        if len(entries) == 0:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        entry = entries[0]
+        return MergeCacheBO(
+            id=entry.id,
+            key=entry.key,
+            path=entry.path,
+            number_of_pages=entry.number_of_pages,
+            digest=entry.digest,
+            size=entry.size
+        )
+
+    async def put_entry(self, entry: MergeCacheBO) -> MergeCacheBO:
+        try:
+            new_entry = await MergeCacheDB.create(
+                key=entry.key,
+                path=entry.path,
+                number_of_pages=entry.number_of_pages,
+                digest=entry.digest,
+                size=entry.size
+            )
+
+        except IntegrityError:
+            # A concurrent merge of the same inputs stored the entry first.
+            new_entry = await MergeCacheDB.get(key=entry.key)
+
+        entry.id = new_entry.id
+        return entry
+
+    async def post_cached_file(self, key: str, file: FileBO) -> Optional[FileBO]:
+        # The entry is locked while the row is added, so release_paths either sees the new row or
+        # has already removed the entry, in which case nothing is added.
+        rows = await connections.get('default').execute_query_dict(
+            'WITH e AS (SELECT "path", "number_of_pages", "digest", "size" FROM "mergecachedb" '
+            'WHERE "key" = $1 FOR SHARE) '
+            'INSERT INTO "filedb" ("filename", "path", "owner", "desc", "number_of_pages", "digest", "size") '
+            'SELECT $2, e."path", $3, $4, e."number_of_pages", e."digest", e."size" FROM e '
+            'RETURNING "id", "path", "number_of_pages", "digest", "size"',
+            [key, file.filename, file.owner, file.desc]
+        )
+        if len(rows) == 0:
+            return None
+
+        return file.model_copy(update=rows[0])
+
+    async def release_paths(self, paths: list[str]) -> list[str]:
+        # Removes the entries of the paths no row references any more and returns those paths,
+        # whose objects can then be deleted. The entries are locked before the rows are checked.
+        if len(paths) == 0:
+            return []
+
+        async with in_transaction('default') as connection:
+            await connection.execute_query(
+                'SELECT "id" FROM "mergecachedb" WHERE "path" = ANY($1::text[]) ORDER BY "id" FOR UPDATE',
+                [paths]
+            )
+            rows = await connection.execute_query_dict(
+                'SELECT DISTINCT "path" FROM "filedb" WHERE "path" = ANY($1::text[])',
+                [paths]
+            )
+            referenced = {row['path'] for row in rows}
+            released = [path for path in dict.fromkeys(paths) if path not in referenced]
+            evicted = 0
+            if len(released) > 0:
+                evicted, _ = await connection.execute_query(
+                    'DELETE FROM "mergecachedb" WHERE "path" = ANY($1::text[])',
+                    [released]
+                )
+
+        self.evictions += evicted
+        return released
+
+    def metrics(self) -> list[tuple[str, str, str, dict[str, str], float]]:
+        return [
+            ("merge_cache_hits_total", "counter", "Merges answered by an existing output.", {}, self.hits),
+            ("merge_cache_misses_total", "counter", "Merges with no cached output.", {}, self.misses),
+            ("merge_cache_evictions_total", "counter", "Cached outputs removed once no file referenced them.", {},
+             self.evictions),
+        ]
@@ -0,0 +1,51 @@
+from typing import Optional
+
+from tortoise.exceptions import IntegrityError
+
+from app.files.domain.bo.pdf_analysis_bo import PdfAnalysisBO
+from app.files.domain.persistences.pdf_analysis_interface import PdfAnalysisInterface
+from app.files.models import PdfAnalysisDB
+
+
+def to_bo(analysis: PdfAnalysisDB) -> PdfAnalysisBO:
+    return PdfAnalysisBO(
+        id=analysis.id,
+        digest=analysis.digest,
+        pdf_version=analysis.pdf_version,
+        encrypted=analysis.encrypted,
+        number_of_pages=analysis.number_of_pages,
+        error=analysis.error
+    )
+
+
+class PdfAnalysisPostgresPersistenceService(PdfAnalysisInterface):
+    async def get_analysis(self, digest: str) -> Optional[PdfAnalysisBO]:
+        analysis = await PdfAnalysisDB.filter(**{'digest': digest}).first()
+        if analysis is None:
+            return None
+
+        return to_bo(analysis)
+
+    async def get_analyses(self, digests: list[str]) -> dict[str, PdfAnalysisBO]:
+        if len(digests) == 0:
+            return {}
+
+        analyses = await PdfAnalysisDB.filter(**{'digest__in': list(set(digests))})
+
+        return {analysis.digest: to_bo(analysis) for analysis in analyses}
+
+    async def put_analysis(self, analysis: PdfAnalysisBO) -> PdfAnalysisBO:
+        try:
+            new_analysis = await PdfAnalysisDB.create(
+                digest=analysis.digest,
+                pdf_version=analysis.pdf_version,
+                encrypted=analysis.encrypted,
+                number_of_pages=analysis.number_of_pages,
+                error=analysis.error
+            )
+
+        except IntegrityError:
+            # The same content was analysed concurrently, for another row or by another process.
+            new_analysis = await PdfAnalysisDB.get(digest=analysis.digest)
+
+        return to_bo(new_analysis)
@@ -0,0 +1,281 @@
+import asyncio
+import datetime
+import hashlib
+import hmac
+import os
+import tempfile
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import aiohttp
+from fastapi import UploadFile
+from yarl import URL
+
+from app.config import S3Settings, s3_settings
+from app.files.domain.persistences.exceptions import NotFoundException
+from app.files.domain.persistences.file_storage_interface import FileStorageInterface
+from app.tracing import traced
+
+READ_CHUNK_SIZE = 256 * 1024
+# Bodies are not hashed for the signature, so uploads can be streamed; S3, MinIO and moto accept it.
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def _read_part(path: str, offset: int, length: int) -> bytes:
+    with open(path, 'rb') as buffer:
+        buffer.seek(offset)
+        return buffer.read(length)
+
+
+def _remove_if_exists(path: str):
+    try:
+        os.remove(path)
+
+    except FileNotFoundError:
+        pass
+
+
+@traced("storage")
+class FileStorageS3PersistenceService(FileStorageInterface):
+    def __init__(self, settings: S3Settings = s3_settings):
+        self.settings = settings
+        self.base_url = settings.endpoint_url.rstrip('/') + '/' + quote(settings.bucket, safe='')
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        if self.session is not None and not self.session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(limit=self.settings.pool_limit)
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=self.settings.connect_timeout,
+            sock_read=self.settings.read_timeout
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def sign(self, method: str, url: URL, canonical_query: str, headers: dict[str, str]) -> dict[str, str]:
+        amz_date = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        date = amz_date[:8]
+        host = url.raw_host if url.is_default_port() else '{}:{}'.format(url.raw_host, url.port)
+        signed = {'host': host, 'x-amz-content-sha256': UNSIGNED_PAYLOAD, 'x-amz-date': amz_date}
+
+        signed_headers = ';'.join(sorted(signed))
+        canonical_request = '\n'.join([
+            method,
+            url.raw_path,
+            canonical_query,
+            ''.join('{}:{}\n'.format(name, signed[name]) for name in sorted(signed)),
+            signed_headers,
+            UNSIGNED_PAYLOAD
+        ])
+        scope = '{}/{}/s3/aws4_request'.format(date, self.settings.region)
+        string_to_sign = '\n'.join([
+            'AWS4-HMAC-SHA256',
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+
+        key = _hmac(('AWS4' + self.settings.secret_access_key).encode(), date)
+        for part in [self.settings.region, 's3', 'aws4_request']:
+            key = _hmac(key, part)
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        signed['authorization'] = 'AWS4-HMAC-SHA256 Credential={}/{}, SignedHeaders={}, Signature={}'.format(
+            self.settings.access_key_id, scope, signed_headers, signature
+        )
+
+        return {**headers, **signed}
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        query: Optional[dict[str, str]] = None,
+        headers: Optional[dict[str, str]] = None,
+        data: Optional[bytes] = None
+    ) -> aiohttp.ClientResponse:
+        await self.start()
+
+        canonical_query = '&'.join(sorted(
+            quote(name, safe='-_.~') + '=' + quote(value, safe='-_.~') for name, value in (query or {}).items()
+        ))
+        raw_url = self.base_url + '/' + quote(path, safe='/-_.~')
+        if canonical_query != '':
+            raw_url += '?' + canonical_query
+        url = URL(raw_url, encoded=True)
+
+        return await self.session.request(
+            method,
+            url,
+            headers=self.sign(method, url, canonical_query, headers or {}),
+            data=data
+        )
+
+    async def head(self, path: str) -> Optional[int]:
+        async with await self.request('HEAD', path) as response:
+            if response.status == 404:
+                return None
+
+            response.raise_for_status()
+            return int(response.headers['content-length'])
+
+    async def put_object(self, path: str, data: bytes):
+        async with await self.request('PUT', path, data=data) as response:
+            response.raise_for_status()
+
+    async def upload_part(self, path: str, upload_id: str, number: int, data: bytes) -> str:
+        query = {'partNumber': str(number), 'uploadId': upload_id}
+        async with await self.request('PUT', path, query=query, data=data) as response:
+            response.raise_for_status()
+            return response.headers['etag']
+
+    async def abort_upload(self, path: str, upload_id: str):
+        async with await self.request('DELETE', path, query={'uploadId': upload_id}) as response:
+            if response.status != 404:
+                response.raise_for_status()
+
+    async def upload_parts(self, path: str, parts: AsyncIterator[bytes]):
+        async with await self.request('POST', path, query={'uploads': ''}) as response:
+            response.raise_for_status()
+            upload_id = ElementTree.fromstring(await response.read()).findtext('{*}UploadId')
+
+        # A slot is taken before the next part is read, so at most max_concurrency parts are held
+        # in memory and in flight at once.
+        slots = asyncio.Semaphore(self.settings.max_concurrency)
+
+        async def send(number: int, data: bytes) -> str:
+            try:
+                return await self.upload_part(path=path, upload_id=upload_id, number=number, data=data)
+
+            finally:
+                slots.release()
+
+        tasks = []
+        try:
+            while True:
+                await slots.acquire()
+                data = await anext(parts, None)
+                if data is None:
+                    slots.release()
+                    break
+
+                tasks.append(asyncio.create_task(send(len(tasks) + 1, data)))
+
+            etags = await asyncio.gather(*tasks)
+
+            body = '<CompleteMultipartUpload>{}</CompleteMultipartUpload>'.format(''.join(
+                '<Part><PartNumber>{}</PartNumber><ETag>{}</ETag></Part>'.format(number, escape(etag))
+                for number, etag in enumerate(etags, start=1)
+            ))
+            async with await self.request('POST', path, query={'uploadId': upload_id}, data=body.encode()) as response:
+                response.raise_for_status()
+                # S3 may report a failed completion in the body of a 200 response.
+                result = ElementTree.fromstring(await response.read())
+                if result.tag.endswith('Error'):
+                    raise aiohttp.ClientError(result.findtext('{*}Message') or result.findtext('Message'))
+
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.shield(self.abort_upload(path=path, upload_id=upload_id))
+            raise
+
+    async def save_upload(self, path: str, input_file: UploadFile) -> tuple[str, int]:
+        part_size = self.settings.part_size
+        digest = hashlib.sha256()
+        first = await input_file.read(part_size)
+        await asyncio.to_thread(digest.update, first)
+        size = len(first)
+
+        if size < part_size:
+            await self.put_object(path=path, data=first)
+            return digest.hexdigest(), size
+
+        async def parts() -> AsyncIterator[bytes]:
+            nonlocal size
+            data = first
+            while data:
+                yield data
+                data = await input_file.read(part_size)
+                await asyncio.to_thread(digest.update, data)
+                size += len(data)
+
+        await self.upload_parts(path=path, parts=parts())
+
+        return digest.hexdigest(), size
+
+    def scratch_path(self) -> str:
+        return os.path.join(tempfile.gettempdir(), 'carlemany-' + str(uuid.uuid4()) + '.part')
+
+    async def save_local(self, local_path: str, path: str):
+        part_size = self.settings.part_size
+        try:
+            size = await asyncio.to_thread(os.path.getsize, local_path)
+            if size < part_size:
+                await self.put_object(path=path, data=await asyncio.to_thread(_read_part, local_path, 0, size))
+                return
+
+            async def parts() -> AsyncIterator[bytes]:
+                for offset in range(0, size, part_size):
+                    yield await asyncio.to_thread(_read_part, local_path, offset, part_size)
+
+            await self.upload_parts(path=path, parts=parts())
+
+        finally:
+            await asyncio.to_thread(_remove_if_exists, local_path)
+
+    @asynccontextmanager
+    async def open_local(self, path: str) -> AsyncIterator[str]:
+        # pypdf needs a seekable file, so the object is downloaded to a scratch file first.
+        local_path = self.scratch_path()
+        try:
+            size = await self.size(path)
+            with await asyncio.to_thread(open, local_path, 'wb') as buffer:
+                if size > 0:
+                    async for chunk in self.read(path, 0, size - 1):
+                        await asyncio.to_thread(buffer.write, chunk)
+
+            yield local_path
+
+        finally:
+            await asyncio.to_thread(_remove_if_exists, local_path)
+
+    async def exists(self, path: str) -> bool:
+        return await self.head(path) is not None
+
+    async def size(self, path: str) -> int:
+        size = await self.head(path)
+        if size is None:
+            raise NotFoundException
+
+        return size
+
+    async def read(self, path: str, start: int, end: int) -> AsyncIterator[bytes]:
+        headers = {'range': 'bytes={}-{}'.format(start, end)}
+        async with await self.request('GET', path, headers=headers) as response:
+            if response.status == 404:
+                raise NotFoundException
+
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                yield chunk
+
+    async def delete(self, path: str):
+        async with await self.request('DELETE', path) as response:
+            if response.status != 404:
+                response.raise_for_status()
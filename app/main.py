@@ -1,9 +1,24 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from tortoise import connections
 from tortoise.contrib.fastapi import register_tortoise
 
 from app.authentication.api.router import router as authentication_router
+from app.authentication.dependency_injection.workers.token_purge_workers import TokenPurgeWorkers
 from app.files.api.router import router as files_router
-from app.config import DATABASE_URL, models
+from app.files.dependency_injection.domain.get_file_pages_controllers import GetFilePagesControllers
+from app.files.dependency_injection.external.authentication_apis import AuthenticationApis
+from app.files.dependency_injection.persistences.file_storages import FileStorages
+from app.files.dependency_injection.persistences.merge_cache_persistences import MergeCachePersistences
+from app.files.dependency_injection.workers.merge_executors import MergeExecutors
+from app.files.dependency_injection.workers.merge_job_workers import MergeJobWorkers
+from app.files.dependency_injection.workers.pdf_analysis_workers import PdfAnalysisWorkers
+from app.config import persistence_settings
+from app.database import TORTOISE_ORM, pool_metrics
+from app.metrics import MetricsExporter, RequestMetricsMiddleware, add_collector, render_metrics
+from app.tracing import ProfilingMiddleware
 
 description = """
 # Universidad Carlemany
@@ -26,13 +41,63 @@ metadata = [
     }
 ]
 
-app = FastAPI(title='Activity03', description=description, tags_metadata=metadata)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # A custom lifespan replaces the on_event handlers, so the ones registered by
+    # register_tortoise are run explicitly here.
+    await app.router.startup()
+    # Tortoise opens its pool lazily; opening it here keeps the first transactions of the
+    # background workers from racing to create separate pools.
+    if persistence_settings.backend == "postgres":
+        for name in TORTOISE_ORM["connections"]:
+            await connections.get(name).create_connection(with_db=True)
+        add_collector(pool_metrics)
+    authentication_api = AuthenticationApis.carlemany()
+    await authentication_api.start()
+    if authentication_api.cache is not None:
+        add_collector(authentication_api.cache.metrics)
+    file_storage = FileStorages.carlemany()
+    await file_storage.start()
+    merge_executor = MergeExecutors.carlemany()
+    merge_executor.start()
+    add_collector(MergeCachePersistences.carlemany().metrics)
+    add_collector(GetFilePagesControllers.carlemany().reader_cache.metrics)
+    merge_job_worker = MergeJobWorkers.carlemany()
+    merge_job_worker.start()
+    pdf_analysis_worker = PdfAnalysisWorkers.carlemany()
+    pdf_analysis_worker.start()
+    token_purge_worker = TokenPurgeWorkers.carlemany()
+    token_purge_worker.start()
+    metrics_exporter = MetricsExporter()
+    metrics_exporter.start()
+
+    yield
+
+    await metrics_exporter.close()
+    await token_purge_worker.close()
+    await pdf_analysis_worker.close()
+    await merge_job_worker.close()
+    await merge_executor.close()
+    await file_storage.close()
+    await authentication_api.close()
+    await app.router.shutdown()
+
+
+app = FastAPI(title='Activity03', description=description, tags_metadata=metadata, lifespan=lifespan)
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
 app.include_router(authentication_router, prefix='/auth', tags=['Authentication'])
 app.include_router(files_router, prefix='/files', tags=['Files'])
-register_tortoise(
-    app,
-    db_url=DATABASE_URL,
-    modules={"models": models},
-    generate_schemas=False,
-    add_exception_handlers=True,
-)
+if persistence_settings.backend == "postgres":
+    register_tortoise(
+        app,
+        config=TORTOISE_ORM,
+        generate_schemas=False,
+        add_exception_handlers=True,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(await render_metrics(), media_type="text/plain; version=0.0.4")
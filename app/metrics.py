@@ -0,0 +1,262 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import MetricsSettings, metrics_settings
+from app.tracing import span
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+THROUGHPUT_BUCKETS = tuple(float(2 ** power * 1024 * 1024) for power in range(-2, 11))
+
+logger = logging.getLogger(__name__)
+
+# A sample is (name, type, description, labels, value). Collectors are called when /metrics is
+# rendered, for values such as pool sizes that are read rather than recorded.
+collectors: list[Callable[[], list[tuple[str, str, str, dict[str, str], float]]]] = []
+histograms: dict[str, "Histogram"] = {}
+
+
+def add_collector(collector: Callable[[], list[tuple[str, str, str, dict[str, str], float]]]):
+    if collector not in collectors:
+        collectors.append(collector)
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        # Label values -> count per bucket, the last one being +Inf, followed by the sum.
+        self.series: dict[tuple[str, ...], list[float]] = {}
+        histograms[name] = self
+
+    def observe(self, value: float, *labels: str):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 2)
+
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+
+PERSISTENCE_DURATION = Histogram(
+    "persistence_duration_seconds",
+    "Time spent in persistence service methods.",
+    ("service", "method")
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve HTTP requests, including the response body.",
+    ("method", "route", "status")
+)
+
+
+def measured(cls):
+    # Class decorator timing every public coroutine method defined on the class itself, which also
+    # records them as spans of traced requests.
+    def wrap(name: str, method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                with span(cls.__name__ + "." + name, "persistence"):
+                    return await method(*args, **kwargs)
+
+            finally:
+                PERSISTENCE_DURATION.observe(time.perf_counter() - started, cls.__name__, name)
+
+        return wrapper
+
+    for name, method in list(vars(cls).items()):
+        if not name.startswith('_') and inspect.iscoroutinefunction(method):
+            setattr(cls, name, wrap(name, method))
+
+    return cls
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+
+        finally:
+            # The router stores the matched route in the scope, so paths are grouped by template.
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status)
+            )
+
+
+def snapshot() -> dict:
+    samples = []
+    for collector in collectors:
+        samples.extend(collector())
+
+    return {
+        "histograms": {
+            name: [[list(labels), series] for labels, series in histogram.series.items()]
+            for name, histogram in histograms.items()
+        },
+        "samples": samples
+    }
+
+
+def read_snapshots(directory: str, max_age: float) -> list[tuple[str, dict, bool]]:
+    own = str(os.getpid()) + ".json"
+    result = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json") or name == own:
+            continue
+
+        path = os.path.join(directory, name)
+        try:
+            with open(path) as buffer:
+                data = json.load(buffer)
+            fresh = os.path.getmtime(path) > time.time() - max_age
+
+        except (OSError, ValueError):
+            continue
+
+        result.append((name.removesuffix(".json"), data, fresh))
+
+    return result
+
+
+def write_snapshot(directory: str, data: dict):
+    path = os.path.join(directory, str(os.getpid()) + ".json")
+    with open(path + ".tmp", "w") as buffer:
+        json.dump(data, buffer)
+    os.replace(path + ".tmp", path)
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if len(labels) == 0:
+        return ""
+
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+async def render_metrics(settings: MetricsSettings = metrics_settings) -> str:
+    # With several workers every process writes snapshots to a shared directory. Histograms are
+    # summed over all of them, including workers that have exited, so they only ever grow;
+    # collector samples are per process and only kept while their process keeps writing.
+    own = snapshot()
+    pid = str(os.getpid())
+    sources = [(pid, own, True)]
+    if settings.multiprocess_directory is not None:
+        sources.extend(await asyncio.to_thread(
+            read_snapshots,
+            settings.multiprocess_directory,
+            3 * settings.flush_interval
+        ))
+
+    lines = []
+    for name, histogram in histograms.items():
+        merged: dict[tuple[str, ...], list[float]] = {}
+        for _, data, _ in sources:
+            for labels, series in data["histograms"].get(name, []):
+                if len(series) != len(histogram.buckets) + 2:
+                    continue
+
+                total = merged.setdefault(tuple(labels), [0] * len(series))
+                for index, value in enumerate(series):
+                    total[index] += value
+
+        lines.append("# HELP {} {}".format(name, histogram.description))
+        lines.append("# TYPE {} histogram".format(name))
+        for labels, series in sorted(merged.items()):
+            base = dict(zip(histogram.labels, labels))
+            cumulative = 0
+            for bound, count in zip([*histogram.buckets, "+Inf"], series[:-1]):
+                cumulative += count
+                lines.append("{}_bucket{} {}".format(name, format_labels({**base, "le": str(bound)}), cumulative))
+            lines.append("{}_sum{} {}".format(name, format_labels(base), series[-1]))
+            lines.append("{}_count{} {}".format(name, format_labels(base), cumulative))
+
+    families: dict[str, list[str]] = {}
+    for source_pid, data, fresh in sources:
+        if not fresh:
+            continue
+
+        for name, kind, description, labels, value in data["samples"]:
+            if name not in families:
+                families[name] = ["# HELP {} {}".format(name, description), "# TYPE {} {}".format(name, kind)]
+            if settings.multiprocess_directory is not None:
+                labels = {**labels, "pid": source_pid}
+            families[name].append("{}{} {}".format(name, format_labels(labels), value))
+
+    for family in families.values():
+        lines.extend(family)
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    def __init__(self, settings: MetricsSettings = metrics_settings):
+        self.settings = settings
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.task is not None or self.settings.multiprocess_directory is None:
+            return
+
+        os.makedirs(self.settings.multiprocess_directory, exist_ok=True)
+        self.task = asyncio.create_task(self.run())
+
+    async def close(self):
+        if self.task is None:
+            return
+
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
+        # The last snapshot keeps the histograms of this worker after it exits.
+        await asyncio.to_thread(write_snapshot, self.settings.multiprocess_directory, snapshot())
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.to_thread(write_snapshot, self.settings.multiprocess_directory, snapshot())
+
+            except OSError:
+                logger.exception("Writing the metrics snapshot failed")
+
+            await asyncio.sleep(self.settings.flush_interval)
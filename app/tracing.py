@@ -0,0 +1,189 @@
+import asyncio
+import cProfile
+import functools
+import hmac
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import ProfilingSettings, profiling_settings
+
+logger = logging.getLogger(__name__)
+
+
+class Trace:
+    # Spans are stored as complete events of the Chrome trace format, which Perfetto, Speedscope and
+    # chrome://tracing open. Every task gets its own track so spans of concurrent tasks do not overlap.
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.started = time.perf_counter()
+        self.events: list[dict] = []
+        self.tracks: dict[object, int] = {}
+
+    def track(self) -> int:
+        try:
+            task = asyncio.current_task()
+
+        except RuntimeError:
+            task = None
+
+        key = task if task is not None else threading.get_ident()
+        if key not in self.tracks:
+            self.tracks[key] = len(self.tracks) + 1
+            name = task.get_name() if task is not None else threading.current_thread().name
+            self.events.append({
+                "name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": self.tracks[key], "args": {"name": name}
+            })
+
+        return self.tracks[key]
+
+    def add(self, name: str, category: str, track: int, started: float, finished: float, args: dict):
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((started - self.started) * 1000000, 1),
+            "dur": round((finished - started) * 1000000, 1),
+            "pid": os.getpid(),
+            "tid": track,
+            "args": args
+        })
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def span(name: str, category: str, **args) -> Iterator[dict]:
+    # Yields the arguments of the span, so details known only at the end can still be added.
+    trace = current_trace.get()
+    if trace is None:
+        yield args
+        return
+
+    track = trace.track()
+    started = time.perf_counter()
+    try:
+        yield args
+
+    finally:
+        trace.add(name, category, track, started, time.perf_counter(), args)
+
+
+def traced(category: str):
+    # Class decorator recording a span for every public coroutine and async generator method, and
+    # for __call__, defined on the class itself.
+    def wrap(cls, name: str, method):
+        span_name = cls.__name__ if name == '__call__' else cls.__name__ + '.' + name
+
+        if inspect.isasyncgenfunction(method):
+            @functools.wraps(method)
+            async def generator_wrapper(*args, **kwargs):
+                with span(span_name, category):
+                    async for item in method(*args, **kwargs):
+                        yield item
+
+            return generator_wrapper
+
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return await method(*args, **kwargs)
+
+        return wrapper
+
+    def decorate(cls):
+        for name, method in list(vars(cls).items()):
+            if (
+                (name == '__call__' or not name.startswith('_'))
+                and (inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method))
+            ):
+                setattr(cls, name, wrap(cls, name, method))
+
+        return cls
+
+    return decorate
+
+
+def write_profile(directory: str, trace: Trace, metadata: dict, profiler: Optional[cProfile.Profile]):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, trace.trace_id)
+    with open(path + ".trace.json", "w") as buffer:
+        json.dump({"traceEvents": trace.events, "displayTimeUnit": "ms", "otherData": metadata}, buffer)
+    if profiler is not None:
+        profiler.dump_stats(path + ".prof")
+
+
+class ProfilingMiddleware:
+    # Traces requests asked for with the operator token or picked by sampling, and profiles them with
+    # cProfile. The profiler sees the whole event loop, so other requests served meanwhile show up
+    # in it too, and only one request per process is profiled at a time; the trace is still
+    # recorded for the others.
+    def __init__(self, app: ASGIApp, settings: ProfilingSettings = profiling_settings):
+        self.app = app
+        self.settings = settings
+        self.profiling = False
+
+    def selected(self, scope: Scope) -> bool:
+        if self.settings.token is not None:
+            requested = Headers(scope=scope).get("x-profile")
+            if requested is not None and hmac.compare_digest(requested.encode(), self.settings.token.encode()):
+                return True
+
+        return self.settings.sample_rate > 0 and random.random() < self.settings.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace("{}-{}-{}".format(time.strftime("%Y%m%dT%H%M%S"), os.getpid(), uuid.uuid4().hex[:8]))
+        status = 500
+
+        async def send_with_trace_id(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", trace.trace_id.encode())]
+            await send(message)
+
+        profiler = None
+        if not self.profiling:
+            self.profiling = True
+            profiler = cProfile.Profile()
+
+        token = current_trace.set(trace)
+        try:
+            with span(scope["method"] + " " + scope["path"], "request") as args:
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    await self.app(scope, receive, send_with_trace_id)
+
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+                        self.profiling = False
+                    route = scope.get("route")
+                    args["route"] = route.path if route is not None else None
+                    args["status"] = status
+
+        finally:
+            current_trace.reset(token)
+            metadata = {"method": scope["method"], "path": scope["path"], "status": status}
+            try:
+                await asyncio.to_thread(write_profile, self.settings.directory, trace, metadata, profiler)
+
+            except OSError:
+                logger.exception("Writing the profile of %s %s failed", scope["method"], scope["path"])
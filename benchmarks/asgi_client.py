@@ -0,0 +1,131 @@
+import asyncio
+import json
+import uuid
+from typing import Optional
+from urllib.parse import unquote
+
+from starlette.types import ASGIApp, Message
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class Response:
+    def __init__(self, status: int, headers: dict[str, str], body: bytes, size: int, route: Optional[str]):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.size = size
+        self.route = route
+
+    def json(self):
+        return json.loads(self.body)
+
+
+def multipart(field: str, filename: str, content: bytes, content_type: str = 'application/pdf') -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    body = b''.join([
+        '--{}\r\nContent-Disposition: form-data; name="{}"; filename="{}"\r\nContent-Type: {}\r\n\r\n'.format(
+            boundary, field, filename, content_type
+        ).encode(),
+        content,
+        '\r\n--{}--\r\n'.format(boundary).encode()
+    ])
+
+    return body, 'multipart/form-data; boundary=' + boundary
+
+
+class AsgiClient:
+    # Calls the app directly, without sockets, so the numbers exclude the HTTP server. Bodies are
+    # sent in chunks like a server would, and download bodies can be counted instead of kept.
+    def __init__(self, app: ASGIApp, chunk_size: int = CHUNK_SIZE):
+        self.app = app
+        self.chunk_size = chunk_size
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        headers: Optional[dict[str, str]] = None,
+        json_body=None,
+        body: bytes = b'',
+        content_type: Optional[str] = None,
+        keep_body: bool = True
+    ) -> Response:
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            content_type = 'application/json'
+
+        raw_headers = [(b'host', b'benchmark'), (b'content-length', str(len(body)).encode())]
+        if content_type is not None:
+            raw_headers.append((b'content-type', content_type.encode()))
+        for name, value in (headers or {}).items():
+            raw_headers.append((name.lower().encode(), value.encode()))
+
+        raw_path, _, query = path.partition('?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0', 'spec_version': '2.3'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': unquote(raw_path),
+            'raw_path': raw_path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': raw_headers,
+            'client': ('127.0.0.1', 50000),
+            'server': ('benchmark', 80)
+        }
+
+        view = memoryview(body)
+        offsets = iter(range(0, max(len(view), 1), self.chunk_size))
+        finished = asyncio.Event()
+
+        async def receive() -> Message:
+            offset = next(offsets, None)
+            if offset is None:
+                # Like a client that keeps the connection open until the response is complete.
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+
+            chunk = bytes(view[offset:offset + self.chunk_size])
+            return {'type': 'http.request', 'body': chunk, 'more_body': offset + self.chunk_size < len(view)}
+
+        status = None
+        response_headers = {}
+        parts = []
+        size = 0
+
+        async def send(message: Message):
+            nonlocal status, response_headers, size
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                response_headers = {name.decode(): value.decode() for name, value in message.get('headers', [])}
+            elif message['type'] == 'http.response.body':
+                chunk = message.get('body', b'')
+                size += len(chunk)
+                if keep_body:
+                    parts.append(chunk)
+                if not message.get('more_body', False):
+                    finished.set()
+
+        try:
+            await self.app(scope, receive, send)
+
+        except Exception:
+            # The error middleware sends a 500 and then raises again for the server to log.
+            if status is None:
+                status = 500
+
+        finally:
+            finished.set()
+
+        # The router stores the matched route in the scope.
+        route = scope.get('route')
+        return Response(
+            status=status if status is not None else 500,
+            headers=response_headers,
+            body=b''.join(parts),
+            size=size,
+            route=route.path if route is not None else None
+        )
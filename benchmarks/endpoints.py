@@ -0,0 +1,454 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from benchmarks.asgi_client import AsgiClient, Response, multipart
+
+MB = 1024 * 1024
+PASSWORD = 'benchmark'
+IMAGE_WIDTH = 1024
+
+# Stand-ins for the PSQL_DB_* variables, which are read but unused with the memory backend.
+MEMORY_PSQL_ENVIRONMENT = {
+    'PSQL_DB_DATABASE': 'unused',
+    'PSQL_DB_USERNAME': 'unused',
+    'PSQL_DB_PASSWORD': 'unused',
+    'PSQL_DB_HOST': 'localhost',
+    'PSQL_DB_PORT': '5432',
+}
+
+
+def make_pdf(label: str, pages: int, page_bytes: int, data: bytes) -> bytes:
+    # Each page holds a line of text and an uncompressed greyscale image of page_bytes, so the
+    # size is controlled without giving text extraction anything but the label to parse.
+    height = max(1, math.ceil(page_bytes / IMAGE_WIDTH))
+    image = (data * math.ceil(IMAGE_WIDTH * height / len(data)))[:IMAGE_WIDTH * height]
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for page in range(1, pages + 1):
+        number = len(objects) + 1
+        kids.append('{} 0 R'.format(number))
+        text = 'Benchmark {} page {}'.format(label, page).replace('\\', '').replace('(', '').replace(')', '')
+        content = 'BT /F1 12 Tf 20 20 Td ({}) Tj ET q 400 0 0 400 100 200 cm /Im0 Do Q'.format(text).encode()
+        objects.append(
+            '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {} 0 R '
+            '/Resources << /Font << /F1 3 0 R >> /XObject << /Im0 {} 0 R >> >> >>'.format(
+                number + 1, number + 2
+            ).encode()
+        )
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+        objects.append(
+            b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray /BitsPerComponent 8 '
+            b'/Length %d >>\nstream\n' % (IMAGE_WIDTH, height, len(image)) + image + b'\nendstream'
+        )
+    objects[1] = '<< /Type /Pages /Kids [{}] /Count {} >>'.format(' '.join(kids), pages).encode()
+
+    parts = [b'%PDF-1.4\n']
+    offsets = []
+    position = len(parts[0])
+    for number, body in enumerate(objects, start=1):
+        offsets.append(position)
+        part = b'%d 0 obj\n' % number + body + b'\nendobj\n'
+        parts.append(part)
+        position += len(part)
+
+    parts.append(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    parts.extend(b'%010d 00000 n \n' % offset for offset in offsets)
+    parts.append(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, position))
+
+    return b''.join(parts)
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(timings: list[float], errors: int, elapsed: float, transferred: int = 0) -> dict:
+    result = {
+        "count": len(timings),
+        "errors": errors,
+        "mean_ms": round(statistics.mean(timings), 4) if timings else None,
+        "p50_ms": round(percentile(timings, 0.50), 4) if timings else None,
+        "p95_ms": round(percentile(timings, 0.95), 4) if timings else None,
+        "p99_ms": round(percentile(timings, 0.99), 4) if timings else None,
+        "throughput_rps": round(len(timings) / elapsed, 4) if elapsed > 0 else None,
+    }
+    if transferred > 0:
+        result["throughput_mb_s"] = round(transferred / MB / elapsed, 4)
+
+    return result
+
+
+async def measure(
+    samples: int,
+    concurrency: int,
+    operation: Callable[[int, object], Awaitable[tuple[Response, int]]],
+    prepare: Optional[Callable[[int], Awaitable[object]]] = None
+) -> dict:
+    # operation(i, prepared) runs sample i and returns the response and the bytes it moved; prepare(i)
+    # builds its input beforehand, untimed. Samples are shared by `concurrency` tasks, so throughput
+    # includes the effect of running them at the same time.
+    timings = []
+    errors = 0
+    transferred = 0
+    indexes = iter(range(samples))
+
+    async def worker():
+        nonlocal errors, transferred
+        for index in indexes:
+            prepared = await prepare(index) if prepare is not None else None
+            started = time.perf_counter()
+            response, size = await operation(index, prepared)
+            timings.append((time.perf_counter() - started) * 1000)
+            transferred += size
+            if response.status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return summarize(timings, errors, time.perf_counter() - started, transferred)
+
+
+class Session:
+    def __init__(self, client: AsgiClient, prefix: str, batch_size: int, list_limit: int):
+        self.client = client
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.list_limit = list_limit
+        self.users = itertools.count(1)
+
+    async def register(self, username: str) -> Response:
+        return await self.client.request('POST', '/auth/register', json_body={
+            'username': username, 'password': PASSWORD, 'mail': username + '@benchmark', 'year_of_birth': 1990
+        })
+
+    async def login(self, username: str) -> Response:
+        return await self.client.request('POST', '/auth/login', json_body={'username': username, 'password': PASSWORD})
+
+    async def new_user(self) -> str:
+        username = '{}-{}'.format(self.prefix, next(self.users))
+        await self.register(username)
+        response = await self.login(username)
+        if response.status != 200:
+            raise RuntimeError('Logging in the benchmark user failed: {}'.format(response.body[:200]))
+
+        return response.json()['auth']
+
+    async def create_files(self, token: str, count: int, number_of_pages: int = 1) -> list[int]:
+        ids = []
+        for start in range(0, count, self.batch_size):
+            batch = [
+                {'filename': 'file{}.pdf'.format(index), 'desc': 'benchmark', 'number_of_pages': number_of_pages}
+                for index in range(start, min(count, start + self.batch_size))
+            ]
+            response = await self.client.request('POST', '/files/batch', headers={'auth': token}, json_body=batch)
+            ids.extend(file['id'] for file in response.json())
+
+        return ids
+
+    async def upload(self, token: str, file_id: int, content: bytes) -> Response:
+        body, content_type = multipart('input_file', 'file{}.pdf'.format(file_id), content)
+        return await self.client.request(
+            'POST', '/files/{}'.format(file_id), headers={'auth': token}, body=body, content_type=content_type
+        )
+
+
+async def bench_auth(session: Session, samples: int, concurrency: int) -> dict:
+    usernames = ['{}-auth-{}'.format(session.prefix, index) for index in range(samples)]
+    tokens = [None] * samples
+
+    async def register(index: int, prepared=None):
+        response = await session.register(usernames[index])
+        return response, 0
+
+    async def login(index: int, prepared=None):
+        response = await session.login(usernames[index])
+        if response.status == 200:
+            tokens[index] = response.json()['auth']
+        return response, 0
+
+    async def introspect(index: int, prepared=None):
+        response = await session.client.request('GET', '/auth/introspect', headers={'auth': tokens[index] or ''})
+        return response, 0
+
+    return {
+        "auth.register": await measure(samples, concurrency, register),
+        "auth.login": await measure(samples, concurrency, login),
+        "auth.introspect": await measure(samples, concurrency, introspect),
+    }
+
+
+async def bench_list(session: Session, sizes: list[int], samples: int, concurrency: int) -> dict:
+    result = {}
+    for size in sizes:
+        token = await session.new_user()
+        await session.create_files(token, size)
+
+        # A sample walks every page, as a client listing all of its files would.
+        async def list_all(index: int, prepared=None):
+            path = '/files/?limit={}'.format(session.list_limit)
+            response = await session.client.request('GET', path, headers={'auth': token})
+            while response.status == 200 and response.json()['next_cursor'] is not None:
+                response = await session.client.request(
+                    'GET', path + '&after_id={}'.format(response.json()['next_cursor']), headers={'auth': token}
+                )
+            return response, 0
+
+        result["files.list.{}".format(size)] = await measure(samples, concurrency, list_all)
+
+    return result
+
+
+async def bench_transfer(session: Session, sizes: list[float], samples: int, concurrency: int, data: bytes) -> dict:
+    result = {}
+    for size in sizes:
+        name = '{:g}MB'.format(size)
+        token = await session.new_user()
+        file_ids = await session.create_files(token, samples)
+
+        # Every sample has its own content, so no upload can be served by an earlier one.
+        async def content(index: int) -> bytes:
+            return await asyncio.to_thread(make_pdf, '{}-{}'.format(name, index), 1, int(size * MB), data)
+
+        async def upload(index: int, prepared: bytes):
+            response = await session.upload(token, file_ids[index], prepared)
+            return response, len(prepared) if response.status < 400 else 0
+
+        async def download(index: int, prepared=None):
+            response = await session.client.request(
+                'GET', '/files/{}'.format(file_ids[index]), headers={'auth': token}, keep_body=False
+            )
+            return response, response.size
+
+        result["files.upload." + name] = await measure(samples, concurrency, upload, content)
+        result["files.download." + name] = await measure(samples, concurrency, download)
+
+    return result
+
+
+async def bench_merge(
+    session: Session,
+    ways: list[int],
+    samples: int,
+    concurrency: int,
+    pages: int,
+    page_bytes: int,
+    data: bytes
+) -> dict:
+    # Merges are cached by their sources, so every sample merges a different ordering of a pool of
+    # distinct files; the pool is the smallest one with enough orderings. One more ordering is merged
+    # first, untimed, so the merge processes are already running.
+    result = {}
+    for count in ways:
+        pool_size = count
+        while math.perm(pool_size, count) < samples + 1:
+            pool_size += 1
+
+        token = await session.new_user()
+        file_ids = await session.create_files(token, pool_size, number_of_pages=pages)
+        for index, file_id in enumerate(file_ids):
+            await session.upload(token, file_id, make_pdf('merge-{}-{}'.format(count, index), pages, page_bytes, data))
+
+        orderings = list(itertools.islice(itertools.permutations(file_ids, count), samples + 1))
+
+        async def merge(index: int, prepared=None):
+            sources = [{'file_id': file_id} for file_id in orderings[index]]
+            response = await session.client.request(
+                'POST', '/files/merge/many', headers={'auth': token}, json_body={'files': sources}
+            )
+            return response, 0
+
+        await merge(samples)
+        result["files.merge.{}-way".format(count)] = await measure(samples, concurrency, merge)
+
+    return result
+
+
+async def replay(session: Session, path: str, speed: float, concurrency: int, data: bytes) -> dict:
+    # Every line is {"method", "path", "headers"?, "json"?, "upload"?, "offset"?}: "upload" is the size
+    # of a PDF to send as the file content and "offset" the seconds since the start of the trace.
+    # Recorded auth tokens are replaced by tokens of new users, one per distinct recorded token.
+    with open(path) as buffer:
+        records = [json.loads(line) for line in buffer if line.strip() != '']
+
+    tokens = {}
+    for record in records:
+        token = (record.get('headers') or {}).get('auth')
+        if token is not None and token not in tokens:
+            tokens[token] = await session.new_user()
+
+    timings: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    transferred = 0
+
+    async def send(record: dict):
+        nonlocal transferred
+        headers = dict(record.get('headers') or {})
+        if 'auth' in headers:
+            headers['auth'] = tokens[headers['auth']]
+
+        body = b''
+        content_type = None
+        if record.get('upload') is not None:
+            content = await asyncio.to_thread(make_pdf, uuid.uuid4().hex, 1, int(record['upload']), data)
+            body, content_type = multipart('input_file', 'replay.pdf', content)
+
+        started = time.perf_counter()
+        response = await session.client.request(
+            record['method'],
+            record['path'],
+            headers=headers,
+            json_body=record.get('json'),
+            body=body,
+            content_type=content_type,
+            keep_body=False
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+
+        name = '{} {}'.format(record['method'], response.route or 'unmatched')
+        timings.setdefault(name, []).append(elapsed)
+        errors[name] = errors.get(name, 0) + (response.status >= 400)
+        transferred += len(body) + response.size
+
+    started = time.perf_counter()
+    if speed > 0 and any('offset' in record for record in records):
+        # Requests start at their recorded times, whether or not earlier ones have finished.
+        async def scheduled(record: dict):
+            await asyncio.sleep(max(0.0, started + record.get('offset', 0) / speed - time.perf_counter()))
+            await send(record)
+
+        await asyncio.gather(*(scheduled(record) for record in records))
+
+    else:
+        pending = iter(records)
+
+        async def worker():
+            for record in pending:
+                await send(record)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    elapsed = time.perf_counter() - started
+    result = {
+        "replay." + name: summarize(route_timings, errors[name], elapsed)
+        for name, route_timings in sorted(timings.items())
+    }
+    result["replay.total"] = summarize(
+        [timing for route_timings in timings.values() for timing in route_timings],
+        sum(errors.values()),
+        elapsed,
+        transferred
+    )
+
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    # The settings are read when the app is imported, so the environment is prepared first.
+    os.environ['PERSISTENCE_BACKEND'] = args.backend
+    os.environ.setdefault('AUTH_API_TRANSPORT', 'in_process')
+    if args.backend == 'memory':
+        for name, value in MEMORY_PSQL_ENVIRONMENT.items():
+            os.environ.setdefault(name, value)
+    storage_root = None
+    if 'FILES_STORAGE_ROOT' not in os.environ:
+        storage_root = tempfile.mkdtemp(prefix='carlemany-benchmark-')
+        os.environ['FILES_STORAGE_ROOT'] = storage_root
+
+    from app.config import files_settings
+    from app.main import app
+
+    # Image data is repeated to fill large files; the label keeps every file distinct.
+    data = random.Random(args.seed).randbytes(MB)
+    session = Session(
+        AsgiClient(app),
+        'bench-{}'.format(uuid.uuid4().hex[:8]),
+        batch_size=files_settings.batch_max_size,
+        list_limit=files_settings.list_max_limit
+    )
+    report = {
+        "config": {
+            "backend": args.backend,
+            "samples": args.samples,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "results": {}
+    }
+
+    try:
+        async with app.router.lifespan_context(app):
+            results = report["results"]
+            if args.replay is not None:
+                report["config"]["replay"] = args.replay
+                results.update(await replay(session, args.replay, args.speed, args.concurrency, data))
+            else:
+                if "auth" in args.scenarios:
+                    results.update(await bench_auth(session, args.samples, args.concurrency))
+                if "list" in args.scenarios:
+                    results.update(await bench_list(session, args.list_sizes, args.samples, args.concurrency))
+                if "transfer" in args.scenarios:
+                    results.update(await bench_transfer(
+                        session, args.transfer_sizes, args.transfer_samples, args.concurrency, data
+                    ))
+                if "merge" in args.scenarios:
+                    results.update(await bench_merge(
+                        session,
+                        args.merge_ways,
+                        args.merge_samples,
+                        args.concurrency,
+                        args.merge_pages,
+                        args.merge_page_bytes,
+                        data
+                    ))
+
+    finally:
+        if storage_root is not None:
+            shutil.rmtree(storage_root, ignore_errors=True)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and throughput of the auth and files endpoints, in-process")
+    parser.add_argument("--backend", choices=["memory", "postgres"], default="memory")
+    parser.add_argument("--scenarios", nargs="+", choices=["auth", "list", "transfer", "merge"],
+                        default=["auth", "list", "transfer", "merge"])
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--list-sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--transfer-sizes", type=float, nargs="+", default=[1, 10, 100], help="PDF sizes in MB")
+    parser.add_argument("--transfer-samples", type=int, default=5)
+    parser.add_argument("--merge-ways", type=int, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--merge-samples", type=int, default=20)
+    parser.add_argument("--merge-pages", type=int, default=10, help="Pages of every merged file")
+    parser.add_argument("--merge-page-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--replay", help="Replay a requests.jsonl trace instead of the scenarios")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed-up for traces with offsets; 0 replays back to back")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, "w") as buffer:
+            buffer.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
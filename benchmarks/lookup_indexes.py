@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import asyncpg
+
+from app.config import DATABASE_URL
+
+SCHEMA = "bench_lookup_indexes"
+
+CREATE_TABLES = [
+    'CREATE TABLE "{schema}"."userdb" ('
+    '"id" SERIAL NOT NULL PRIMARY KEY, "username" VARCHAR(75) NOT NULL, '
+    '"password" VARCHAR(75) NOT NULL, "mail" VARCHAR(75) NOT NULL, "year_of_birth" INT)',
+    'CREATE TABLE "{schema}"."tokendb" ('
+    '"id" SERIAL NOT NULL PRIMARY KEY, "token" VARCHAR(75) NOT NULL, "user_id" INT NOT NULL)',
+    'CREATE TABLE "{schema}"."filedb" ('
+    '"id" SERIAL NOT NULL PRIMARY KEY, "filename" VARCHAR(100) NOT NULL, '
+    '"path" VARCHAR(200) NOT NULL, "owner" INT NOT NULL, "desc" VARCHAR(400) NOT NULL, '
+    '"number_of_pages" INT NOT NULL)',
+]
+
+POPULATE = [
+    'INSERT INTO "{schema}"."userdb" ("username", "password", "mail", "year_of_birth") '
+    "SELECT 'user' || i, md5(i::text), 'user' || i || '@mail.com', 1990 "
+    "FROM generate_series(1, $1) AS i",
+    'INSERT INTO "{schema}"."tokendb" ("token", "user_id") '
+    "SELECT 'token-' || i, i FROM generate_series(1, $1) AS i",
+    'INSERT INTO "{schema}"."filedb" ("filename", "path", "owner", "desc", "number_of_pages") '
+    "SELECT 'file' || i || '.pdf', 'files/' || i || '.pdf', 1 + i % GREATEST($1 / 10, 1), 'desc', 1 "
+    "FROM generate_series(1, $1) AS i",
+]
+
+# Same access paths as migrations/models/1_*_lookup_indexes.sql
+CREATE_INDEXES = [
+    'CREATE UNIQUE INDEX ON "{schema}"."tokendb" ("token")',
+    'CREATE UNIQUE INDEX ON "{schema}"."userdb" ("username")',
+    'CREATE INDEX ON "{schema}"."filedb" ("owner", "id")',
+]
+
+QUERIES = {
+    "get_user_id_by_token": (
+        'SELECT "user_id" FROM "{schema}"."tokendb" WHERE "token" = $1',
+        lambda n: "token-{}".format(random.randint(1, n)),
+    ),
+    "get_user_by_username": (
+        'SELECT * FROM "{schema}"."userdb" WHERE "username" = $1',
+        lambda n: "user{}".format(random.randint(1, n)),
+    ),
+    "get_files_by_owner_id": (
+        'SELECT * FROM "{schema}"."filedb" WHERE "owner" = $1 ORDER BY "id"',
+        lambda n: random.randint(1, max(n // 10, 1)),
+    ),
+}
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure(connection, rows: int, samples: int) -> dict:
+    result = {}
+    for name, (query, argument) in QUERIES.items():
+        statement = await connection.prepare(query.format(schema=SCHEMA))
+        timings = []
+        for _ in range(samples):
+            value = argument(rows)
+            start = time.perf_counter()
+            await statement.fetch(value)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        result[name] = {
+            "mean_ms": round(statistics.mean(timings), 4),
+            "p50_ms": round(percentile(timings, 0.50), 4),
+            "p99_ms": round(percentile(timings, 0.99), 4),
+        }
+
+    return result
+
+
+async def run(sizes: list[int], samples: int) -> dict:
+    connection = await asyncpg.connect(DATABASE_URL)
+    report = {}
+    try:
+        for rows in sizes:
+            await connection.execute('DROP SCHEMA IF EXISTS "{}" CASCADE'.format(SCHEMA))
+            await connection.execute('CREATE SCHEMA "{}"'.format(SCHEMA))
+            for statement in CREATE_TABLES:
+                await connection.execute(statement.format(schema=SCHEMA))
+            for statement in POPULATE:
+                await connection.execute(statement.format(schema=SCHEMA), rows)
+            await connection.execute('ANALYZE "{}"."userdb", "{}"."tokendb", "{}"."filedb"'.format(
+                SCHEMA, SCHEMA, SCHEMA
+            ))
+
+            before = await measure(connection, rows, samples)
+
+            for statement in CREATE_INDEXES:
+                await connection.execute(statement.format(schema=SCHEMA))
+            await connection.execute('ANALYZE "{}"."userdb", "{}"."tokendb", "{}"."filedb"'.format(
+                SCHEMA, SCHEMA, SCHEMA
+            ))
+
+            after = await measure(connection, rows, samples)
+
+            report[str(rows)] = {"before": before, "after": after}
+
+    finally:
+        await connection.execute('DROP SCHEMA IF EXISTS "{}" CASCADE'.format(SCHEMA))
+        await connection.close()
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lookup latency with and without the lookup indexes")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.rows, args.samples)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
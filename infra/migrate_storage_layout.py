@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import json
+import os
+from collections import Counter
+from typing import Optional
+
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from app.config import DATABASE_URL, files_settings, models
+from app.files.domain.storage_paths import MERGED_DIRECTORY, ensure_directory, sharded_path
+from app.files.models import FileDB, MergeCacheDB
+
+# Files are hard linked into the sharded layout, the rows are switched over, and the flat copies are
+# only unlinked at the end. Requests that read a row before it was switched can still open the old
+# path, and every step can be repeated, so an interrupted run is resumed by starting it again.
+
+
+def link_into_place(source: str, target: str) -> tuple[str, Optional[int]]:
+    ensure_directory(target)
+    try:
+        os.link(source, target)
+
+    except FileNotFoundError:
+        return 'missing', None
+
+    except FileExistsError:
+        if os.path.samefile(source, target):
+            return 'linked', None
+
+        return 'conflict', None
+
+    return 'linked', os.stat(target).st_ino
+
+
+def unlink_if_same_inode(path: str, inode: int):
+    try:
+        if os.stat(path).st_ino == inode:
+            os.remove(path)
+
+    except FileNotFoundError:
+        pass
+
+
+async def migrate_path(path: str, dry_run: bool) -> str:
+    target = sharded_path(path)
+    if target is None:
+        return 'skipped'
+
+    if dry_run:
+        return 'pending'
+
+    outcome, inode = await asyncio.to_thread(link_into_place, path, target)
+    if outcome != 'linked':
+        return outcome
+
+    # Conditional on the old path, so rows changed meanwhile by an upload or a delete are left alone.
+    async with in_transaction() as connection:
+        updated = await FileDB.filter(path=path).using_db(connection).update(path=target)
+        updated += await MergeCacheDB.filter(path=path).using_db(connection).update(path=target)
+
+    if updated == 0:
+        if inode is not None:
+            await asyncio.to_thread(unlink_if_same_inode, target, inode)
+
+        return 'superseded'
+
+    return 'moved'
+
+
+async def migrate_table(model, after_id: int, batch_size: int, dry_run: bool, stats: Counter):
+    cursor = after_id
+    while True:
+        rows = await model.filter(id__gt=cursor).order_by('id').limit(batch_size).values_list('id', 'path')
+        if len(rows) == 0:
+            return
+
+        cursor = rows[-1][0]
+        for path in dict.fromkeys(path for _, path in rows if path != ''):
+            stats[await migrate_path(path=path, dry_run=dry_run)] += 1
+
+        print(json.dumps({'table': model._meta.db_table, 'last_id': cursor, **stats}), flush=True)
+
+
+def flat_paths() -> list[str]:
+    result = []
+    for directory in [files_settings.storage_root, files_settings.storage_root + '/' + MERGED_DIRECTORY]:
+        if not os.path.isdir(directory):
+            continue
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                path = directory + '/' + entry.name
+                if entry.is_file() and sharded_path(path) is not None:
+                    result.append(path)
+
+    return result
+
+
+def remove_migrated(path: str) -> bool:
+    target = sharded_path(path)
+    try:
+        if not os.path.samefile(path, target):
+            return False
+
+    except FileNotFoundError:
+        return False
+
+    os.remove(path)
+
+    return True
+
+
+async def sweep(batch_size: int, stats: Counter):
+    paths = await asyncio.to_thread(flat_paths)
+    for start in range(0, len(paths), batch_size):
+        batch = paths[start:start + batch_size]
+        referenced = set(await FileDB.filter(path__in=batch).values_list('path', flat=True))
+        referenced |= set(await MergeCacheDB.filter(path__in=batch).values_list('path', flat=True))
+
+        for path in batch:
+            if path not in referenced and await asyncio.to_thread(remove_migrated, path):
+                stats['unlinked'] += 1
+
+
+async def run(batch_size: int, after_id: int, grace: float, dry_run: bool) -> dict:
+    await Tortoise.init(db_url=DATABASE_URL, modules={'models': models})
+    stats = Counter()
+    try:
+        await migrate_table(FileDB, after_id=after_id, batch_size=batch_size, dry_run=dry_run, stats=stats)
+        await migrate_table(MergeCacheDB, after_id=0, batch_size=batch_size, dry_run=dry_run, stats=stats)
+
+        if not dry_run:
+            await asyncio.sleep(grace)
+            await sweep(batch_size=batch_size, stats=stats)
+
+    finally:
+        await Tortoise.close_connections()
+
+    return dict(stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move stored files from the flat layout into sharded directories")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--after-id", type=int, default=0, help="resume the files table after this id")
+    parser.add_argument("--grace", type=float, default=30.0, help="seconds to keep the flat copies after the switch")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    stats = asyncio.run(run(args.batch_size, args.after_id, args.grace, args.dry_run))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+-- upgrade --
+DELETE FROM "tokendb" WHERE "user_id" NOT IN (SELECT "id" FROM "userdb");
+CREATE UNIQUE INDEX "uid_tokendb_token_29a504" ON "tokendb" ("token");
+CREATE UNIQUE INDEX "uid_userdb_usernam_232fdd" ON "userdb" ("username");
+CREATE INDEX "idx_filedb_owner_5c8bdc" ON "filedb" ("owner", "id");
+ALTER TABLE "tokendb" ADD CONSTRAINT "fk_tokendb_userdb_3b7fae11" FOREIGN KEY ("user_id") REFERENCES "userdb" ("id") ON DELETE CASCADE;
+-- downgrade --
+ALTER TABLE "tokendb" DROP CONSTRAINT "fk_tokendb_userdb_3b7fae11";
+DROP INDEX "idx_filedb_owner_5c8bdc";
+DROP INDEX "uid_userdb_usernam_232fdd";
+DROP INDEX "uid_tokendb_token_29a504";
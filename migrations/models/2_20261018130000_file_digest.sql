@@ -0,0 +1,6 @@
+-- upgrade --
+ALTER TABLE "filedb" ADD "digest" VARCHAR(64);
+ALTER TABLE "filedb" ADD "size" BIGINT;
+-- downgrade --
+ALTER TABLE "filedb" DROP COLUMN "digest";
+ALTER TABLE "filedb" DROP COLUMN "size";
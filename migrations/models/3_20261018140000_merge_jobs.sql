@@ -0,0 +1,15 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "jobdb" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "owner" INT NOT NULL,
+    "status" VARCHAR(10) NOT NULL  DEFAULT 'queued',
+    "sources" JSONB NOT NULL,
+    "file_id" INT,
+    "error" VARCHAR(400),
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS "idx_jobdb_status_b7f747" ON "jobdb" ("status", "id");
+COMMENT ON COLUMN "jobdb"."status" IS 'QUEUED: queued\nRUNNING: running\nDONE: done\nFAILED: failed';
+-- downgrade --
+DROP TABLE IF EXISTS "jobdb";
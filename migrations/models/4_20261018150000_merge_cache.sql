@@ -0,0 +1,15 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "mergecachedb" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "key" VARCHAR(64) NOT NULL UNIQUE,
+    "path" VARCHAR(200) NOT NULL,
+    "number_of_pages" INT NOT NULL,
+    "digest" VARCHAR(64) NOT NULL,
+    "size" BIGINT NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS "idx_mergecached_path_877ad7" ON "mergecachedb" ("path");
+CREATE INDEX IF NOT EXISTS "idx_filedb_path_64162d" ON "filedb" ("path");
+-- downgrade --
+DROP INDEX IF EXISTS "idx_filedb_path_64162d";
+DROP TABLE IF EXISTS "mergecachedb";
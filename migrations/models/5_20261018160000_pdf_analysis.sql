@@ -0,0 +1,14 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "pdfanalysisdb" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "digest" VARCHAR(64) NOT NULL UNIQUE,
+    "pdf_version" VARCHAR(10),
+    "encrypted" BOOL NOT NULL  DEFAULT False,
+    "number_of_pages" INT,
+    "error" VARCHAR(200),
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS "idx_filedb_digest_094ec9" ON "filedb" ("digest");
+-- downgrade --
+DROP INDEX IF EXISTS "idx_filedb_digest_094ec9";
+DROP TABLE IF EXISTS "pdfanalysisdb";
@@ -0,0 +1,13 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "filesearchdb" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "owner" INT NOT NULL,
+    "digest" VARCHAR(64) NOT NULL,
+    "document" TSVECTOR NOT NULL,
+    "file_id" INT NOT NULL UNIQUE REFERENCES "filedb" ("id") ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS "idx_filesearchd_owner_5957e6" ON "filesearchdb" ("owner");
+CREATE INDEX IF NOT EXISTS "idx_filesearchd_digest_b2e30f" ON "filesearchdb" ("digest");
+CREATE INDEX IF NOT EXISTS "idx_filesearchd_documen_58ec00" ON "filesearchdb" USING GIN ("document");
+-- downgrade --
+DROP TABLE IF EXISTS "filesearchdb";
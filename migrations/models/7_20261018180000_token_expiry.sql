@@ -0,0 +1,9 @@
+-- upgrade --
+ALTER TABLE "tokendb" ADD "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE "tokendb" ADD "expires_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP + INTERVAL '1 day';
+ALTER TABLE "tokendb" ALTER COLUMN "expires_at" DROP DEFAULT;
+CREATE INDEX IF NOT EXISTS "idx_tokendb_expires_4bf75d" ON "tokendb" ("expires_at");
+-- downgrade --
+DROP INDEX IF EXISTS "idx_tokendb_expires_4bf75d";
+ALTER TABLE "tokendb" DROP COLUMN "expires_at";
+ALTER TABLE "tokendb" DROP COLUMN "created_at";
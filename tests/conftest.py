@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import uuid
+
+import pytest
+
+from benchmarks.endpoints import MEMORY_PSQL_ENVIRONMENT
+
+# The settings are read when the app is imported, so the tests run against the memory backend and
+# a scratch storage root prepared before any test module imports it.
+os.environ.setdefault('PERSISTENCE_BACKEND', 'memory')
+os.environ.setdefault('AUTH_API_TRANSPORT', 'in_process')
+os.environ.setdefault('FILES_FSYNC_UPLOADS', 'false')
+os.environ.setdefault('FILES_MERGE_JOB_POLL_INTERVAL', '0.1')
+for name, value in MEMORY_PSQL_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
+
+STORAGE_ROOT = tempfile.mkdtemp(prefix='carlemany-tests-')
+os.environ.setdefault('FILES_STORAGE_ROOT', STORAGE_ROOT)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(STORAGE_ROOT, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture(scope='session')
+async def app():
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+@pytest.fixture
+def session(app):
+    from app.config import files_settings
+    from benchmarks.asgi_client import AsgiClient
+    from benchmarks.endpoints import Session
+
+    return Session(
+        AsgiClient(app),
+        'test-{}'.format(uuid.uuid4().hex[:8]),
+        batch_size=files_settings.batch_max_size,
+        list_limit=files_settings.list_max_limit
+    )
+
+
+@pytest.fixture
+def upload_pdfs(session):
+    # Creates one file per entry with that many pages and uploads a distinct PDF to each.
+    from benchmarks.endpoints import make_pdf
+
+    async def upload(token: str, pages: list[int]) -> list[int]:
+        file_ids = []
+        for number_of_pages in pages:
+            file_id = (await session.create_files(token, 1, number_of_pages=number_of_pages))[0]
+            content = make_pdf('{}-{}'.format(session.prefix, file_id), number_of_pages, 16, b'\x80')
+            response = await session.upload(token, file_id, content)
+            assert response.status == 200
+            file_ids.append(file_id)
+
+        return file_ids
+
+    return upload
+
+
+@pytest.fixture
+def read_metric(session):
+    # Sums the samples of a /metrics family whose labels include the given ones.
+    async def read(name: str, **labels: str) -> float:
+        response = await session.client.request('GET', '/metrics')
+        total = 0.0
+        for line in response.body.decode().splitlines():
+            sample, _, value = line.rpartition(' ')
+            sample_name, _, sample_labels = sample.partition('{')
+            if sample_name == name and all('{}="{}"'.format(*label) in sample_labels for label in labels.items()):
+                total += float(value)
+
+        return total
+
+    return read
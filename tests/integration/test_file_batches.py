@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from app.config import files_settings
+
+pytestmark = pytest.mark.anyio
+
+
+async def delete_batch(session, token: str, file_ids: list[int]):
+    return await session.client.request('DELETE', '/files/batch', headers={'auth': token}, json_body={'ids': file_ids})
+
+
+async def test_created_files_are_returned_in_order(session):
+    token = await session.new_user()
+    batch = [
+        {'filename': 'file{}.pdf'.format(index), 'desc': 'batch file', 'number_of_pages': index + 1}
+        for index in range(5)
+    ]
+
+    response = await session.client.request('POST', '/files/batch', headers={'auth': token}, json_body=batch)
+    assert response.status == 200
+    files = response.json()
+    assert [file['filename'] for file in files] == [item['filename'] for item in batch]
+    assert [file['number_of_pages'] for file in files] == [1, 2, 3, 4, 5]
+    assert len({file['id'] for file in files}) == 5
+    assert len({file['owner'] for file in files}) == 1
+
+    response = await session.client.request('GET', '/files/', headers={'auth': token})
+    assert [file['id'] for file in response.json()] == [file['id'] for file in files]
+
+
+async def test_deletes_report_a_result_per_id(session, upload_pdfs):
+    token = await session.new_user()
+    uploaded, empty = await upload_pdfs(token, [1]), await session.create_files(token, 1)
+    other_token = await session.new_user()
+    other_id = (await session.create_files(other_token, 1))[0]
+    response = await session.client.request('GET', '/files/?limit=10&fields=path', headers={'auth': token})
+    path = response.json()['files'][0]['path']
+    assert os.path.exists(path)
+
+    response = await delete_batch(session, token, [uploaded[0], other_id, empty[0], other_id + 100000])
+    assert response.status == 200
+    assert response.json()['results'] == [
+        {'file_id': uploaded[0], 'status': 'deleted'},
+        {'file_id': other_id, 'status': 'not_found'},
+        {'file_id': empty[0], 'status': 'deleted'},
+        {'file_id': other_id + 100000, 'status': 'not_found'}
+    ]
+    assert not os.path.exists(path)
+
+    response = await session.client.request('GET', '/files/', headers={'auth': token})
+    assert response.json() == []
+    response = await session.client.request('GET', '/files/', headers={'auth': other_token})
+    assert [file['id'] for file in response.json()] == [other_id]
+
+    response = await delete_batch(session, token, [uploaded[0]])
+    assert response.json()['results'] == [{'file_id': uploaded[0], 'status': 'not_found'}]
+
+
+async def test_batch_sizes_are_checked(session):
+    token = await session.new_user()
+    item = {'filename': 'file.pdf', 'desc': 'batch file', 'number_of_pages': 1}
+
+    response = await session.client.request('POST', '/files/batch', headers={'auth': token}, json_body=[])
+    assert response.status == 400
+    response = await session.client.request(
+        'POST', '/files/batch', headers={'auth': token}, json_body=[item] * (files_settings.batch_max_size + 1)
+    )
+    assert response.status == 400
+    response = await delete_batch(session, token, [])
+    assert response.status == 400
+
+    response = await session.client.request('POST', '/files/batch', headers={'auth': 'bad'}, json_body=[item])
+    assert response.status == 403
+    response = await delete_batch(session, 'bad', [1])
+    assert response.status == 403
@@ -0,0 +1,87 @@
+import pytest
+
+from benchmarks.endpoints import make_pdf
+
+pytestmark = pytest.mark.anyio
+
+
+async def uploaded_file(session) -> tuple[str, int, bytes]:
+    token = await session.new_user()
+    file_id = (await session.create_files(token, 1))[0]
+    content = make_pdf('download', 1, 4096, bytes(range(256)))
+    response = await session.upload(token, file_id, content)
+    assert response.status == 200
+
+    return token, file_id, content
+
+
+async def download(session, token: str, file_id: int, **headers):
+    headers = {name.replace('_', '-'): value for name, value in headers.items()}
+    return await session.client.request('GET', '/files/{}'.format(file_id), headers={'auth': token, **headers})
+
+
+async def test_download_sends_an_etag_and_honours_if_none_match(session):
+    token, file_id, content = await uploaded_file(session)
+
+    response = await download(session, token, file_id)
+    assert response.status == 200
+    assert response.body == content
+    assert response.headers['accept-ranges'] == 'bytes'
+    etag = response.headers['etag']
+
+    response = await download(session, token, file_id, if_none_match=etag)
+    assert response.status == 304
+    assert response.body == b''
+    assert response.headers['etag'] == etag
+
+    response = await download(session, token, file_id, if_none_match='"other", W/' + etag)
+    assert response.status == 304
+    response = await download(session, token, file_id, if_none_match='"other"')
+    assert response.status == 200
+
+
+async def test_single_range(session):
+    token, file_id, content = await uploaded_file(session)
+
+    response = await download(session, token, file_id, range='bytes=10-19')
+    assert response.status == 206
+    assert response.body == content[10:20]
+    assert response.headers['content-range'] == 'bytes 10-19/{}'.format(len(content))
+
+    response = await download(session, token, file_id, range='bytes=-7')
+    assert response.status == 206
+    assert response.body == content[-7:]
+
+
+async def test_multiple_ranges_are_sent_as_multipart(session):
+    token, file_id, content = await uploaded_file(session)
+
+    response = await download(session, token, file_id, range='bytes=0-4,100-104')
+    assert response.status == 206
+    assert response.headers['content-type'].startswith('multipart/byteranges; boundary=')
+    assert content[0:5] in response.body
+    assert content[100:105] in response.body
+    assert int(response.headers['content-length']) == len(response.body)
+
+
+async def test_unsatisfiable_and_malformed_ranges(session):
+    token, file_id, content = await uploaded_file(session)
+
+    response = await download(session, token, file_id, range='bytes={}-'.format(len(content)))
+    assert response.status == 416
+    assert response.headers['content-range'] == 'bytes */{}'.format(len(content))
+
+    response = await download(session, token, file_id, range='bytes=oops')
+    assert response.status == 200
+    assert response.body == content
+
+
+async def test_if_range_with_an_old_etag_sends_the_whole_file(session):
+    token, file_id, content = await uploaded_file(session)
+    etag = (await download(session, token, file_id)).headers['etag']
+
+    response = await download(session, token, file_id, range='bytes=0-9', if_range=etag)
+    assert response.status == 206
+    response = await download(session, token, file_id, range='bytes=0-9', if_range='"stale"')
+    assert response.status == 200
+    assert response.body == content
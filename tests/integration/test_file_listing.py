@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def list_all(session, token: str, limit: int, order: str = 'asc', fields: str = '') -> list[dict]:
+    files = []
+    path = '/files/?limit={}&order={}{}'.format(limit, order, '&fields=' + fields if fields else '')
+    response = await session.client.request('GET', path, headers={'auth': token})
+    while True:
+        assert response.status == 200
+        page = response.json()
+        assert len(page['files']) <= limit
+        files.extend(page['files'])
+        if page['next_cursor'] is None:
+            return files
+
+        assert page['next_cursor'] == page['files'][-1]['id']
+        response = await session.client.request(
+            'GET', path + '&after_id={}'.format(page['next_cursor']), headers={'auth': token}
+        )
+
+
+async def test_cursor_walks_every_file_once(session):
+    token = await session.new_user()
+    file_ids = await session.create_files(token, 23)
+
+    for limit in [1, 5, 23, 100]:
+        files = await list_all(session, token, limit)
+        assert [file['id'] for file in files] == sorted(file_ids)
+
+        files = await list_all(session, token, limit, order='desc')
+        assert [file['id'] for file in files] == sorted(file_ids, reverse=True)
+
+
+async def test_last_full_page_has_no_cursor(session):
+    token = await session.new_user()
+    file_ids = await session.create_files(token, 10)
+
+    response = await session.client.request('GET', '/files/?limit=10', headers={'auth': token})
+    assert response.json()['next_cursor'] is None
+    response = await session.client.request('GET', '/files/?limit=5', headers={'auth': token})
+    assert response.json()['next_cursor'] == sorted(file_ids)[4]
+
+
+async def test_cursor_only_lists_files_of_the_user(session):
+    token = await session.new_user()
+    other_token = await session.new_user()
+    file_ids = await session.create_files(token, 4)
+    other_ids = await session.create_files(other_token, 4)
+
+    files = await list_all(session, token, 3)
+    assert [file['id'] for file in files] == sorted(file_ids)
+
+    # A cursor taken from another user's listing does not reveal their files.
+    response = await session.client.request(
+        'GET', '/files/?after_id={}'.format(min(other_ids) - 1), headers={'auth': token}
+    )
+    assert {file['id'] for file in response.json()['files']} <= set(file_ids)
+
+
+async def test_projected_pages_keep_the_cursor(session):
+    token = await session.new_user()
+    file_ids = await session.create_files(token, 7)
+
+    files = await list_all(session, token, 3, fields='filename')
+    assert [file['id'] for file in files] == sorted(file_ids)
+    assert all(set(file) == {'id', 'filename'} for file in files)
+
+    response = await session.client.request('GET', '/files/?fields=nope', headers={'auth': token})
+    assert response.status == 400
+
+
+async def test_stream_matches_the_pages(session):
+    token = await session.new_user()
+    await session.create_files(token, 12)
+
+    response = await session.client.request('GET', '/files/?stream=true&fields=id', headers={'auth': token})
+    assert response.status == 200
+    assert json.loads(response.body) == await list_all(session, token, 5, fields='id')
+
+
+async def test_without_pagination_parameters_every_file_is_an_array(session):
+    from app.config import files_settings
+
+    token = await session.new_user()
+    file_ids = await session.create_files(token, files_settings.list_default_limit + 5)
+
+    response = await session.client.request('GET', '/files/', headers={'auth': token})
+    assert response.status == 200
+    files = response.json()
+    assert [file['id'] for file in files] == sorted(file_ids)
+    assert set(files[0]) >= {'id', 'filename', 'path', 'owner', 'desc', 'number_of_pages'}
+
+    response = await session.client.request('GET', '/files/?order=desc&fields=filename', headers={'auth': token})
+    assert [file['id'] for file in response.json()] == sorted(file_ids, reverse=True)
+
+    response = await session.client.request('GET', '/files/?after_id=0', headers={'auth': token})
+    page = response.json()
+    assert len(page['files']) == files_settings.list_default_limit
+    assert page['next_cursor'] == sorted(file_ids)[files_settings.list_default_limit - 1]
+
+    response = await session.client.request('GET', '/files/', headers={'auth': 'not-a-token'})
+    assert response.status == 403
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+from pypdf import PdfReader
+
+pytestmark = pytest.mark.anyio
+
+
+async def get_pages(session, token: str, file_id: int, selection: str):
+    return await session.client.request(
+        'GET', '/files/{}/pages?range={}'.format(file_id, selection), headers={'auth': token}
+    )
+
+
+def page_numbers(content: bytes) -> list[int]:
+    return [int(page.extract_text().split()[-1]) for page in PdfReader(io.BytesIO(content)).pages]
+
+
+async def test_selected_pages_are_returned_in_order(session, upload_pdfs):
+    token = await session.new_user()
+    file_id = (await upload_pdfs(token, [6]))[0]
+
+    response = await get_pages(session, token, file_id, '4-6,1')
+    assert response.status == 200
+    assert response.headers['content-type'] == 'application/pdf'
+    assert int(response.headers['content-length']) == len(response.body)
+    assert page_numbers(response.body) == [4, 5, 6, 1]
+
+    response = await get_pages(session, token, file_id, '2')
+    assert page_numbers(response.body) == [2]
+
+
+async def test_bad_selections_are_rejected(session, upload_pdfs):
+    token = await session.new_user()
+    file_id = (await upload_pdfs(token, [3]))[0]
+
+    for selection in ['0', '4', '3-2', 'x', '1-4']:
+        response = await get_pages(session, token, file_id, selection)
+        assert response.status == 400, selection
+
+    other_token = await session.new_user()
+    response = await get_pages(session, other_token, file_id, '1')
+    assert response.status == 403
+    empty_id = (await session.create_files(token, 1))[0]
+    response = await get_pages(session, token, empty_id, '1')
+    assert response.status == 404
+
+
+async def test_parsed_documents_are_reused(session, upload_pdfs, read_metric):
+    token = await session.new_user()
+    file_id = (await upload_pdfs(token, [2]))[0]
+    hits = await read_metric('pdf_reader_cache_hits_total')
+    misses = await read_metric('pdf_reader_cache_misses_total')
+
+    for selection in ['1', '2', '1-2']:
+        response = await get_pages(session, token, file_id, selection)
+        assert response.status == 200
+
+    assert await read_metric('pdf_reader_cache_misses_total') == misses + 1
+    assert await read_metric('pdf_reader_cache_hits_total') == hits + 2
+    assert await read_metric('pdf_reader_cache_entries') >= 1
+    assert await read_metric('pdf_reader_cache_bytes') > 0
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from benchmarks.endpoints import make_pdf
+
+pytestmark = pytest.mark.anyio
+
+
+async def search(session, token: str, query: str, **params) -> list[int]:
+    path = '/files/search?q={}'.format(query) + ''.join('&{}={}'.format(name, value) for name, value in params.items())
+    response = await session.client.request('GET', path, headers={'auth': token})
+    assert response.status == 200
+    return [file['id'] for file in response.json()['files']]
+
+
+async def wait_for_search(session, token: str, query: str, expected: set[int]) -> list[int]:
+    # Uploads are indexed by the analysis worker in the background.
+    for _ in range(100):
+        found = await search(session, token, query)
+        if set(found) == expected:
+            return found
+        await asyncio.sleep(0.05)
+
+    assert set(found) == expected
+
+
+def words(session) -> str:
+    return session.prefix.split('-')[1]
+
+
+async def test_search_only_returns_files_of_the_caller(session, upload_pdfs):
+    token = await session.new_user()
+    other_token = await session.new_user()
+    file_ids = await upload_pdfs(token, [1, 2])
+    other_ids = await upload_pdfs(other_token, [1])
+
+    await wait_for_search(session, token, words(session), set(file_ids))
+    await wait_for_search(session, other_token, words(session), set(other_ids))
+    assert await search(session, token, '{}+{}'.format(words(session), file_ids[1])) == [file_ids[1]]
+    assert await search(session, token, '{}+-{}'.format(words(session), file_ids[1])) == [file_ids[0]]
+    assert await search(session, other_token, '{}+{}'.format(words(session), file_ids[1])) == []
+
+
+async def test_results_are_paged_by_offset(session, upload_pdfs):
+    token = await session.new_user()
+    file_ids = await upload_pdfs(token, [1, 1, 1])
+    await wait_for_search(session, token, words(session), set(file_ids))
+
+    response = await session.client.request(
+        'GET', '/files/search?q={}&limit=2'.format(words(session)), headers={'auth': token}
+    )
+    first = response.json()
+    assert len(first['files']) == 2
+    assert first['next_cursor'] == 2
+
+    second = await search(session, token, words(session), limit=2, offset=first['next_cursor'])
+    assert set(second) | {file['id'] for file in first['files']} == set(file_ids)
+
+
+async def test_deleted_and_replaced_files_leave_the_results(session, upload_pdfs):
+    token = await session.new_user()
+    deleted, replaced, kept = await upload_pdfs(token, [1, 1, 1])
+    await wait_for_search(session, token, words(session), {deleted, replaced, kept})
+
+    response = await session.client.request('DELETE', '/files/{}'.format(deleted), headers={'auth': token})
+    assert response.status == 200
+    response = await session.upload(token, replaced, make_pdf('replacement', 1, 16, b'\x80'))
+    assert response.status == 200
+
+    assert set(await search(session, token, words(session))) == {kept}
+    await wait_for_search(session, token, 'replacement', {replaced})
+
+
+async def test_search_needs_a_valid_token(session):
+    response = await session.client.request('GET', '/files/search?q=anything', headers={'auth': 'not-a-token'})
+    assert response.status == 403
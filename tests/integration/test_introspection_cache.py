@@ -0,0 +1,29 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_logout_invalidates_the_cached_token(session):
+    token = await session.new_user()
+    response = await session.client.request('GET', '/files/?limit=1', headers={'auth': token})
+    assert response.status == 200
+
+    response = await session.client.request('POST', '/auth/logout', headers={'auth': token})
+    assert response.status == 200
+
+    response = await session.client.request('GET', '/files/?limit=1', headers={'auth': token})
+    assert response.status == 403
+
+
+async def test_cache_counters_are_exported(session, read_metric):
+    token = await session.new_user()
+    hits = await read_metric('auth_introspection_cache_hits_total')
+    misses = await read_metric('auth_introspection_cache_misses_total')
+
+    for _ in range(3):
+        response = await session.client.request('GET', '/files/?limit=1', headers={'auth': token})
+        assert response.status == 200
+
+    assert await read_metric('auth_introspection_cache_misses_total') == misses + 1
+    assert await read_metric('auth_introspection_cache_hits_total') == hits + 2
+    assert await read_metric('auth_introspection_cache_entries') >= 1
@@ -0,0 +1,64 @@
+import pytest
+from aiohttp import web
+
+from app.config import AuthenticationApiSettings
+from app.files.external.authentication.transports.http import HttpIntrospectionTransport
+from app.files.external.authentication.transports.in_process import InProcessIntrospectionTransport
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def http_transport(session):
+    # Serves the app's introspection endpoint over a real socket, as a separate deployment would.
+    async def introspect(request: web.Request) -> web.Response:
+        response = await session.client.request('GET', '/auth/introspect', headers={'auth': request.headers['auth']})
+        return web.Response(status=response.status, body=response.body, content_type='application/json')
+
+    application = web.Application()
+    application.router.add_get('/auth/introspect', introspect)
+    runner = web.AppRunner(application)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    transport = HttpIntrospectionTransport(AuthenticationApiSettings(host='127.0.0.1', port=port))
+    await transport.start()
+
+    yield transport
+
+    await transport.close()
+    await runner.cleanup()
+
+
+async def test_in_process_transport_resolves_tokens(session):
+    token = await session.new_user()
+    transport = InProcessIntrospectionTransport()
+
+    user = await transport.introspect(auth=token)
+    response = await session.client.request('GET', '/auth/introspect', headers={'auth': token})
+    assert user == response.json()
+    assert await transport.introspect(auth='not-a-token') is None
+
+
+async def test_http_transport_matches_the_in_process_one(session, http_transport):
+    token = await session.new_user()
+
+    assert await http_transport.introspect(auth=token) == await InProcessIntrospectionTransport().introspect(auth=token)
+    assert await http_transport.introspect(auth='not-a-token') is None
+    # The session is kept between calls.
+    http_session = http_transport.session
+    await http_transport.introspect(auth=token)
+    assert http_transport.session is http_session
+
+
+async def test_in_process_transport_reports_revoked_tokens(session):
+    token = await session.new_user()
+    revoked = []
+    InProcessIntrospectionTransport().on_token_revoked(revoked.append)
+
+    response = await session.client.request('POST', '/auth/logout', headers={'auth': token})
+    assert response.status == 200
+    assert token in revoked
+    assert await InProcessIntrospectionTransport().introspect(auth=token) is None
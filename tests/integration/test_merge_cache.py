@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from benchmarks.endpoints import make_pdf
+
+pytestmark = pytest.mark.anyio
+
+
+async def merge(session, token: str, file_ids: list[int]) -> int:
+    response = await session.client.request(
+        'POST', '/files/merge/many', headers={'auth': token}, json_body={'files': [{'file_id': i} for i in file_ids]}
+    )
+    assert response.status == 200
+    return response.json()['file_id']
+
+
+async def paths(session, token: str) -> dict[int, str]:
+    response = await session.client.request('GET', '/files/?limit=1000&fields=path', headers={'auth': token})
+    return {file['id']: file['path'] for file in response.json()['files']}
+
+
+async def cache_metrics(read_metric) -> tuple[float, float, float]:
+    return (
+        await read_metric('merge_cache_hits_total'),
+        await read_metric('merge_cache_misses_total'),
+        await read_metric('merge_cache_evictions_total')
+    )
+
+
+async def test_hit_reuses_the_output_until_it_is_unreferenced(session, upload_pdfs, read_metric):
+    token = await session.new_user()
+    first, second = await upload_pdfs(token, [1, 2])
+    hits, misses, evictions = await cache_metrics(read_metric)
+
+    merged = await merge(session, token, [first, second])
+    copy = await merge(session, token, [first, second])
+    assert await cache_metrics(read_metric) == (hits + 1, misses + 1, evictions)
+
+    stored = await paths(session, token)
+    assert merged != copy
+    assert stored[merged] == stored[copy]
+    assert os.path.exists(stored[merged])
+    contents = [
+        (await session.client.request('GET', '/files/{}'.format(file_id), headers={'auth': token})).body
+        for file_id in (merged, copy)
+    ]
+    assert contents[0] == contents[1]
+
+    # Another order is another merge.
+    await merge(session, token, [second, first])
+    assert await cache_metrics(read_metric) == (hits + 1, misses + 2, evictions)
+
+    response = await session.client.request('DELETE', '/files/{}'.format(merged), headers={'auth': token})
+    assert response.status == 200
+    assert os.path.exists(stored[merged])
+    assert (await cache_metrics(read_metric))[2] == evictions
+
+    response = await session.client.request('DELETE', '/files/{}'.format(copy), headers={'auth': token})
+    assert response.status == 200
+    assert not os.path.exists(stored[merged])
+    assert (await cache_metrics(read_metric))[2] == evictions + 1
+
+    remerged = await merge(session, token, [first, second])
+    assert await cache_metrics(read_metric) == (hits + 1, misses + 3, evictions + 1)
+    assert (await paths(session, token))[remerged] != stored[merged]
+
+
+async def test_upload_over_the_last_reference_evicts_the_output(session, upload_pdfs, read_metric):
+    token = await session.new_user()
+    file_ids = await upload_pdfs(token, [1, 1])
+    merged = await merge(session, token, file_ids)
+    path = (await paths(session, token))[merged]
+    evictions = await read_metric('merge_cache_evictions_total')
+
+    response = await session.upload(token, merged, make_pdf('replacement', 1, 16, b'\x80'))
+    assert response.status == 200
+
+    assert not os.path.exists(path)
+    assert await read_metric('merge_cache_evictions_total') == evictions + 1
+    assert (await paths(session, token))[merged] != path
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from app.config import files_settings
+from app.files.domain.bo.job_bo import JobBO
+from app.files.domain.bo.merge_source_bo import MergeSourceBO
+from app.files.models import JobStatus
+from app.files.persistence.memory.job_bo import JobBOMemoryPersistenceService
+
+pytestmark = pytest.mark.anyio
+
+
+async def wait_for_job(session, token: str, job_id: int) -> dict:
+    for _ in range(300):
+        response = await session.client.request('GET', '/files/jobs/{}'.format(job_id), headers={'auth': token})
+        assert response.status == 200
+        job = response.json()
+        if job['status'] in (JobStatus.DONE.value, JobStatus.FAILED.value):
+            return job
+        await asyncio.sleep(0.1)
+
+    raise AssertionError('Job {} was not finished'.format(job_id))
+
+
+async def count_files(session, token: str) -> int:
+    response = await session.client.request('GET', '/files/?limit=1000&fields=id', headers={'auth': token})
+    return len(response.json()['files'])
+
+
+async def test_enqueued_jobs_are_merged_once(session, upload_pdfs):
+    token = await session.new_user()
+    first, second, third = await upload_pdfs(token, [2, 3, 1])
+    files_before = await count_files(session, token)
+
+    orderings = [[first, second], [second, third], [third, first, second], [first, third]]
+    job_ids = []
+    for ordering in orderings:
+        response = await session.client.request(
+            'POST',
+            '/files/jobs/merge',
+            headers={'auth': token},
+            json_body={'files': [{'file_id': file_id} for file_id in ordering]}
+        )
+        assert response.status == 200
+        job_ids.append(response.json()['job_id'])
+
+    jobs = [await wait_for_job(session, token, job_id) for job_id in job_ids]
+    assert [job['status'] for job in jobs] == [JobStatus.DONE.value] * len(jobs)
+    assert len({job['file_id'] for job in jobs}) == len(jobs)
+    # A job claimed twice would have added a second merged row.
+    assert await count_files(session, token) == files_before + len(jobs)
+
+    response = await session.client.request('GET', '/files/?limit=1000', headers={'auth': token})
+    pages = {file['id']: file['number_of_pages'] for file in response.json()['files']}
+    assert [pages[job['file_id']] for job in jobs] == [5, 4, 6, 3]
+
+
+async def test_job_of_another_user_is_forbidden(session, upload_pdfs):
+    token = await session.new_user()
+    file_ids = await upload_pdfs(token, [1, 1])
+    response = await session.client.request(
+        'POST', '/files/jobs/merge', headers={'auth': token}, json_body={'files': [{'file_id': i} for i in file_ids]}
+    )
+    job_id = response.json()['job_id']
+
+    other_token = await session.new_user()
+    response = await session.client.request('GET', '/files/jobs/{}'.format(job_id), headers={'auth': other_token})
+    assert response.status == 403
+    response = await session.client.request('GET', '/files/jobs/{}'.format(job_id + 1000), headers={'auth': token})
+    assert response.status == 404
+    await wait_for_job(session, token, job_id)
+
+
+async def test_enqueue_checks_the_number_of_sources(session, upload_pdfs):
+    token = await session.new_user()
+    file_ids = await upload_pdfs(token, [1])
+    for sources in [[], [{'file_id': file_ids[0]}] * (files_settings.merge_max_sources + 1)]:
+        response = await session.client.request(
+            'POST', '/files/jobs/merge', headers={'auth': token}, json_body={'files': sources}
+        )
+        assert response.status == 400
+
+
+def new_job(owner: int) -> JobBO:
+    sources = [MergeSourceBO(file_id=1), MergeSourceBO(file_id=2)]
+    return JobBO(owner=owner, status=JobStatus.QUEUED.value, sources=sources)
+
+
+async def test_concurrent_claims_get_distinct_jobs():
+    jobs = JobBOMemoryPersistenceService()
+    created = [await jobs.create_job(new_job(owner)) for owner in range(3)]
+
+    claimed = await asyncio.gather(*(jobs.claim_job(stale_after=600) for _ in range(5)))
+
+    claimed_ids = [job.id for job in claimed if job is not None]
+    assert sorted(claimed_ids) == [job.id for job in created]
+    assert claimed.count(None) == 2
+    assert all(job.status == JobStatus.RUNNING.value for job in claimed if job is not None)
+
+
+async def test_claims_follow_job_order_and_released_jobs_return():
+    jobs = JobBOMemoryPersistenceService()
+    first = await jobs.create_job(new_job(1))
+    second = await jobs.create_job(new_job(1))
+
+    assert (await jobs.claim_job(stale_after=600)).id == first.id
+    await jobs.release_job(first.id)
+    assert (await jobs.claim_job(stale_after=600)).id == first.id
+    assert (await jobs.claim_job(stale_after=600)).id == second.id
+    assert await jobs.claim_job(stale_after=600) is None
+
+    await jobs.complete_job(first.id, file_id=10)
+    assert (await jobs.get_job_by_id(first.id)).file_id == 10
+
+
+async def test_only_stale_running_jobs_are_claimed_again():
+    jobs = JobBOMemoryPersistenceService()
+    job = await jobs.create_job(new_job(1))
+    assert (await jobs.claim_job(stale_after=600)).id == job.id
+
+    assert await jobs.claim_job(stale_after=600) is None
+    # A worker that stopped updating the job is assumed to be gone.
+    assert (await jobs.claim_job(stale_after=-1)).id == job.id
+
+    await jobs.fail_job(job.id, error='x' * 1000)
+    assert await jobs.claim_job(stale_after=-1) is None
+    assert len((await jobs.get_job_by_id(job.id)).error) == 400
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+from pypdf import PdfReader
+
+pytestmark = pytest.mark.anyio
+
+
+async def merge(session, token: str, sources: list[dict]):
+    return await session.client.request(
+        'POST', '/files/merge/many', headers={'auth': token}, json_body={'files': sources}
+    )
+
+
+def pages_of(content: bytes) -> list[tuple[int, int]]:
+    # Pages of the uploaded PDFs read "Benchmark <prefix>-<file id> page <number>".
+    pages = []
+    for page in PdfReader(io.BytesIO(content)).pages:
+        words = page.extract_text().split()
+        pages.append((int(words[1].rsplit('-', 1)[1]), int(words[-1])))
+
+    return pages
+
+
+async def test_page_ranges_of_every_source_are_merged_in_order(session, upload_pdfs):
+    token = await session.new_user()
+    first, second, third = await upload_pdfs(token, [3, 4, 2])
+
+    response = await merge(session, token, [
+        {'file_id': second, 'first_page': 2, 'last_page': 3},
+        {'file_id': first},
+        {'file_id': third, 'last_page': 1},
+        {'file_id': second, 'first_page': 4}
+    ])
+    assert response.status == 200
+    merged_id = response.json()['file_id']
+
+    response = await session.client.request('GET', '/files/{}'.format(merged_id), headers={'auth': token})
+    assert pages_of(response.body) == [
+        (second, 2), (second, 3), (first, 1), (first, 2), (first, 3), (third, 1), (second, 4)
+    ]
+    response = await session.client.request('GET', '/files/?limit=1000', headers={'auth': token})
+    merged = [file for file in response.json()['files'] if file['id'] == merged_id][0]
+    assert merged['number_of_pages'] == 7
+    assert merged['filename'] == 'Merged.pdf'
+
+
+async def test_bad_page_ranges_are_rejected(session, upload_pdfs):
+    token = await session.new_user()
+    first, second = await upload_pdfs(token, [3, 2])
+
+    for source in [
+        {'file_id': second, 'last_page': 3},
+        {'file_id': second, 'first_page': 3},
+        {'file_id': first, 'first_page': 3, 'last_page': 2}
+    ]:
+        response = await merge(session, token, [{'file_id': first}, source])
+        assert response.status == 400, source
+
+    response = await merge(session, token, [{'file_id': first, 'first_page': 0}, {'file_id': second}])
+    assert response.status == 422
+
+
+async def test_sources_must_exist_and_belong_to_the_user(session, upload_pdfs):
+    token = await session.new_user()
+    first, second = await upload_pdfs(token, [1, 1])
+
+    response = await merge(session, token, [{'file_id': first}, {'file_id': second + 100000}])
+    assert response.status == 404
+
+    other_token = await session.new_user()
+    response = await merge(session, other_token, [{'file_id': first}, {'file_id': second}])
+    assert response.status == 403
+
+    response = await merge(session, token, [])
+    assert response.status == 400
@@ -0,0 +1,48 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_requests_are_counted_by_route_template_and_status(session, upload_pdfs, read_metric):
+    token = await session.new_user()
+    file_id = (await upload_pdfs(token, [1]))[0]
+    labels = {'method': 'GET', 'route': '/files/{file_id}'}
+    found = await read_metric('http_request_duration_seconds_count', status='200', **labels)
+    missing = await read_metric('http_request_duration_seconds_count', status='404', **labels)
+
+    await session.client.request('GET', '/files/{}'.format(file_id), headers={'auth': token})
+    await session.client.request('GET', '/files/{}'.format(file_id + 1000000), headers={'auth': token})
+    await session.client.request('GET', '/files/{}'.format(file_id + 1000001), headers={'auth': token})
+
+    assert await read_metric('http_request_duration_seconds_count', status='200', **labels) == found + 1
+    assert await read_metric('http_request_duration_seconds_count', status='404', **labels) == missing + 2
+
+
+async def test_persistence_uploads_and_introspection_are_measured(session, upload_pdfs, read_metric):
+    token = await session.new_user()
+    uploads = await read_metric('upload_throughput_bytes_per_second_count')
+    introspections = await read_metric('auth_introspection_duration_seconds_count')
+
+    await upload_pdfs(token, [1])
+
+    assert await read_metric('upload_throughput_bytes_per_second_count') == uploads + 1
+    assert await read_metric('auth_introspection_duration_seconds_count') > introspections
+    assert await read_metric('persistence_duration_seconds_count', method='create_token') > 0
+
+
+async def test_output_is_prometheus_text(session):
+    response = await session.client.request('GET', '/metrics')
+    assert response.status == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+
+    families = {}
+    for line in response.body.decode().splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            families[name] = kind
+        elif not line.startswith('# HELP '):
+            float(line.rpartition(' ')[2])
+
+    assert families['http_request_duration_seconds'] == 'histogram'
+    assert families['merge_cache_hits_total'] == 'counter'
+    assert families['pdf_reader_cache_bytes'] == 'gauge'
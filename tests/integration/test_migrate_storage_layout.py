@@ -0,0 +1,146 @@
+import os
+from collections import Counter
+
+import pytest
+from tortoise import Tortoise
+from tortoise.utils import get_schema_sql
+
+from app.config import files_settings
+from app.files.domain.storage_paths import MERGED_DIRECTORY, sharded_path
+from app.files.models import FileDB, MergeCacheDB
+from infra.migrate_storage_layout import migrate_path, migrate_table, sweep
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def database():
+    # The tool only runs plain queries, so SQLite stands in for Postgres. It has no GIN indexes.
+    await Tortoise.init(
+        db_url='sqlite://:memory:',
+        modules={'models': ['app.authentication.models', 'app.files.models']}
+    )
+    connection = Tortoise.get_connection('default')
+    await connection.execute_script(get_schema_sql(connection, safe=False).replace(' USING GIN', ''))
+    yield
+    await Tortoise.close_connections()
+
+
+@pytest.fixture
+def storage_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(files_settings, 'storage_root', str(tmp_path))
+    os.makedirs(str(tmp_path / MERGED_DIRECTORY))
+    return str(tmp_path)
+
+
+def write(path: str, content: bytes):
+    with open(path, 'wb') as file:
+        file.write(content)
+
+
+def read(path: str) -> bytes:
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+async def create_file(storage_root: str, content: bytes = None) -> FileDB:
+    file = await FileDB.create(filename='file', path='', owner=1, desc='description', number_of_pages=1)
+    file.path = storage_root + '/{}.pdf'.format(file.id)
+    await file.save()
+    if content is not None:
+        write(file.path, content)
+
+    return file
+
+
+async def create_cache_entry(storage_root: str, key: str, content: bytes) -> MergeCacheDB:
+    path = storage_root + '/' + MERGED_DIRECTORY + '/' + key + '.pdf'
+    write(path, content)
+
+    return await MergeCacheDB.create(key=key, path=path, number_of_pages=1, digest='digest', size=len(content))
+
+
+async def test_moves_files_and_merge_outputs_into_the_sharded_layout(database, storage_root):
+    file = await create_file(storage_root, b'file')
+    entry = await create_cache_entry(storage_root, 'key', b'merged')
+    empty = await FileDB.create(filename='empty', path='', owner=1, desc='description', number_of_pages=0)
+    stats = Counter()
+
+    await migrate_table(FileDB, after_id=0, batch_size=1, dry_run=False, stats=stats)
+    await migrate_table(MergeCacheDB, after_id=0, batch_size=1, dry_run=False, stats=stats)
+    assert stats == {'moved': 2}
+
+    moved_file = await FileDB.get(id=file.id)
+    moved_entry = await MergeCacheDB.get(id=entry.id)
+    assert moved_file.path == sharded_path(file.path)
+    assert moved_entry.path == sharded_path(entry.path)
+    assert read(moved_file.path) == b'file'
+    assert read(moved_entry.path) == b'merged'
+    assert (await FileDB.get(id=empty.id)).path == ''
+
+    # The flat copies are kept for readers that looked the old paths up until the sweep.
+    assert os.path.exists(file.path)
+    await sweep(batch_size=1, stats=stats)
+    assert stats['unlinked'] == 2
+    assert not os.path.exists(file.path)
+    assert not os.path.exists(entry.path)
+    assert read(moved_file.path) == b'file'
+
+
+async def test_running_again_skips_what_was_moved(database, storage_root):
+    file = await create_file(storage_root, b'file')
+    await migrate_table(FileDB, after_id=0, batch_size=10, dry_run=False, stats=Counter())
+
+    stats = Counter()
+    await migrate_table(FileDB, after_id=0, batch_size=10, dry_run=False, stats=stats)
+    await sweep(batch_size=10, stats=stats)
+    await sweep(batch_size=10, stats=stats)
+    assert stats == {'skipped': 1, 'unlinked': 1}
+    assert (await FileDB.get(id=file.id)).path == sharded_path(file.path)
+
+
+async def test_after_id_resumes_the_files_table(database, storage_root):
+    first = await create_file(storage_root, b'first')
+    second = await create_file(storage_root, b'second')
+    stats = Counter()
+
+    await migrate_table(FileDB, after_id=first.id, batch_size=10, dry_run=False, stats=stats)
+    assert stats == {'moved': 1}
+    assert (await FileDB.get(id=first.id)).path == first.path
+    assert (await FileDB.get(id=second.id)).path == sharded_path(second.path)
+
+
+async def test_dry_run_changes_nothing(database, storage_root):
+    file = await create_file(storage_root, b'file')
+    stats = Counter()
+
+    await migrate_table(FileDB, after_id=0, batch_size=10, dry_run=True, stats=stats)
+    assert stats == {'pending': 1}
+    assert (await FileDB.get(id=file.id)).path == file.path
+    assert not os.path.exists(sharded_path(file.path))
+
+
+async def test_missing_and_conflicting_files_keep_their_rows(database, storage_root):
+    missing = await create_file(storage_root)
+    conflicting = await create_file(storage_root, b'flat')
+    os.makedirs(os.path.dirname(sharded_path(conflicting.path)), exist_ok=True)
+    write(sharded_path(conflicting.path), b'other')
+    stats = Counter()
+
+    await migrate_table(FileDB, after_id=0, batch_size=10, dry_run=False, stats=stats)
+    await sweep(batch_size=10, stats=stats)
+    assert stats == {'missing': 1, 'conflict': 1}
+    assert (await FileDB.get(id=missing.id)).path == missing.path
+    assert (await FileDB.get(id=conflicting.id)).path == conflicting.path
+    assert read(conflicting.path) == b'flat'
+    assert read(sharded_path(conflicting.path)) == b'other'
+
+
+async def test_paths_no_row_points_to_are_not_switched(database, storage_root):
+    # A row that changed between the lookup and the switch, e.g. by an upload, leaves its new path alone.
+    path = storage_root + '/12345.pdf'
+    write(path, b'old')
+
+    assert await migrate_path(path=path, dry_run=False) == 'superseded'
+    assert not os.path.exists(sharded_path(path))
+    assert read(path) == b'old'
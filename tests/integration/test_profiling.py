@@ -0,0 +1,57 @@
+import json
+import os
+import pstats
+
+import pytest
+
+from app.config import ProfilingSettings
+from app.tracing import ProfilingMiddleware
+from benchmarks.asgi_client import AsgiClient
+
+pytestmark = pytest.mark.anyio
+
+
+def profiled(app, **settings) -> AsgiClient:
+    return AsgiClient(ProfilingMiddleware(app, settings=ProfilingSettings(**settings)))
+
+
+async def test_only_requests_with_the_token_are_profiled(app, session, tmp_path):
+    token = await session.new_user()
+    client = profiled(app, token='secret', directory=str(tmp_path))
+
+    for headers in ({'auth': token}, {'auth': token, 'x-profile': 'wrong'}, {'auth': token, 'x-profile': 'secre'}):
+        response = await client.request('GET', '/files/', headers=headers)
+        assert response.status == 200
+        assert 'x-profile-id' not in response.headers
+    assert os.listdir(str(tmp_path)) == []
+
+    response = await client.request('GET', '/files/', headers={'auth': token, 'x-profile': 'secret'})
+    assert response.status == 200
+    profile_id = response.headers['x-profile-id']
+    assert sorted(os.listdir(str(tmp_path))) == [profile_id + '.prof', profile_id + '.trace.json']
+
+    with open(str(tmp_path / (profile_id + '.trace.json'))) as file:
+        trace = json.load(file)
+    assert trace['otherData'] == {'method': 'GET', 'path': '/files/', 'status': 200}
+    spans = {event['name']: event for event in trace['traceEvents'] if event['ph'] == 'X'}
+    assert spans['GET /files/']['args'] == {'route': '/files/', 'status': 200}
+    assert {event['cat'] for event in spans.values()} >= {'request', 'controller', 'persistence'}
+    assert pstats.Stats(str(tmp_path / (profile_id + '.prof'))).total_calls > 0
+
+
+async def test_header_is_ignored_without_a_token(app, session, tmp_path):
+    token = await session.new_user()
+    client = profiled(app, directory=str(tmp_path))
+
+    response = await client.request('GET', '/files/', headers={'auth': token, 'x-profile': ''})
+    assert 'x-profile-id' not in response.headers
+    assert os.listdir(str(tmp_path)) == []
+
+
+async def test_sampled_requests_are_profiled(app, session, tmp_path):
+    token = await session.new_user()
+    client = profiled(app, sample_rate=1.0, directory=str(tmp_path))
+
+    response = await client.request('GET', '/files/', headers={'auth': token})
+    assert response.status == 200
+    assert os.path.exists(str(tmp_path / (response.headers['x-profile-id'] + '.trace.json')))
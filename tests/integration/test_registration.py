@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def register(session, username: str, password: str):
+    return await session.client.request('POST', '/auth/register', json_body={
+        'username': username, 'password': password, 'mail': username + '@example.com', 'year_of_birth': 1990
+    })
+
+
+async def login(session, username: str, password: str):
+    return await session.client.request('POST', '/auth/login', json_body={'username': username, 'password': password})
+
+
+async def test_taken_usernames_get_409(session):
+    username = session.prefix + '-taken'
+    response = await register(session, username, 'first')
+    assert response.status == 200
+    assert response.json() == {
+        'new_user': {'username': username, 'mail': username + '@example.com', 'year_of_birth': 1990}
+    }
+
+    response = await register(session, username, 'second')
+    assert response.status == 409
+    assert (await login(session, username, 'first')).status == 200
+    assert (await login(session, username, 'second')).status != 200
+
+
+async def test_concurrent_registrations_create_one_user(session):
+    username = session.prefix + '-race'
+    responses = await asyncio.gather(*(register(session, username, str(index)) for index in range(10)))
+
+    statuses = sorted(response.status for response in responses)
+    assert statuses == [200] + [409] * 9
+    winner = next(index for index, response in enumerate(responses) if response.status == 200)
+    assert (await login(session, username, str(winner))).status == 200
+
+
+async def test_empty_credentials_get_400(session):
+    assert (await register(session, '', 'password')).status == 400
+    assert (await register(session, session.prefix + '-empty', '')).status == 400
+
+
+async def test_every_login_gets_its_own_token(session):
+    username = session.prefix + '-tokens'
+    await register(session, username, 'password')
+    tokens = [(await login(session, username, 'password')).json()['auth'] for _ in range(3)]
+
+    assert len(set(tokens)) == 3
+    for token in tokens:
+        response = await session.client.request('GET', '/files/', headers={'auth': token})
+        assert response.status == 200
@@ -0,0 +1,157 @@
+import hashlib
+import io
+import os
+
+import aiohttp
+import pytest
+from fastapi import UploadFile
+
+from app.config import S3Settings
+from app.files.domain.persistences.exceptions import NotFoundException
+from app.files.persistence.s3.file_storage import FileStorageS3PersistenceService
+
+moto_server = pytest.importorskip('moto.server')
+boto3 = pytest.importorskip('boto3')
+
+pytestmark = pytest.mark.anyio
+
+BUCKET = 'carlemany-tests'
+# S3 and moto reject parts smaller than 5 MB other than the last one.
+PART_SIZE = 5 * 1024 * 1024
+
+
+@pytest.fixture(scope='module')
+def endpoint_url():
+    server = moto_server.ThreadedMotoServer(ip_address='127.0.0.1', port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint_url = 'http://{}:{}'.format(host, port)
+    s3_client(endpoint_url).create_bucket(Bucket=BUCKET)
+
+    yield endpoint_url
+
+    server.stop()
+
+
+def s3_client(endpoint_url: str):
+    return boto3.client(
+        's3',
+        endpoint_url=endpoint_url,
+        region_name='us-east-1',
+        aws_access_key_id='testing',
+        aws_secret_access_key='testing'
+    )
+
+
+@pytest.fixture
+async def storage(endpoint_url):
+    storage = FileStorageS3PersistenceService(S3Settings(
+        endpoint_url=endpoint_url,
+        bucket=BUCKET,
+        access_key_id='testing',
+        secret_access_key='testing',
+        part_size=PART_SIZE,
+        max_concurrency=2
+    ))
+    await storage.start()
+
+    yield storage
+
+    await storage.close()
+
+
+async def read_all(storage: FileStorageS3PersistenceService, path: str, start: int, end: int) -> bytes:
+    return b''.join([chunk async for chunk in storage.read(path, start, end)])
+
+
+def pending_uploads(endpoint_url: str) -> list[dict]:
+    return s3_client(endpoint_url).list_multipart_uploads(Bucket=BUCKET).get('Uploads', [])
+
+
+async def test_small_upload_is_a_single_put(storage):
+    content = b'%PDF-1.4 small'
+    digest, size = await storage.save_upload('files/aa/bb/1.pdf', UploadFile(file=io.BytesIO(content)))
+
+    assert (digest, size) == (hashlib.sha256(content).hexdigest(), len(content))
+    assert await storage.exists('files/aa/bb/1.pdf')
+    assert await read_all(storage, 'files/aa/bb/1.pdf', 0, size - 1) == content
+
+
+async def test_multipart_upload_and_ranged_reads(storage, endpoint_url):
+    content = os.urandom(2 * PART_SIZE + 12345)
+    digest, size = await storage.save_upload('files/aa/bb/2.pdf', UploadFile(file=io.BytesIO(content)))
+
+    assert (digest, size) == (hashlib.sha256(content).hexdigest(), len(content))
+    assert await storage.size('files/aa/bb/2.pdf') == len(content)
+    head = s3_client(endpoint_url).head_object(Bucket=BUCKET, Key='files/aa/bb/2.pdf')
+    assert head['ETag'].strip('"').endswith('-3')
+
+    assert await read_all(storage, 'files/aa/bb/2.pdf', 0, 99) == content[:100]
+    middle = await read_all(storage, 'files/aa/bb/2.pdf', PART_SIZE - 10, PART_SIZE + 9)
+    assert middle == content[PART_SIZE - 10:PART_SIZE + 10]
+    assert await read_all(storage, 'files/aa/bb/2.pdf', len(content) - 5, len(content) - 1) == content[-5:]
+    assert await read_all(storage, 'files/aa/bb/2.pdf', 0, len(content) - 1) == content
+
+
+async def test_save_local_uploads_and_removes_the_scratch_file(storage):
+    content = os.urandom(PART_SIZE + 1)
+    local_path = storage.scratch_path()
+    with open(local_path, 'wb') as buffer:
+        buffer.write(content)
+
+    await storage.save_local(local_path, 'files/aa/bb/3.pdf')
+
+    assert not os.path.exists(local_path)
+    async with storage.open_local('files/aa/bb/3.pdf') as downloaded:
+        with open(downloaded, 'rb') as buffer:
+            assert buffer.read() == content
+    assert not os.path.exists(downloaded)
+
+
+async def test_exists_and_delete(storage):
+    await storage.put_object('files/aa/bb/4.pdf', b'content')
+    assert await storage.exists('files/aa/bb/4.pdf')
+
+    await storage.delete('files/aa/bb/4.pdf')
+    assert not await storage.exists('files/aa/bb/4.pdf')
+    # Deleting twice is not an error, so deletes can be retried.
+    await storage.delete('files/aa/bb/4.pdf')
+
+    with pytest.raises(NotFoundException):
+        await storage.size('files/aa/bb/4.pdf')
+    with pytest.raises(NotFoundException):
+        await read_all(storage, 'files/aa/bb/4.pdf', 0, 0)
+
+
+async def test_failed_part_aborts_the_upload(storage, endpoint_url, monkeypatch):
+    upload_part = storage.upload_part
+    sent = []
+
+    async def failing_upload_part(path: str, upload_id: str, number: int, data: bytes) -> str:
+        if number == 2:
+            raise aiohttp.ClientError('part {} failed'.format(number))
+        sent.append(number)
+        return await upload_part(path=path, upload_id=upload_id, number=number, data=data)
+
+    monkeypatch.setattr(storage, 'upload_part', failing_upload_part)
+    content = os.urandom(3 * PART_SIZE)
+
+    with pytest.raises(aiohttp.ClientError):
+        await storage.save_upload('files/aa/bb/5.pdf', UploadFile(file=io.BytesIO(content)))
+
+    assert not await storage.exists('files/aa/bb/5.pdf')
+    assert pending_uploads(endpoint_url) == []
+
+
+async def test_failed_read_aborts_the_upload(storage, endpoint_url):
+    class FailingFile(io.BytesIO):
+        def read(self, size=-1):
+            if self.tell() >= PART_SIZE:
+                raise OSError('client went away')
+            return super().read(size)
+
+    with pytest.raises(OSError):
+        await storage.save_upload('files/aa/bb/6.pdf', UploadFile(file=FailingFile(os.urandom(2 * PART_SIZE))))
+
+    assert not await storage.exists('files/aa/bb/6.pdf')
+    assert pending_uploads(endpoint_url) == []
@@ -0,0 +1,49 @@
+import time
+
+from app.files.external.authentication.introspection_cache import IntrospectionCache
+
+
+def test_hits_and_misses_are_counted():
+    cache = IntrospectionCache(max_size=10, ttl=60)
+    assert cache.get('token') is None
+    cache.set('token', {'id': 1})
+    assert cache.get('token') == {'id': 1}
+    assert cache.get('token') == {'id': 1}
+
+    samples = {name: value for name, _, _, _, value in cache.metrics()}
+    assert samples == {
+        'auth_introspection_cache_entries': 1,
+        'auth_introspection_cache_hits_total': 2,
+        'auth_introspection_cache_misses_total': 1
+    }
+
+
+def test_least_recently_used_tokens_are_dropped():
+    cache = IntrospectionCache(max_size=2, ttl=60)
+    cache.set('first', {'id': 1})
+    cache.set('second', {'id': 2})
+    cache.get('first')
+    cache.set('third', {'id': 3})
+
+    assert cache.get('second') is None
+    assert cache.get('first') == {'id': 1}
+    assert cache.get('third') == {'id': 3}
+
+
+def test_expired_and_invalidated_tokens_miss(monkeypatch):
+    cache = IntrospectionCache(max_size=10, ttl=30)
+    cache.set('expiring', {'id': 1})
+    cache.set('revoked', {'id': 2})
+    cache.invalidate('revoked')
+    assert cache.get('revoked') is None
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 31)
+    assert cache.get('expiring') is None
+    assert len(cache.entries) == 0
+
+
+def test_disabled_cache_keeps_nothing():
+    cache = IntrospectionCache(max_size=0, ttl=30)
+    cache.set('token', {'id': 1})
+    assert cache.get('token') is None
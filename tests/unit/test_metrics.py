@@ -0,0 +1,99 @@
+import json
+import os
+import time
+
+import pytest
+
+from app import metrics
+from app.config import MetricsSettings
+from app.metrics import Histogram, add_collector, measured, render_metrics, write_snapshot
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    # Keeps the histograms and collectors of these tests out of the app-wide registry.
+    monkeypatch.setattr(metrics, 'histograms', {})
+    monkeypatch.setattr(metrics, 'collectors', [])
+
+
+def collector():
+    return [('queue_size', 'gauge', 'Queued items.', {'queue': 'say "hi"\n'}, 3)]
+
+
+async def test_histograms_are_rendered_cumulatively():
+    histogram = Histogram('work_seconds', 'Time spent working.', ('kind',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, 'a')
+    histogram.observe(0.1, 'b')
+
+    assert (await render_metrics(MetricsSettings())).splitlines() == [
+        '# HELP work_seconds Time spent working.',
+        '# TYPE work_seconds histogram',
+        'work_seconds_bucket{kind="a",le="0.1"} 1',
+        'work_seconds_bucket{kind="a",le="1.0"} 3',
+        'work_seconds_bucket{kind="a",le="+Inf"} 4',
+        'work_seconds_sum{kind="a"} 6.05',
+        'work_seconds_count{kind="a"} 4',
+        'work_seconds_bucket{kind="b",le="0.1"} 1',
+        'work_seconds_bucket{kind="b",le="1.0"} 1',
+        'work_seconds_bucket{kind="b",le="+Inf"} 1',
+        'work_seconds_sum{kind="b"} 0.1',
+        'work_seconds_count{kind="b"} 1'
+    ]
+
+
+async def test_collectors_are_added_once_and_labels_escaped():
+    add_collector(collector)
+    add_collector(collector)
+
+    lines = (await render_metrics(MetricsSettings())).splitlines()
+    assert lines[-3:] == [
+        '# HELP queue_size Queued items.',
+        '# TYPE queue_size gauge',
+        'queue_size{queue="say \\"hi\\"\\n"} 3'
+    ]
+
+
+async def test_measured_times_public_coroutines(monkeypatch):
+    histogram = Histogram('persistence_duration_seconds', 'Persistence.', ('service', 'method'))
+    monkeypatch.setattr(metrics, 'PERSISTENCE_DURATION', histogram)
+
+    @measured
+    class Service:
+        async def lookup(self, value: int) -> int:
+            return value
+
+        async def _helper(self):
+            pass
+
+    assert await Service().lookup(1) == 1
+    await Service()._helper()
+
+    assert list(histogram.series) == [('Service', 'lookup')]
+    assert histogram.series[('Service', 'lookup')][-2] == 0
+
+
+async def test_workers_are_summed_from_the_shared_directory(tmp_path):
+    histogram = Histogram('work_seconds', 'Time spent working.', buckets=(1.0,))
+    histogram.observe(0.5)
+    add_collector(collector)
+    settings = MetricsSettings(multiprocess_directory=str(tmp_path), flush_interval=1)
+
+    other = {'histograms': {'work_seconds': [[[], [2, 1, 7.0]]]}, 'samples': collector()}
+    write_snapshot(str(tmp_path), other)
+    os.rename(str(tmp_path / '{}.json'.format(os.getpid())), str(tmp_path / '1.json'))
+    with open(str(tmp_path / '2.json'), 'w') as file:
+        json.dump(other, file)
+    # Workers that stopped writing keep their histograms but not their samples.
+    os.utime(str(tmp_path / '2.json'), (time.time() - 60, time.time() - 60))
+
+    lines = (await render_metrics(settings)).splitlines()
+    assert 'work_seconds_bucket{le="1.0"} 5' in lines
+    assert 'work_seconds_count 7' in lines
+    assert 'work_seconds_sum 14.5' in lines
+    assert [line for line in lines if line.startswith('queue_size{')] == [
+        'queue_size{{queue="say \\"hi\\"\\n",pid="{}"}} 3'.format(os.getpid()),
+        'queue_size{queue="say \\"hi\\"\\n",pid="1"} 3'
+    ]
@@ -0,0 +1,28 @@
+import pytest
+
+from app.files.domain.pdf import page_range, parse_page_selection
+from app.files.domain.persistences.exceptions import BadPageRangeException
+
+
+def test_page_range_defaults_to_the_whole_document():
+    assert page_range(5, None, None) == (0, 5)
+    assert page_range(5, 2, None) == (1, 5)
+    assert page_range(5, None, 3) == (0, 3)
+
+
+@pytest.mark.parametrize('first_page, last_page', [(0, 3), (4, 3), (1, 6), (6, None)])
+def test_page_range_out_of_bounds(first_page, last_page):
+    with pytest.raises(BadPageRangeException):
+        page_range(5, first_page, last_page)
+
+
+def test_parse_page_selection_keeps_the_requested_order():
+    assert parse_page_selection('3-5,1', 10) == [3, 4, 5, 1]
+    assert parse_page_selection(' 2 , 2 ', 10) == [2, 2]
+    assert parse_page_selection('10', 10) == [10]
+
+
+@pytest.mark.parametrize('selection', ['', '0', '11', '5-3', '1-', '-2', 'a', '1,,2', '1-2-3', '2-11'])
+def test_parse_page_selection_rejects_bad_selections(selection):
+    with pytest.raises(BadPageRangeException):
+        parse_page_selection(selection, 10)
@@ -0,0 +1,56 @@
+from app.files.domain.pdf_reader_cache import CachedReader, PdfReaderCache
+
+
+def entry(weight: int) -> CachedReader:
+    return CachedReader(reader=None, number_of_pages=1, weight=weight)
+
+
+def samples(cache: PdfReaderCache) -> dict[str, float]:
+    return {name: value for name, _, _, _, value in cache.metrics()}
+
+
+def test_byte_budget_evicts_the_least_recently_used():
+    cache = PdfReaderCache(max_entries=10, max_bytes=100)
+    cache.set((1, 'a'), entry(40))
+    cache.set((2, 'b'), entry(40))
+    assert cache.get((1, 'a')) is not None
+    cache.set((3, 'c'), entry(40))
+
+    assert cache.get((2, 'b')) is None
+    assert cache.get((1, 'a')) is not None
+    assert samples(cache) == {
+        'pdf_reader_cache_entries': 2,
+        'pdf_reader_cache_bytes': 80,
+        'pdf_reader_cache_max_bytes': 100,
+        'pdf_reader_cache_hits_total': 2,
+        'pdf_reader_cache_misses_total': 1,
+        'pdf_reader_cache_evictions_total': 1
+    }
+
+
+def test_entry_limit_evicts():
+    cache = PdfReaderCache(max_entries=2, max_bytes=1000)
+    for file_id in range(4):
+        cache.set((file_id, 'digest'), entry(1))
+
+    assert list(cache.entries) == [(2, 'digest'), (3, 'digest')]
+    assert samples(cache)['pdf_reader_cache_evictions_total'] == 2
+
+
+def test_documents_over_the_budget_are_not_cached():
+    cache = PdfReaderCache(max_entries=10, max_bytes=100)
+    cache.set((1, 'a'), entry(101))
+
+    assert cache.get((1, 'a')) is None
+    assert cache.bytes == 0
+
+
+def test_replacing_and_invalidating_keep_the_byte_total():
+    cache = PdfReaderCache(max_entries=10, max_bytes=100)
+    cache.set((1, 'a'), entry(30))
+    cache.set((1, 'a'), entry(50))
+    assert cache.bytes == 50
+
+    cache.invalidate((1, 'a'))
+    assert cache.bytes == 0
+    assert samples(cache)['pdf_reader_cache_evictions_total'] == 0
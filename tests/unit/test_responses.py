@@ -0,0 +1,47 @@
+from app.files.api.responses import MAX_RANGES, etag_matches, parse_range_header
+
+
+def test_etag_matches_exact_and_weak_candidates():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"other", "abc"', '"abc"')
+    assert etag_matches('*', '"abc"')
+
+
+def test_etag_matches_nothing_without_both_values():
+    assert not etag_matches('"other"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches('"abc"', None)
+    assert not etag_matches('*', None)
+
+
+def test_parse_range_header_single_ranges():
+    assert parse_range_header('bytes=0-99', 1000) == [(0, 99)]
+    assert parse_range_header('bytes=900-', 1000) == [(900, 999)]
+    assert parse_range_header('bytes=-100', 1000) == [(900, 999)]
+    assert parse_range_header('bytes=990-2000', 1000) == [(990, 999)]
+    assert parse_range_header('bytes=-5000', 1000) == [(0, 999)]
+    assert parse_range_header('BYTES = 0-0', 1000) == [(0, 0)]
+
+
+def test_parse_range_header_multiple_ranges_keep_their_order():
+    assert parse_range_header('bytes=500-599, 0-99', 1000) == [(500, 599), (0, 99)]
+
+
+def test_parse_range_header_unsatisfiable_ranges_are_dropped():
+    assert parse_range_header('bytes=1000-', 1000) == []
+    assert parse_range_header('bytes=-0', 1000) == []
+    assert parse_range_header('bytes=2000-3000, 0-9', 1000) == [(0, 9)]
+    assert parse_range_header('bytes=0-', 0) == []
+
+
+def test_parse_range_header_malformed_headers_are_ignored():
+    for header in ['items=0-9', 'bytes=', 'bytes=abc', 'bytes=5', 'bytes=-', 'bytes=9-5', 'bytes=1-2-3', 'bytes=a-9']:
+        assert parse_range_header(header, 1000) is None, header
+
+
+def test_parse_range_header_too_many_ranges_are_ignored():
+    ranges = ','.join('{}-{}'.format(index * 10, index * 10 + 1) for index in range(MAX_RANGES + 1))
+    assert parse_range_header('bytes=' + ranges, 1000) is None
+    ranges = ','.join('{}-{}'.format(index * 10, index * 10 + 1) for index in range(MAX_RANGES))
+    assert len(parse_range_header('bytes=' + ranges, 1000)) == MAX_RANGES
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from app.authentication.domain.bo.user_bo import UserBO
+from app.authentication.domain.controllers.introspect_controller import IntrospectController
+from app.authentication.domain.token_purge_worker import TokenPurgeWorker
+from app.authentication.persistence.memory.user_bo import UserBOMemoryPersistenceService
+from app.config import AuthenticationSettings
+
+pytestmark = pytest.mark.anyio
+
+
+async def new_user(persistence: UserBOMemoryPersistenceService) -> int:
+    user = UserBO(username='user', password='hash', mail='user@example.com', year_of_birth=2000)
+    await persistence.create_user(user)
+    return user.id
+
+
+async def test_expired_tokens_are_rejected():
+    persistence = UserBOMemoryPersistenceService()
+    user_id = await new_user(persistence)
+    introspect = IntrospectController(persistence, settings=AuthenticationSettings(token_ttl=0.1))
+    short = await persistence.create_token(user_id=user_id, ttl=0.1)
+    long = await persistence.create_token(user_id=user_id, ttl=60)
+
+    assert (await introspect(token=short)).id == user_id
+    await asyncio.sleep(0.15)
+    assert await introspect(token=short) is None
+    assert await persistence.get_user_id_by_token(token=short) is None
+    assert (await introspect(token=long)).id == user_id
+
+
+async def test_sliding_refresh_extends_tokens_past_half_of_their_lifetime():
+    persistence = UserBOMemoryPersistenceService()
+    user_id = await new_user(persistence)
+    settings = AuthenticationSettings(token_ttl=0.4, token_sliding_refresh=True)
+    introspect = IntrospectController(persistence, settings=settings)
+    refreshed = await persistence.create_token(user_id=user_id, ttl=settings.token_ttl)
+    fixed = await persistence.create_token(user_id=user_id, ttl=settings.token_ttl)
+
+    await asyncio.sleep(0.25)
+    assert (await introspect(token=refreshed)).id == user_id
+    await asyncio.sleep(0.25)
+    assert (await introspect(token=refreshed)).id == user_id
+    assert await introspect(token=fixed) is None
+
+
+async def test_purge_deletes_expired_tokens_in_batches():
+    persistence = UserBOMemoryPersistenceService()
+    user_id = await new_user(persistence)
+    expired = [await persistence.create_token(user_id=user_id, ttl=0.05) for _ in range(3)]
+    valid = await persistence.create_token(user_id=user_id, ttl=60)
+    await persistence.delete_token(token=expired[0])
+    await asyncio.sleep(0.1)
+
+    # The logged out token is no longer stored and is not counted.
+    assert await persistence.purge_expired_tokens(limit=1) == 1
+    assert await persistence.purge_expired_tokens(limit=10) == 1
+    assert await persistence.purge_expired_tokens(limit=10) == 0
+    assert set(persistence.tokens) == {valid}
+
+
+async def test_purge_keeps_refreshed_tokens():
+    persistence = UserBOMemoryPersistenceService()
+    user_id = await new_user(persistence)
+    token = await persistence.create_token(user_id=user_id, ttl=0.2)
+    await asyncio.sleep(0.15)
+    await persistence.refresh_token(token=token, ttl=0.2)
+    await asyncio.sleep(0.1)
+
+    assert await persistence.purge_expired_tokens(limit=10) == 0
+    assert await persistence.get_user_id_by_token(token=token) == user_id
+
+
+async def test_worker_drains_the_backlog():
+    persistence = UserBOMemoryPersistenceService()
+    user_id = await new_user(persistence)
+    for _ in range(5):
+        await persistence.create_token(user_id=user_id, ttl=0.05)
+    await asyncio.sleep(0.1)
+
+    settings = AuthenticationSettings(token_purge_interval=60, token_purge_batch_size=2)
+    worker = TokenPurgeWorker(persistence, settings=settings)
+    worker.start()
+    try:
+        for _ in range(50):
+            if len(persistence.tokens) == 0:
+                break
+            await asyncio.sleep(0.01)
+
+    finally:
+        await worker.close()
+
+    assert persistence.tokens == {}